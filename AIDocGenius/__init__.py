@@ -4,11 +4,14 @@ AIDocGenius - 智能文档处理助手
 
 __version__ = "0.1.0"
 
-from .processor import DocProcessor
-from .translator import Translator
-from .summarizer import Summarizer
-from .analyzer import Analyzer
-from .converter import Converter
+# 公开类在首次访问时才导入所在模块，import AIDocGenius 本身不加载任何依赖
+_LAZY_ATTRIBUTES = {
+    "DocProcessor": ".processor",
+    "Translator": ".translator",
+    "Summarizer": ".summarizer",
+    "Analyzer": ".analyzer",
+    "Converter": ".converter",
+}
 
 __all__ = [
     "DocProcessor",
@@ -16,4 +19,19 @@ __all__ = [
     "Summarizer",
     "Analyzer",
     "Converter",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,50 +1,121 @@
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict, Iterable
+import importlib.util
+import os
 import re
-try:
-    import nltk
-    NLTK_AVAILABLE = True
-except ImportError:
-    nltk = None
-    NLTK_AVAILABLE = False
+import threading
+# nltk 导入较慢，在首次分词时才导入
+NLTK_AVAILABLE = importlib.util.find_spec("nltk") is not None
 from collections import Counter
 from .utils import logger
 
+# 分析所需的 NLTK 资源，按优先顺序列出候选资源路径
+NLTK_RESOURCES = {
+    'punkt': ('tokenizers/punkt_tab', 'tokenizers/punkt'),
+    'tagger': ('taggers/averaged_perceptron_tagger_eng', 'taggers/averaged_perceptron_tagger'),
+}
+
+# 离线与联网模式分别缓存：离线检查的结果不能代替联网（可下载）的检查
+_nltk_status: Dict[bool, Dict[str, bool]] = {}
+_nltk_lock = threading.Lock()
+
+
+def nltk_offline() -> bool:
+    """环境变量 NLTK_OFFLINE 为真时不尝试下载 NLTK 资源"""
+    return os.getenv("NLTK_OFFLINE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def nltk_status(offline: Optional[bool] = None) -> Dict[str, bool]:
+    """
+    检查 NLTK 资源是否可用，缺失时（非离线模式）尝试下载；每个进程每种模式只执行一次
+
+    离线模式可以复用已完成的联网检查结果，反之不行。
+    
+    Args:
+        offline: 是否禁止联网下载；None 表示读取环境变量 NLTK_OFFLINE
+        
+    Returns:
+        Dict[str, bool]: 各资源（punkt/tagger）是否可用，不可用时使用正则回退
+    """
+    if offline is None:
+        offline = nltk_offline()
+    with _nltk_lock:
+        # 联网检查的结果至少和离线检查一样完整，离线模式优先复用
+        status = _nltk_status.get(False)
+        if status is None and offline:
+            status = _nltk_status.get(True)
+        if status is None:
+            status = _nltk_status[offline] = _discover_nltk_resources(offline)
+        return status
+
+
+def _discover_nltk_resources(offline: bool) -> Dict[str, bool]:
+    status = {name: False for name in NLTK_RESOURCES}
+    if not NLTK_AVAILABLE:
+        return status
+
+    import nltk
+
+    def find(paths):
+        for path in paths:
+            try:
+                nltk.data.find(path)
+                return True
+            except LookupError:
+                continue
+        return False
+
+    for name, paths in NLTK_RESOURCES.items():
+        status[name] = find(paths)
+        if status[name] or offline:
+            continue
+        for path in paths:
+            try:
+                nltk.download(path.rsplit('/', 1)[-1], quiet=True)
+            except Exception:
+                continue
+            if find(paths):
+                status[name] = True
+                break
+
+    missing = [name for name, available in status.items() if not available]
+    if missing:
+        logger.info(f"NLTK resources unavailable ({', '.join(missing)}), using regex fallback")
+    return status
+
+
+def _mark_nltk_missing(resource: str) -> None:
+    """资源已登记为可用但实际加载失败时，本进程内改用回退实现"""
+    with _nltk_lock:
+        for status in _nltk_status.values():
+            status[resource] = False
+
+
 class Analyzer:
     """
     文档分析器
     """
     
-    def __init__(self):
+    def __init__(self, offline: Optional[bool] = None, background: bool = False):
         """
         初始化分析器
+        
+        NLTK 资源在首次分词时检查（每个进程每种模式一次），缺失的资源使用正则回退。
+        
+        Args:
+            offline: 离线模式，不尝试下载 NLTK 资源；None 表示读取环境变量 NLTK_OFFLINE
+            background: 在后台线程中提前检查 NLTK 资源，不阻塞初始化
         """
-        # 下载所需的 NLTK 资源
-        if NLTK_AVAILABLE:
-            try:
-                nltk.data.find('tokenizers/punkt_tab')
-            except LookupError:
-                try:
-                    nltk.download('punkt_tab', quiet=True)
-                except Exception:
-                    # 如果 punkt_tab 不可用，尝试 punkt
-                    try:
-                        nltk.data.find('tokenizers/punkt')
-                    except LookupError:
-                        nltk.download('punkt', quiet=True)
-
-            try:
-                nltk.data.find('taggers/averaged_perceptron_tagger_eng')
-            except LookupError:
-                try:
-                    nltk.download('averaged_perceptron_tagger_eng', quiet=True)
-                except Exception:
-                    # 回退到旧版本资源名
-                    try:
-                        nltk.data.find('taggers/averaged_perceptron_tagger')
-                    except LookupError:
-                        nltk.download('averaged_perceptron_tagger', quiet=True)
-
+        self.offline = offline
+        if background and NLTK_AVAILABLE:
+            threading.Thread(target=nltk_status, args=(offline,), daemon=True).start()
         logger.info("Initialized analyzer")
+
+    def _nltk(self, resource: str) -> Any:
+        """资源可用时返回 nltk 模块，否则返回 None"""
+        if not NLTK_AVAILABLE or not nltk_status(self.offline)[resource]:
+            return None
+        import nltk
+        return nltk
         
     def analyze(self, content: str, criteria: Optional[List[str]] = None) -> Dict:
         """
@@ -80,18 +151,100 @@ class Analyzer:
             logger.error(f"Analysis error: {str(e)}")
             raise
             
+    def analyze_stream(self, paragraphs: Iterable[str], criteria: Optional[List[str]] = None) -> Dict:
+        """
+        流式分析文档：逐段累计统计量，内存占用与文档大小无关
+        
+        Args:
+            paragraphs: 段落迭代器（如 utils.stream_document 的输出）
+            criteria: 分析标准列表
+            
+        Returns:
+            Dict: 分析结果，结构与 analyze 相同（句子在段落内切分）
+        """
+        if criteria is None:
+            criteria = ['readability', 'structure', 'keywords', 'statistics']
+
+        char_count = word_count = word_chars = sentence_count = 0
+        paragraph_count = filled_paragraphs = paragraph_words = 0
+        header_count = numbers = special_chars = 0
+        keyword_freq = Counter()
+
+        try:
+            for paragraph in paragraphs:
+                # 段落之间的 \n\n 计入字符数
+                char_count += len(paragraph) + (2 if paragraph_count else 0)
+                paragraph_count += 1
+                words = self._word_tokenize(paragraph)
+                word_count += len(words)
+                word_chars += sum(len(word) for word in words)
+                sentence_count += len(self._sentence_tokenize(paragraph))
+                if paragraph.strip():
+                    filled_paragraphs += 1
+                    paragraph_words += len(paragraph.split())
+                header_count += len(re.findall(r'^#+\s+.+$', paragraph, re.MULTILINE))
+                numbers += len(re.findall(r'\d+', paragraph))
+                special_chars += len(re.findall(r'[^\w\s]', paragraph))
+                if 'keywords' in criteria:
+                    keyword_freq.update(self._keyword_candidates(paragraph))
+
+            avg_paragraph_length = paragraph_words / filled_paragraphs if filled_paragraphs else 0
+            results = {}
+            for criterion in criteria:
+                if criterion == 'readability':
+                    results['readability'] = self._readability_result(word_count, word_chars, sentence_count)
+                elif criterion == 'structure':
+                    results['structure'] = {
+                        'paragraph_count': paragraph_count,
+                        'avg_paragraph_length': round(avg_paragraph_length, 2),
+                        'sentence_count': sentence_count,
+                        'header_count': header_count,
+                        'structure_score': self._structure_score(
+                            avg_paragraph_length if filled_paragraphs else None,
+                            header_count, paragraph_count
+                        )
+                    }
+                elif criterion == 'keywords':
+                    results['keywords'] = [
+                        {'word': word, 'frequency': freq}
+                        for word, freq in keyword_freq.most_common(10)
+                    ]
+                elif criterion == 'statistics':
+                    results['statistics'] = {
+                        'char_count': char_count,
+                        'word_count': word_count,
+                        'sentence_count': sentence_count,
+                        'paragraph_count': filled_paragraphs,
+                        'numbers_count': numbers,
+                        'special_chars_count': special_chars,
+                        'avg_word_per_sentence': round(word_count / sentence_count if sentence_count else 0, 2)
+                    }
+
+            logger.info("Completed streaming document analysis")
+            return results
+
+        except Exception as e:
+            logger.error(f"Analysis error: {str(e)}")
+            raise
+
     def _analyze_readability(self, content: str) -> Dict:
         """
         分析文档可读性
         """
-        sentences = self._sentence_tokenize(content)
         words = self._word_tokenize(content)
-        
+        return self._readability_result(
+            len(words), sum(len(word) for word in words), len(self._sentence_tokenize(content))
+        )
+
+    def _readability_result(self, word_count: int, word_chars: int, sentence_count: int) -> Dict:
+        """
+        根据词数、词字符总数和句子数计算可读性指标
+        """
         # 计算平均句子长度
-        avg_sentence_length = len(words) / len(sentences) if sentences else 0
+        avg_sentence_length = word_count / sentence_count if sentence_count else 0
         
         # 计算平均词长
-        avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
+        avg_word_length = word_chars / word_count if word_count else 0
         
         # 简单的可读性评分
         readability_score = 100 - (avg_sentence_length * 0.5 + avg_word_length * 0.5)
@@ -129,21 +282,28 @@ class Analyzer:
         """
         提取关键词
         """
-        tokens = self._word_tokenize(content.lower())
-
-        if NLTK_AVAILABLE:
-            tagged = nltk.pos_tag(tokens)
-            keywords = [word for word, pos in tagged if pos.startswith(('NN', 'JJ'))]
-        else:
-            keywords = [word for word in tokens if len(word) > 1]
-
-        keyword_freq = Counter(keywords)
+        keyword_freq = Counter(self._keyword_candidates(content))
 
         return [
             {'word': word, 'frequency': freq}
             for word, freq in keyword_freq.most_common(top_n)
         ]
         
+    def _keyword_candidates(self, content: str) -> List[str]:
+        """
+        提取候选关键词（名词和形容词）
+        """
+        tokens = self._word_tokenize(content.lower())
+
+        nltk = self._nltk('tagger')
+        if nltk is not None:
+            try:
+                tagged = nltk.pos_tag(tokens)
+                return [word for word, pos in tagged if pos.startswith(('NN', 'JJ'))]
+            except LookupError:
+                _mark_nltk_missing('tagger')
+        return [word for word in tokens if len(word) > 1]
+
     def _get_statistics(self, content: str) -> Dict:
         """
         获取文档统计信息
@@ -169,14 +329,22 @@ class Analyzer:
         }
 
     def _sentence_tokenize(self, content: str) -> List[str]:
-        if NLTK_AVAILABLE:
-            return nltk.sent_tokenize(content)
+        nltk = self._nltk('punkt')
+        if nltk is not None:
+            try:
+                return nltk.sent_tokenize(content)
+            except LookupError:
+                _mark_nltk_missing('punkt')
         sentences = re.split(r'[。！？.!?]+', content)
         return [s.strip() for s in sentences if s.strip()]
 
     def _word_tokenize(self, content: str) -> List[str]:
-        if NLTK_AVAILABLE:
-            return nltk.word_tokenize(content)
+        nltk = self._nltk('punkt')
+        if nltk is not None:
+            try:
+                return nltk.word_tokenize(content)
+            except LookupError:
+                _mark_nltk_missing('punkt')
         return re.findall(r'[\u4e00-\u9fff]+|[A-Za-z0-9]+', content)
         
     def _get_readability_suggestion(self, score: float) -> str:
@@ -194,25 +362,31 @@ class Analyzer:
         """
         计算文档结构评分
         """
+        paragraph_lengths = [len(p.split()) for p in paragraphs if p.strip()]
+        avg_length = sum(paragraph_lengths) / len(paragraph_lengths) if paragraph_lengths else None
+        return self._structure_score(avg_length, len(headers), len(paragraphs))
+
+    def _structure_score(self, avg_length: Optional[float], header_count: int, paragraph_count: int) -> float:
+        """
+        根据平均段落长度、标题数和段落数计算结构评分
+        """
         score = 100.0
         
         # 检查段落长度分布
-        paragraph_lengths = [len(p.split()) for p in paragraphs if p.strip()]
-        if paragraph_lengths:
-            avg_length = sum(paragraph_lengths) / len(paragraph_lengths)
+        if avg_length is not None:
             if avg_length > 150:
                 score -= 20
             elif avg_length < 30:
                 score -= 10
                 
         # 检查标题使用
-        if not headers:
+        if not header_count:
             score -= 30
-        elif len(headers) < 3:
+        elif header_count < 3:
             score -= 10
             
         # 检查段落数量
-        if len(paragraphs) < 3:
+        if paragraph_count < 3:
             score -= 20
             
         return round(max(0, score), 2) 
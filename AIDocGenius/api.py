@@ -3,15 +3,18 @@ from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+import io
 import tempfile
 import uvicorn
 from typing import Optional, List, Any, Dict
 from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 import shutil
 import zipfile
 import uuid
 import os
 
+from .models import get_model_registry
 from .processor import DocProcessor
 from .utils import logger
 
@@ -38,7 +41,8 @@ app.add_middleware(
 static_path = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
 
-processor = DocProcessor()
+# 摘要请求经推理调度器合批（INFERENCE_SCHEDULER=0 关闭），参数见 INFERENCE_MAX_BATCH_SIZE / INFERENCE_MAX_WAIT_MS
+processor = DocProcessor(config={"scheduler": {"enabled": os.getenv("INFERENCE_SCHEDULER", "1") != "0"}})
 MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(20 * 1024 * 1024)))
 UPLOAD_CHUNK_SIZE = 1024 * 1024
 
@@ -112,6 +116,12 @@ async def _save_upload_files(files: List[UploadFile], target_dir: Path) -> List[
         saved_paths.append(file_path)
     return saved_paths
 
+async def _read_upload_stream(upload: UploadFile) -> io.BytesIO:
+    """读取上传文件到内存，name 保留原文件名以便推断格式"""
+    stream = io.BytesIO(await _read_upload_file(upload))
+    stream.name = upload.filename or ""
+    return stream
+
 async def _read_upload_file(upload: UploadFile) -> bytes:
     total = 0
     chunks = []
@@ -132,6 +142,31 @@ async def health_check(request: Request):
     """
     return _success({"status": "healthy", "version": "0.1.0"}, request.state.request_id)
 
+@app.get("/cache/stats")
+async def cache_stats(request: Request):
+    """
+    结果缓存统计（通过 RESULT_CACHE_ENTRIES / RESULT_CACHE_PATH 启用）
+    """
+    cache = processor.result_cache
+    stats = cache.stats() if cache is not None and hasattr(cache, "stats") else None
+    return _success({"enabled": cache is not None, "stats": stats}, request.state.request_id)
+
+@app.get("/models")
+async def model_stats(request: Request):
+    """
+    常驻模型、内存预算与每个模型的加载耗时
+    """
+    return _success(get_model_registry().stats(), request.state.request_id)
+
+@app.get("/scheduler/stats")
+async def scheduler_stats(request: Request):
+    """
+    摘要推理调度器的队列深度与批大小直方图
+    """
+    scheduler = processor.scheduler
+    stats = scheduler.stats() if scheduler is not None else None
+    return _success({"enabled": scheduler is not None, "stats": stats}, request.state.request_id)
+
 @app.get("/")
 async def read_root():
     """
@@ -144,24 +179,22 @@ async def summarize_document(
     request: Request,
     file: UploadFile = File(...),
     max_length: Optional[int] = Query(default=None),
-    min_length: Optional[int] = Query(default=None)
+    min_length: Optional[int] = Query(default=None),
+    mode: Optional[str] = Query(default=None)
 ):
     """
     生成文档摘要
     """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-            content = await _read_upload_file(file)
-            temp_file.write(content)
-            temp_path = temp_file.name
-
-        summary = processor.generate_summary(
-            temp_path,
+        # 在线程池中等待摘要，并发请求才能同时进入调度器的队列
+        summary = await run_in_threadpool(
+            processor.generate_summary,
+            await _read_upload_stream(file),
             max_length=max_length,
-            min_length=min_length
+            min_length=min_length,
+            mode=mode
         )
 
-        Path(temp_path).unlink()
         return _success({"summary": summary}, request.state.request_id)
 
     except ValueError as e:
@@ -185,18 +218,12 @@ async def translate_document(
     翻译文档
     """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-            content = await _read_upload_file(file)
-            temp_file.write(content)
-            temp_path = temp_file.name
-
         translation = processor.translate(
-            temp_path,
+            await _read_upload_stream(file),
             target_language=target_language,
             source_language=source_language
         )
 
-        Path(temp_path).unlink()
         return _success({"translation": translation}, request.state.request_id)
 
     except ValueError as e:
@@ -215,13 +242,7 @@ async def analyze_document(request: Request, file: UploadFile = File(...)):
     分析文档
     """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-            content = await _read_upload_file(file)
-            temp_file.write(content)
-            temp_path = temp_file.name
-
-        analysis = processor.analyze(temp_path)
-        Path(temp_path).unlink()
+        analysis = processor.analyze(await _read_upload_stream(file))
         return _success(analysis, request.state.request_id)
 
     except ValueError as e:
@@ -244,16 +265,10 @@ async def compare_documents(
     比较两个文档
     """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file1.filename).suffix) as temp_file1:
-            temp_file1.write(await _read_upload_file(file1))
-            path1 = temp_file1.name
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file2.filename).suffix) as temp_file2:
-            temp_file2.write(await _read_upload_file(file2))
-            path2 = temp_file2.name
-
-        result = processor.compare_documents(path1, path2)
-        _cleanup_files(path1, path2)
+        result = processor.compare_documents(
+            await _read_upload_stream(file1),
+            await _read_upload_stream(file2)
+        )
         return _success(result, request.state.request_id)
 
     except ValueError as e:
@@ -0,0 +1,737 @@
+"""
+批处理执行模块
+"""
+import json
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from fnmatch import fnmatch
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import __version__
+from .utils import file_sha256, logger
+
+# 每个工作进程持有一个 DocProcessor，由进程池的 initializer 构建
+_worker_processor = None
+
+# 各批处理操作可接收的参数
+BATCH_OPERATION_PARAMS = {
+    "summarize": ("max_length", "min_length", "ratio"),
+    "translate": ("target_language", "source_language"),
+    "analyze": ("criteria",),
+}
+
+# 各批处理操作对应的组件配置项；配置变化时清单与检查点日志中的记录失效
+BATCH_OPERATION_COMPONENTS = {
+    "summarize": "summarizer",
+    "translate": "translator",
+    "analyze": "analyzer",
+}
+
+# 各批处理操作在结果字典中的输出路径键
+BATCH_OUTPUT_KEYS = {
+    "summarize": "summary_output",
+    "translate": "translation_output",
+    "analyze": "analysis_output",
+    "convert": "converted_output",
+}
+
+# 需要读取文档内容的批处理操作，每个文件只提取一次
+BATCH_EXTRACT_OPERATIONS = ("summarize", "translate", "analyze", "convert")
+
+# 在计算阶段执行的操作（不涉及文件读写，可放到进程池中）
+BATCH_COMPUTE_OPERATIONS = ("summarize", "translate", "analyze")
+
+# 调度策略：按估计成本从大到小（缩短总耗时）或从小到大（尽快产出首批结果）
+SCHEDULE_POLICIES = ("longest_first", "shortest_first")
+
+# 估计成本时各格式与操作的相对权重
+FORMAT_COST_WEIGHTS = {".pdf": 4.0, ".docx": 2.0}
+OPERATION_COST_WEIGHTS = {"summarize": 1.0, "translate": 3.0, "analyze": 1.5, "convert": 0.5}
+
+MANIFEST_NAME = "batch_manifest.json"
+MANIFEST_VERSION = 1
+JOURNAL_NAME = "batch_journal.jsonl"
+
+
+def operation_kwargs(operation: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """从批处理参数中筛选出指定操作需要的参数"""
+    names = BATCH_OPERATION_PARAMS.get(operation, ())
+    return {name: options[name] for name in names if options.get(name) is not None}
+
+
+def operation_params(operations: List[str], options: Dict[str, Any],
+                     config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    汇总影响批处理输出的参数，用于判断清单记录是否仍然有效
+
+    Args:
+        operations: 批处理操作列表
+        options: 批处理参数
+        config: DocProcessor 的配置；其中各操作的组件配置（如 summarizer）一并计入
+
+    Returns:
+        dict: 操作名 -> 参数（可 JSON 序列化，与清单中保存的值直接比较）
+    """
+    params = {operation: operation_kwargs(operation, options) for operation in operations}
+    if "convert" in params:
+        params["convert"]["output_format"] = options.get("output_format")
+    for operation in params:
+        component = (config or {}).get(BATCH_OPERATION_COMPONENTS.get(operation))
+        if component is not None:
+            # 经过一次 JSON 往返，保证与从清单读回的值可比较
+            params[operation]["component"] = json.loads(json.dumps(component, sort_keys=True, default=str))
+    return params
+
+
+def _matches(rel_path: str, name: str, patterns: Optional[List[str]]) -> bool:
+    return any(fnmatch(rel_path, pattern) or fnmatch(name, pattern) for pattern in patterns or ())
+
+
+def scan_batch_files(
+    input_dir: Union[str, Path],
+    suffixes: Iterable[str],
+    exclude_dir: Optional[Union[str, Path]] = None,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None
+) -> Iterator[Path]:
+    """
+    基于 os.scandir 遍历输入目录
+
+    目录内按名称排序，先产出文件再进入子目录；输出目录在遍历时整体剪除，
+    不支持的后缀和不符合 include/exclude 模式的文件在调度前即被过滤。
+
+    Args:
+        input_dir: 输入目录
+        suffixes: 支持的文件后缀（小写，含点）
+        exclude_dir: 需要剪除的目录（通常为输出目录）
+        include: 包含模式（glob），匹配相对路径或文件名，为空时包含全部
+        exclude: 排除模式（glob），同样作用于目录
+
+    Yields:
+        Path: 待处理文件
+    """
+    root = Path(input_dir)
+    suffixes = {suffix.lower() for suffix in suffixes}
+    excluded_stat = None
+    if exclude_dir is not None:
+        try:
+            excluded_stat = os.stat(exclude_dir)
+        except OSError:
+            excluded_stat = None
+        # 输入目录本身就是输出目录时，其中的文件都视为输出
+        try:
+            if excluded_stat is not None and os.path.samestat(os.stat(root), excluded_stat):
+                return
+        except OSError:
+            pass
+
+    stack = [(str(root), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Cannot scan directory {dir_path}: {str(e)}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if _matches(rel_path, entry.name, exclude):
+                        continue
+                    if excluded_stat is not None and os.path.samestat(entry.stat(), excluded_stat):
+                        continue
+                    subdirs.append((entry.path, f"{rel_path}/"))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if os.path.splitext(entry.name)[1].lower() not in suffixes:
+                continue
+            if include and not _matches(rel_path, entry.name, include):
+                continue
+            if _matches(rel_path, entry.name, exclude):
+                continue
+            yield root / rel_path
+        stack.extend(reversed(subdirs))
+
+
+def read_file_list(
+    source: Union[str, Path, Iterable[str]],
+    input_dir: Union[str, Path],
+    suffixes: Iterable[str],
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None
+) -> Iterator[Path]:
+    """
+    从换行分隔的文件清单读取待处理文件
+
+    Args:
+        source: 清单文件路径、"-"（标准输入）、已打开的文本流或字符串序列
+        input_dir: 输入目录，相对路径基于该目录解析，清单中的文件必须位于其中
+        suffixes: 支持的文件后缀
+        include: 包含模式
+        exclude: 排除模式
+
+    Yields:
+        Path: 待处理文件
+    """
+    root = Path(input_dir)
+    root_resolved = root.resolve()
+    suffixes = {suffix.lower() for suffix in suffixes}
+
+    if not isinstance(source, (str, Path)):
+        lines = source
+    elif str(source) == "-":
+        lines = sys.stdin
+    else:
+        lines = open(source, 'r', encoding='utf-8')
+
+    try:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            path = Path(line)
+            if not path.is_absolute():
+                path = root / path
+            # 解析 .. 与符号链接后再检查，避免 ../ 条目读写输入、输出目录之外的文件
+            try:
+                path = root / path.resolve().relative_to(root_resolved)
+            except ValueError:
+                logger.warning(f"Skipping {line}: not inside {root}")
+                continue
+            rel_path = path.relative_to(root).as_posix()
+            if path.suffix.lower() not in suffixes:
+                continue
+            if include and not _matches(rel_path, path.name, include):
+                continue
+            if _matches(rel_path, path.name, exclude):
+                continue
+            if not path.is_file():
+                logger.warning(f"Skipping {line}: file not found")
+                continue
+            yield path
+    finally:
+        if lines is not source and lines is not sys.stdin:
+            lines.close()
+
+
+def estimate_cost(file: Path, operations: List[str]) -> float:
+    """
+    估计处理单个文件的相对成本：文件大小 × 格式权重 × 操作权重之和
+
+    Returns:
+        float: 相对成本（单位为加权字节，仅用于排序与对比）
+    """
+    try:
+        size = file.stat().st_size
+    except OSError:
+        size = 0
+    format_weight = FORMAT_COST_WEIGHTS.get(file.suffix.lower(), 1.0)
+    operation_weight = sum(OPERATION_COST_WEIGHTS.get(operation, 1.0) for operation in operations)
+    return float(size) * format_weight * operation_weight
+
+
+class BatchManifest:
+    """
+    增量批处理清单
+
+    记录每个输入文件的内容摘要、大小、修改时间、操作参数与输出路径，
+    保存在输出目录下的 batch_manifest.json 中。
+    """
+
+    def __init__(self, output_dir: Union[str, Path]):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> None:
+        """读取上一次运行写入的清单，版本不符或文件损坏时视为空清单"""
+        self._previous = {}
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch manifest {self.path}: {str(e)}")
+            return
+        if data.get("manifest_version") != MANIFEST_VERSION or data.get("version") != __version__:
+            return
+        self._previous = data.get("files", {})
+
+    def match(self, key: str, file: Path, operations: List[str],
+              params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        判断文件是否可以跳过
+
+        大小与修改时间都未变化时直接命中；仅修改时间变化时再比较内容摘要。
+        所有输出文件仍然存在时才视为命中。
+
+        Returns:
+            Optional[Dict]: 命中的清单记录
+        """
+        entry = self._previous.get(key)
+        if not entry or entry.get("operations") != operations or entry.get("params") != params:
+            return None
+        try:
+            stat = file.stat()
+        except OSError:
+            return None
+        if stat.st_size != entry.get("size"):
+            return None
+        if not all(Path(path).exists() for path in entry.get("outputs", {}).values()):
+            return None
+        if stat.st_mtime_ns != entry.get("mtime_ns"):
+            if file_sha256(file) != entry.get("sha256"):
+                return None
+            entry = dict(entry, mtime_ns=stat.st_mtime_ns)
+        self._entries[key] = entry
+        return entry
+
+    def record(self, key: str, file: Path, operations: List[str],
+               params: Dict[str, Any], outputs: Dict[str, str],
+               sha256: Optional[str] = None) -> None:
+        """记录成功处理的文件（已算出内容摘要时可直接传入）"""
+        stat = file.stat()
+        self._entries[key] = {
+            "sha256": sha256 or file_sha256(file),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "operations": operations,
+            "params": params,
+            "outputs": outputs
+        }
+
+    def save(self) -> None:
+        """原子写入清单，只保留本次运行涉及的文件"""
+        data = {
+            "manifest_version": MANIFEST_VERSION,
+            "version": __version__,
+            "files": self._entries
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class BatchJournal:
+    """
+    批处理检查点日志
+
+    每处理完一个文件就向输出目录下的 batch_journal.jsonl 追加一行并 fsync，
+    进程崩溃后可据此恢复，跳过已完成的文件。
+    """
+
+    def __init__(self, output_dir: Union[str, Path]):
+        self.path = Path(output_dir) / JOURNAL_NAME
+        self._file = None
+        self._reader = None
+        self._valid_size = None
+
+    def replay(self, operations: List[str], params: Dict[str, Any]) -> Dict[str, int]:
+        """
+        扫描已完成的记录，只返回每个文件记录所在的偏移，结果由 read 按需读取
+
+        日志头中的操作或参数与本次运行不一致时不复用任何记录；
+        崩溃时写了一半的末行会被忽略（恢复时截掉）。
+
+        Returns:
+            Dict[str, int]: 文件路径 -> 记录在日志中的字节偏移
+        """
+        if not self.path.exists():
+            return {}
+        offsets = {}
+        with open(self.path, 'rb') as f:
+            header = None
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    offset += len(line)
+                    continue
+                if header is None:
+                    header = record
+                    if header.get("operations") != operations or header.get("params") != params:
+                        logger.warning(f"Batch journal {self.path} does not match current operations, ignoring it")
+                        return {}
+                else:
+                    offsets[record["entry"]["path"]] = offset
+                offset += len(line)
+            self._valid_size = offset
+        return offsets
+
+    def read(self, offset: int) -> Dict[str, Any]:
+        """
+        读取 replay 返回的偏移处的记录
+
+        Returns:
+            dict: {"entry": 报告条目, "results": 文件结果}
+        """
+        if self._reader is None:
+            self._reader = open(self.path, 'rb')
+        self._reader.seek(offset)
+        return json.loads(self._reader.readline())
+
+    def open(self, operations: List[str], params: Dict[str, Any], resume: bool = False) -> None:
+        """打开日志；恢复模式下追加（先截掉末尾不完整的行），否则重新开始"""
+        if resume and self.path.exists() and self.path.stat().st_size > 0:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._valid_size is not None and self._valid_size < self.path.stat().st_size:
+                self._file.truncate(self._valid_size)
+            return
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({"operations": operations, "params": params})
+
+    def append(self, file_entry: Dict[str, Any], file_results: Dict[str, Any]) -> None:
+        """追加一个已完成文件的记录"""
+        self._write({"entry": file_entry, "results": file_results})
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, completed: bool = False) -> None:
+        """关闭日志；全部完成时删除日志文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if completed:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def skipped_file_result(file: Path, operations: List[str],
+                        manifest_entry: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """根据清单记录构造被跳过文件的 (文件结果, 报告条目)"""
+    outputs = dict(manifest_entry.get("outputs", {}))
+    file_results = {
+        BATCH_OUTPUT_KEYS[operation]: path
+        for operation, path in outputs.items()
+        if operation in BATCH_OUTPUT_KEYS
+    }
+    file_entry = {
+        "path": str(file),
+        "status": "skipped",
+        "operations": {
+            operation: {"status": "skipped", "seconds": 0.0}
+            for operation in operations
+        },
+        "outputs": outputs,
+        "errors": {},
+        "extract_seconds": 0.0,
+        "seconds": 0.0
+    }
+    return file_results, file_entry
+
+
+def duplicate_file_result(
+    file: Path,
+    input_dir: Path,
+    output_dir: Path,
+    original_results: Dict[str, Any],
+    original_entry: Dict[str, Any],
+    link: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    为内容重复的文件生成输出：复制（或硬链接）原文件的输出，
+    返回 (文件结果, 报告条目)，报告条目中的 duplicate_of 指向原文件
+    """
+    start = time.time()
+    original_stem = Path(original_entry["path"]).stem
+    target_dir = output_dir / file.relative_to(input_dir).parent
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    file_results = dict(original_results)
+    outputs = {}
+    for operation, source in original_entry["outputs"].items():
+        source = Path(source)
+        target = target_dir / f"{file.stem}{source.name[len(original_stem):]}"
+        if target != source:
+            if target.exists():
+                target.unlink()
+            if link:
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copyfile(source, target)
+            else:
+                shutil.copyfile(source, target)
+        outputs[operation] = str(target)
+        if operation in BATCH_OUTPUT_KEYS:
+            file_results[BATCH_OUTPUT_KEYS[operation]] = str(target)
+
+    file_entry = {
+        "path": str(file),
+        "status": original_entry["status"],
+        "duplicate_of": original_entry["path"],
+        "operations": {
+            operation: {"status": info["status"], "seconds": 0.0}
+            for operation, info in original_entry["operations"].items()
+        },
+        "outputs": outputs,
+        "errors": dict(original_entry["errors"]),
+        "extract_seconds": 0.0,
+        "seconds": round(time.time() - start, 4)
+    }
+    return file_results, file_entry
+
+
+def init_worker(config: Optional[Dict[str, Any]] = None, workers: Optional[int] = None) -> None:
+    """
+    进程池 initializer：为当前工作进程构建 DocProcessor
+
+    workers 写入本进程的 INFERENCE_WORKERS，CPU 优化模式未指定 num_threads 时
+    各进程按此均分核心（见 models.configure_inference_threads），避免争抢。
+    """
+    global _worker_processor
+    from .processor import DocProcessor
+    if workers:
+        os.environ["INFERENCE_WORKERS"] = str(workers)
+    _worker_processor = DocProcessor(config=config)
+
+
+def _get_worker_processor(config: Optional[Dict[str, Any]] = None):
+    if _worker_processor is None:
+        init_worker(config)
+    return _worker_processor
+
+
+def run_batch_file(
+    config: Optional[Dict[str, Any]],
+    input_dir: Path,
+    output_dir: Path,
+    operations: List[str],
+    options: Dict[str, Any],
+    file: Path
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """在工作进程中处理单个文件"""
+    processor = _get_worker_processor(config)
+    return processor._process_batch_file(file, input_dir, output_dir, operations, options)
+
+
+def map_batch_files(
+    processor,
+    files: Iterable[Path],
+    input_dir: Path,
+    output_dir: Path,
+    operations: List[str],
+    options: Dict[str, Any],
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    处理文件并按输入顺序返回结果
+
+    Args:
+        processor: 串行或线程池执行时使用的 DocProcessor
+        files: 待处理文件
+        input_dir: 输入目录
+        output_dir: 输出目录
+        operations: 操作列表
+        options: 操作参数
+        workers: 进程数（大于 1 时启用进程池）
+        executor: 外部提供的执行器（优先于 workers，不会被关闭）
+
+    Returns:
+        Iterator: (文件结果, 报告条目)
+    """
+    if executor is None and (not workers or workers <= 1):
+        for file in files:
+            yield processor._process_batch_file(file, input_dir, output_dir, operations, options)
+        return
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(processor.config, workers)
+        )
+
+    if isinstance(executor, ProcessPoolExecutor):
+        func = partial(run_batch_file, processor.config, input_dir, output_dir, operations, options)
+    else:
+        func = partial(processor._process_batch_file, input_dir=input_dir, output_dir=output_dir,
+                       operations=operations, options=options)
+
+    # 只保留有限数量的在途任务，按提交顺序取回结果，保证报告与串行执行一致且内存有界
+    window = max(1, workers or os.cpu_count() or 1) * 2
+    pending = deque()
+    try:
+        for file in files:
+            pending.append(executor.submit(func, file))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown()
+
+
+def run_batch_compute(
+    config: Optional[Dict[str, Any]],
+    operations: List[str],
+    options: Dict[str, Any],
+    text: Optional[str],
+    extract_error: Optional[str] = None,
+    digest: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """在工作进程中执行单个文件的计算阶段"""
+    processor = _get_worker_processor(config)
+    return processor._batch_compute(text, operations, options, extract_error=extract_error, digest=digest)
+
+
+def pipeline_batch_files(
+    processor,
+    files: Iterable[Path],
+    input_dir: Path,
+    output_dir: Path,
+    operations: List[str],
+    options: Dict[str, Any],
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    io_workers: int = 2,
+    queue_size: Optional[int] = None
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    以流水线方式处理文件：读取/提取 → 计算 → 写出
+
+    读取与写出阶段运行在线程池中，计算阶段运行在 executor（或 workers 个进程，
+    默认单个线程）上，各阶段通过回调衔接，磁盘与 CPU 可以同时工作。
+    在途文件数不超过 queue_size，结果按输入顺序返回。
+
+    Args:
+        processor: 执行读取/写出阶段的 DocProcessor
+        files: 待处理文件
+        input_dir: 输入目录
+        output_dir: 输出目录
+        operations: 操作列表
+        options: 操作参数
+        workers: 计算阶段进程数（大于 1 时启用进程池）
+        executor: 计算阶段使用的外部执行器（优先于 workers，不会被关闭）
+        io_workers: 读取和写出阶段各自的线程数
+        queue_size: 在途文件数上限
+
+    Returns:
+        Iterator: (文件结果, 报告条目)
+    """
+    owns_executor = executor is None
+    if owns_executor:
+        if workers and workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_worker,
+                initargs=(processor.config, workers)
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-compute")
+
+    if isinstance(executor, ProcessPoolExecutor):
+        compute = partial(run_batch_compute, processor.config, operations, options)
+    else:
+        compute = partial(processor._batch_compute, operations=operations, options=options)
+
+    read_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="batch-read")
+    write_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="batch-write")
+    depth = queue_size or max(1, workers or os.cpu_count() or 1) * 4
+
+    def start(file: Path) -> Future:
+        done = Future()
+
+        def on_written(future: Future) -> None:
+            try:
+                done.set_result(future.result())
+            except BaseException as e:
+                done.set_exception(e)
+
+        def on_computed(loaded: Dict[str, Any], future: Future) -> None:
+            try:
+                write_pool.submit(
+                    processor._batch_write, file, input_dir, output_dir,
+                    operations, options, loaded, future.result()
+                ).add_done_callback(on_written)
+            except BaseException as e:
+                done.set_exception(e)
+
+        def on_loaded(future: Future) -> None:
+            try:
+                loaded = future.result()
+                executor.submit(
+                    compute, loaded["text"], extract_error=loaded["error"], digest=loaded["digest"]
+                ).add_done_callback(partial(on_computed, loaded))
+            except BaseException as e:
+                done.set_exception(e)
+
+        read_pool.submit(processor._batch_extract, file, operations).add_done_callback(on_loaded)
+        return done
+
+    pending = deque()
+    try:
+        for file in files:
+            pending.append(start(file))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # 按阶段顺序关闭，让在途文件走完剩余阶段
+        read_pool.shutdown()
+        if owns_executor:
+            executor.shutdown()
+        write_pool.shutdown()
+
+
+def batch_translate_files(
+    processor,
+    processed: Iterator[Tuple[Dict[str, Any], Dict[str, Any]]],
+    options: Dict[str, Any]
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    汇集多个文件延后的翻译，凑满 translate_batch_size 个片段后统一翻译
+
+    结果仍按输入顺序返回；缓冲区只保存当前一组文件，内存有界。
+    """
+    batch_size = options["translate_batch_size"]
+    buffered = []
+    buffered_segments = 0
+    try:
+        for file_results, file_entry in processed:
+            buffered.append((file_results, file_entry))
+            pending = file_entry.get("_deferred_translation")
+            if pending is not None:
+                buffered_segments += sum(1 for line in pending["text"].split("\n") if line.strip())
+            if buffered_segments >= batch_size:
+                processor._batch_translate(buffered, options)
+                yield from buffered
+                buffered = []
+                buffered_segments = 0
+        if buffered:
+            processor._batch_translate(buffered, options)
+            yield from buffered
+    finally:
+        processed.close()
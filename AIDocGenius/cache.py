@@ -0,0 +1,415 @@
+"""
+缓存模块
+"""
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存上限 512 MB
+DEFAULT_EXTRACTION_CACHE_BYTES = 512 * 1024 * 1024
+# 结果缓存默认在内存中保留 256 条，磁盘层上限 256 MB
+DEFAULT_RESULT_CACHE_ENTRIES = 256
+DEFAULT_RESULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class ExtractionCache:
+    """
+    持久化的文本提取缓存（SQLite）
+    
+    键由调用方给出（通常为内容摘要 + 格式 + 提取器版本），值为提取出的文本。
+    总大小超过上限时按最近访问时间淘汰（LRU）。总大小由触发器维护在 meta 表中，
+    写入时不必扫描全表。同一文件可被多个进程共享，fork 后的子进程会自动重新连接。
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = DEFAULT_EXTRACTION_CACHE_BYTES):
+        """
+        初始化缓存
+        
+        Args:
+            path: SQLite 文件路径（目录不存在时自动创建）
+            max_bytes: 缓存文本的总字节数上限
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self) -> "sqlite3.Connection":
+        if self._connection is None or self._pid != os.getpid():
+            import sqlite3
+
+            connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # 旧版本创建的缓存文件没有 meta 表，首次打开时按现有条目求和
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (name, value) "
+                "SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM entries"
+            )
+            connection.executescript(
+                "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN "
+                "UPDATE meta SET value = value + NEW.size WHERE name = 'total_bytes'; END;"
+                "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN "
+                "UPDATE meta SET value = value - OLD.size + NEW.size WHERE name = 'total_bytes'; END;"
+                "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN "
+                "UPDATE meta SET value = value - OLD.size WHERE name = 'total_bytes'; END;"
+            )
+            connection.commit()
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存并刷新访问时间
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[str]: 缓存的文本，未命中时为 None
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """
+        写入缓存，超出上限时淘汰最久未访问的条目
+        
+        Args:
+            key: 缓存键
+            value: 提取出的文本
+        """
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            connection = self._connect()
+            # 用 UPSERT 而不是 INSERT OR REPLACE：后者删除旧行时不触发 DELETE 触发器
+            connection.execute(
+                "INSERT INTO entries (key, size, accessed, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET size = excluded.size, accessed = excluded.accessed, "
+                "value = excluded.value",
+                (key, size, time.time(), value)
+            )
+            total = self._total(connection)
+            if total > self.max_bytes:
+                evicted = []
+                for old_key, old_size in connection.execute(
+                        "SELECT key, size FROM entries WHERE key != ? ORDER BY accessed", (key,)):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    total -= old_size
+                connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+            connection.commit()
+
+    @staticmethod
+    def _total(connection: "sqlite3.Connection") -> int:
+        return connection.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    def delete_matching(self, pattern: str) -> int:
+        """
+        删除键匹配通配符模式（SQLite GLOB 语法，* 与 ?）的条目
+        
+        Args:
+            pattern: 键模式
+            
+        Returns:
+            int: 删除的条目数
+        """
+        with self._lock:
+            connection = self._connect()
+            deleted = connection.execute("DELETE FROM entries WHERE key GLOB ?", (pattern,)).rowcount
+            connection.commit()
+        return deleted
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM entries")
+            connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        缓存统计
+        
+        Returns:
+            dict: 条目数、总字节数、上限与命中计数
+        """
+        with self._lock:
+            connection = self._connect()
+            count = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self._total(connection)
+        return {
+            "path": str(self.path),
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+class ResultCache:
+    """
+    处理结果缓存：内存 LRU 层 + 可选的磁盘层（SQLite，按大小 LRU 淘汰）
+    
+    键由 make_key 生成，包含内容摘要、操作名以及参数与组件版本的摘要；值必须能
+    JSON 序列化（摘要文本、分析报告等），两层都以 JSON 文本保存，因此每次命中都
+    返回独立的新对象。磁盘层命中的条目会提升到内存层。
+    
+    任何提供 get/put/invalidate 的对象都可以替代它作为 DocProcessor.result_cache。
+    """
+
+    def __init__(self,
+                 max_entries: int = DEFAULT_RESULT_CACHE_ENTRIES,
+                 path: Optional[Union[str, Path]] = None,
+                 max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        """
+        初始化缓存
+        
+        Args:
+            max_entries: 内存层条目数上限（0 表示不使用内存层）
+            path: 磁盘层 SQLite 文件路径；None 表示只使用内存层
+            max_bytes: 磁盘层总字节数上限
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._disk = ExtractionCache(path, max_bytes) if path is not None else None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(operation: str,
+                 content_hash: str,
+                 params: Optional[Dict[str, Any]] = None,
+                 version: str = "") -> str:
+        """
+        生成缓存键：<内容摘要>:<操作>:<参数与版本的摘要>
+        
+        Args:
+            operation: 操作名（如 summary、translate）
+            content_hash: 输入内容的摘要
+            params: 影响结果的参数
+            version: 组件版本（包版本、模型名、组件配置等）
+            
+        Returns:
+            str: 缓存键
+        """
+        encoded = json.dumps([version, params or {}], sort_keys=True, ensure_ascii=False, default=str)
+        return f"{content_hash}:{operation}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+
+    def _remember(self, key: str, encoded: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = encoded
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        读取缓存，先查内存层再查磁盘层
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[Any]: 缓存的结果，未命中时为 None
+        """
+        with self._lock:
+            encoded = self._memory.get(key)
+            if encoded is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return json.loads(encoded)
+        encoded = self._disk.get(key) if self._disk is not None else None
+        with self._lock:
+            if encoded is None:
+                self.misses += 1
+                return None
+            self._remember(key, encoded)
+            self.hits += 1
+            self.disk_hits += 1
+        return json.loads(encoded)
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        写入缓存（两层同时写入）
+        
+        Args:
+            key: 缓存键
+            value: 可 JSON 序列化的结果
+        """
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, encoded)
+        if self._disk is not None:
+            self._disk.put(key, encoded)
+
+    def invalidate(self, content_hash: Optional[str] = None, operation: Optional[str] = None) -> int:
+        """
+        按内容摘要和/或操作名删除条目；两者都为 None 时清空缓存
+        
+        Args:
+            content_hash: 输入内容的摘要
+            operation: 操作名
+            
+        Returns:
+            int: 删除的条目数（两层合计）
+        """
+        pattern = f"{content_hash or '*'}:{operation or '*'}:*"
+        with self._lock:
+            stale = [key for key in self._memory if fnmatch.fnmatchcase(key, pattern)]
+            for key in stale:
+                del self._memory[key]
+        deleted = len(stale)
+        if self._disk is not None:
+            deleted += self._disk.delete_matching(pattern)
+        return deleted
+
+    def clear(self) -> None:
+        """清空两层缓存"""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        缓存统计
+        
+        Returns:
+            dict: 命中/未命中计数、内存层条目数，以及磁盘层统计（如启用）
+        """
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries
+            }
+        stats["disk"] = self._disk.stats() if self._disk is not None else None
+        return stats
+
+    def close(self) -> None:
+        """关闭磁盘层连接"""
+        if self._disk is not None:
+            self._disk.close()
+
+
+def result_cache_from_config(config: Optional[Dict[str, Any]]) -> Optional[ResultCache]:
+    """
+    按 DocProcessor 的 config["cache"] 创建结果缓存
+    
+    config 中没有 cache 项时读取环境变量 RESULT_CACHE_ENTRIES、RESULT_CACHE_PATH 与
+    RESULT_CACHE_MAX_MB，都未设置则不启用。
+    
+    Args:
+        config: {"enabled": bool, "max_entries": int, "path": str, "max_size_mb": float}
+        
+    Returns:
+        Optional[ResultCache]: 结果缓存，未启用时为 None
+    """
+    if config is None:
+        entries = os.getenv("RESULT_CACHE_ENTRIES")
+        path = os.getenv("RESULT_CACHE_PATH")
+        if not entries and not path:
+            return None
+        config = {"max_entries": entries, "path": path, "max_size_mb": os.getenv("RESULT_CACHE_MAX_MB")}
+    if not isinstance(config, dict) or not config.get("enabled", True):
+        return None
+    max_entries = config.get("max_entries")
+    max_size_mb = config.get("max_size_mb")
+    return ResultCache(
+        max_entries=int(max_entries) if max_entries not in (None, "") else DEFAULT_RESULT_CACHE_ENTRIES,
+        path=config.get("path") or None,
+        max_bytes=int(float(max_size_mb) * 1024 * 1024) if max_size_mb not in (None, "")
+        else DEFAULT_RESULT_CACHE_BYTES
+    )
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_configured = False
+
+
+def configure_extraction_cache(path: Optional[Union[str, Path]] = None,
+                               max_bytes: int = DEFAULT_EXTRACTION_CACHE_BYTES) -> Optional[ExtractionCache]:
+    """
+    设置进程内 load_document 使用的提取缓存
+    
+    Args:
+        path: SQLite 文件路径；None 表示关闭缓存
+        max_bytes: 缓存总字节数上限
+        
+    Returns:
+        Optional[ExtractionCache]: 生效的缓存
+    """
+    global _extraction_cache, _extraction_cache_configured
+    if _extraction_cache is not None:
+        if path is not None and Path(path) == _extraction_cache.path:
+            _extraction_cache.max_bytes = max_bytes
+            _extraction_cache_configured = True
+            return _extraction_cache
+        _extraction_cache.close()
+    _extraction_cache = ExtractionCache(path, max_bytes) if path is not None else None
+    _extraction_cache_configured = True
+    return _extraction_cache
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    获取当前的提取缓存
+    
+    未显式配置时读取环境变量 EXTRACTION_CACHE_PATH 与 EXTRACTION_CACHE_MAX_MB。
+    
+    Returns:
+        Optional[ExtractionCache]: 缓存实例，未启用时为 None
+    """
+    if not _extraction_cache_configured:
+        path = os.getenv("EXTRACTION_CACHE_PATH")
+        max_mb = os.getenv("EXTRACTION_CACHE_MAX_MB")
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_EXTRACTION_CACHE_BYTES
+        configure_extraction_cache(path or None, max_bytes)
+    return _extraction_cache
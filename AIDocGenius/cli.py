@@ -2,15 +2,19 @@
 命令行接口模块
 """
 import argparse
+import json
+import os
 import sys
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
 
 from . import __version__
-from .processor import DocProcessor
-from .summarizer import Summarizer
-from .exceptions import AIDocGeniusError
+from .daemon import DAEMON_COMMANDS, DocDaemon, forward_command, send_request
+from .exceptions import AIDocGeniusError, DaemonError
 from .utils import load_config, save_document
 
+if TYPE_CHECKING:
+    from .processor import DocProcessor
+
 
 def _parse_list(value: Optional[str]) -> Optional[List[str]]:
     if not value:
@@ -18,7 +22,10 @@ def _parse_list(value: Optional[str]) -> Optional[List[str]]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
-def _load_processor(config_path: Optional[str]) -> DocProcessor:
+def _load_processor(config_path: Optional[str]) -> "DocProcessor":
+    # 处理器在执行命令时才导入，--version/--help 不加载任何组件
+    from .processor import DocProcessor
+
     config = load_config(config_path)
     return DocProcessor(config=config)
 
@@ -39,6 +46,11 @@ def create_parser() -> argparse.ArgumentParser:
     common_parser = argparse.ArgumentParser(add_help=False)
     common_parser.add_argument("--config", "-c", help="配置文件路径 (json/yaml)")
 
+    # summary/translate/analyze 可转发给常驻进程执行
+    daemon_client_parser = argparse.ArgumentParser(add_help=False)
+    daemon_client_parser.add_argument("--socket", help="常驻进程套接字路径")
+    daemon_client_parser.add_argument("--no-daemon", action="store_true", help="不转发给常驻进程，在当前进程执行")
+
     subparsers = parser.add_subparsers(dest="command", help="可用命令")
 
     # 处理文档命令
@@ -47,25 +59,32 @@ def create_parser() -> argparse.ArgumentParser:
     process_parser.add_argument("--output", "-o", help="输出文件路径")
 
     # 翻译命令
-    translate_parser = subparsers.add_parser("translate", help="翻译文档", parents=[common_parser])
+    translate_parser = subparsers.add_parser("translate", help="翻译文档", parents=[common_parser, daemon_client_parser])
     translate_parser.add_argument("input", help="输入文件路径")
     translate_parser.add_argument("--output", "-o", help="输出文件路径")
     translate_parser.add_argument("--source", "-s", help="源语言代码", default="auto")
     translate_parser.add_argument("--target", "-t", help="目标语言代码", required=True)
+    translate_parser.add_argument("--pages", help="PDF 页码范围，如 1-5,8")
 
     # 摘要命令
-    summary_parser = subparsers.add_parser("summary", help="生成文档摘要", parents=[common_parser])
+    summary_parser = subparsers.add_parser("summary", help="生成文档摘要", parents=[common_parser, daemon_client_parser])
     summary_parser.add_argument("input", help="输入文件路径")
     summary_parser.add_argument("--output", "-o", help="输出文件路径")
     summary_parser.add_argument("--max-length", type=int, help="最大摘要长度")
     summary_parser.add_argument("--min-length", type=int, help="最小摘要长度")
     summary_parser.add_argument("--ratio", type=float, help="摘要比例 (0-1)")
+    summary_parser.add_argument("--stream", action="store_true", help="流式读取大文件，只保留摘要所需的开头部分")
+    summary_parser.add_argument("--pages", help="PDF 页码范围，如 1-5,8")
+    summary_parser.add_argument("--mode", choices=["simple", "textrank"],
+                                help="摘要方式：simple 取前若干句，textrank 按句子中心度抽取")
 
     # 分析命令
-    analyze_parser = subparsers.add_parser("analyze", help="分析文档", parents=[common_parser])
+    analyze_parser = subparsers.add_parser("analyze", help="分析文档", parents=[common_parser, daemon_client_parser])
     analyze_parser.add_argument("input", help="输入文件路径")
     analyze_parser.add_argument("--output", "-o", help="输出文件路径")
     analyze_parser.add_argument("--criteria", help="分析维度，逗号分隔")
+    analyze_parser.add_argument("--stream", action="store_true", help="流式读取大文件并逐段累计统计")
+    analyze_parser.add_argument("--pages", help="PDF 页码范围，如 1-5,8")
 
     # 转换命令
     convert_parser = subparsers.add_parser("convert", help="转换文档格式", parents=[common_parser])
@@ -100,6 +119,19 @@ def create_parser() -> argparse.ArgumentParser:
     batch_parser.add_argument("--report-formats", help="报告格式，逗号分隔（json,md,csv）")
     batch_parser.add_argument("--report-only", action="store_true", help="仅返回报告结构")
     batch_parser.add_argument("--report-prefix", help="报告文件前缀")
+    batch_parser.add_argument("--jobs", "-j", type=int, default=1, help="并行进程数")
+    batch_parser.add_argument("--incremental", action="store_true", help="增量模式，跳过未变化的文件")
+    batch_parser.add_argument("--resume", action="store_true", help="从检查点日志恢复中断的批任务")
+    batch_parser.add_argument("--include", help="包含的文件模式，逗号分隔（如 *.pdf,docs/*）")
+    batch_parser.add_argument("--exclude", help="排除的文件或目录模式，逗号分隔")
+    batch_parser.add_argument("--file-list", help="换行分隔的文件清单，'-' 表示从标准输入读取")
+    batch_parser.add_argument("--pipeline", action="store_true", help="流水线模式，读取/计算/写出并行")
+    batch_parser.add_argument("--io-workers", type=int, default=2, help="流水线模式下的读写线程数")
+    batch_parser.add_argument("--translate-batch-size", type=int, help="跨文件批量翻译时每批的片段数")
+    batch_parser.add_argument("--dedupe", action="store_true", help="内容相同的文件只处理一次")
+    batch_parser.add_argument("--dedupe-link", action="store_true", help="去重时使用硬链接代替复制")
+    batch_parser.add_argument("--schedule", choices=["longest_first", "shortest_first"],
+                              help="按估计成本调度文件的处理顺序")
 
     # 模型预热命令
     warmup_parser = subparsers.add_parser("model", help="模型管理", parents=[common_parser])
@@ -107,6 +139,13 @@ def create_parser() -> argparse.ArgumentParser:
     warmup_parser.add_argument("--model-name", help="模型名称", default="google/flan-t5-small")
     warmup_parser.add_argument("--cache-dir", help="模型缓存目录")
 
+    # 常驻进程命令
+    daemon_parser = subparsers.add_parser("daemon", help="常驻进程管理", parents=[common_parser])
+    daemon_parser.add_argument("action", choices=["start", "stop", "status"], help="操作类型")
+    daemon_parser.add_argument("--socket", help="套接字路径")
+    daemon_parser.add_argument("--no-warmup", dest="warmup", action="store_false",
+                               help="启动时不预加载模型与分析资源")
+
     return parser
 
 
@@ -118,22 +157,25 @@ def process_command(args: argparse.Namespace) -> Optional[str]:
     return None
 
 
-def translate_command(args: argparse.Namespace) -> Optional[str]:
-    processor = _load_processor(args.config)
-    result = processor.translate(args.input, args.target, args.source)
+def translate_command(args: argparse.Namespace, processor: Optional["DocProcessor"] = None) -> Optional[str]:
+    processor = processor or _load_processor(args.config)
+    result = processor.translate(args.input, args.target, args.source, pages=args.pages)
     if args.output:
         save_document(result, args.output)
         return None
     return result
 
 
-def summary_command(args: argparse.Namespace) -> Optional[str]:
-    processor = _load_processor(args.config)
+def summary_command(args: argparse.Namespace, processor: Optional["DocProcessor"] = None) -> Optional[str]:
+    processor = processor or _load_processor(args.config)
     result = processor.generate_summary(
         args.input,
         max_length=args.max_length,
         min_length=args.min_length,
-        ratio=args.ratio
+        ratio=args.ratio,
+        stream=args.stream,
+        pages=args.pages,
+        mode=args.mode
     )
     if args.output:
         save_document(result, args.output)
@@ -141,10 +183,10 @@ def summary_command(args: argparse.Namespace) -> Optional[str]:
     return result
 
 
-def analyze_command(args: argparse.Namespace) -> Optional[str]:
-    processor = _load_processor(args.config)
+def analyze_command(args: argparse.Namespace, processor: Optional["DocProcessor"] = None) -> Optional[str]:
+    processor = processor or _load_processor(args.config)
     criteria = _parse_list(args.criteria)
-    result = processor.analyze(args.input, criteria)
+    result = processor.analyze(args.input, criteria, stream=args.stream, pages=args.pages)
     if args.output:
         save_document(result, args.output)
         return None
@@ -194,13 +236,27 @@ def batch_command(args: argparse.Namespace) -> Optional[str]:
         report=args.report,
         report_formats=report_formats,
         report_only=args.report_only,
-        report_prefix=args.report_prefix
+        report_prefix=args.report_prefix,
+        workers=args.jobs,
+        incremental=args.incremental,
+        resume=args.resume,
+        include=_parse_list(args.include),
+        exclude=_parse_list(args.exclude),
+        file_list=args.file_list,
+        pipeline=args.pipeline,
+        io_workers=args.io_workers,
+        translate_batch_size=args.translate_batch_size,
+        dedupe=args.dedupe or args.dedupe_link,
+        dedupe_link=args.dedupe_link,
+        schedule=args.schedule
     )
     return str(result)
 
 
 def model_command(args: argparse.Namespace) -> Optional[str]:
     if args.action == "warmup":
+        from .summarizer import Summarizer
+
         summarizer = Summarizer(
             use_simple=False,
             use_small_model=True,
@@ -212,6 +268,59 @@ def model_command(args: argparse.Namespace) -> Optional[str]:
     return None
 
 
+def daemon_command(args: argparse.Namespace) -> Optional[str]:
+    if args.action == "start":
+        daemon = DocDaemon(socket_path=args.socket, config_path=args.config)
+        daemon.bind()
+        if args.warmup:
+            daemon.warmup()
+        print(f"Daemon listening on {daemon.socket_path}", file=sys.stderr)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return None
+
+    response = send_request("ping" if args.action == "status" else "shutdown", socket_path=args.socket)
+    if response is None:
+        raise DaemonError("No daemon is running")
+    if args.action == "status":
+        return json.dumps(response["result"], ensure_ascii=False, indent=2)
+    return "Daemon stopped"
+
+
+def _forward_to_daemon(args: argparse.Namespace):
+    """
+    尝试把命令交给常驻进程执行
+
+    Returns:
+        tuple: (是否已由常驻进程处理, 命令结果)
+    """
+    if args.no_daemon or os.getenv("AIDOCGENIUS_NO_DAEMON"):
+        return False, None
+    payload = {key: value for key, value in vars(args).items() if key not in ("socket", "no_daemon")}
+    response = forward_command(args.command, payload, socket_path=args.socket)
+    if response is None:
+        return False, None
+    if not response.get("ok"):
+        raise DaemonError(response.get("error") or "Daemon request failed")
+    return True, response.get("result")
+
+
+COMMANDS = {
+    "process": process_command,
+    "translate": translate_command,
+    "summary": summary_command,
+    "analyze": analyze_command,
+    "convert": convert_command,
+    "compare": compare_command,
+    "merge": merge_command,
+    "batch": batch_command,
+    "model": model_command,
+    "daemon": daemon_command
+}
+
+
 def main():
     """主函数"""
     parser = create_parser()
@@ -221,20 +330,12 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    commands = {
-        "process": process_command,
-        "translate": translate_command,
-        "summary": summary_command,
-        "analyze": analyze_command,
-        "convert": convert_command,
-        "compare": compare_command,
-        "merge": merge_command,
-        "batch": batch_command,
-        "model": model_command
-    }
-
     try:
-        result = commands[args.command](args)
+        handled, result = False, None
+        if args.command in DAEMON_COMMANDS:
+            handled, result = _forward_to_daemon(args)
+        if not handled:
+            result = COMMANDS[args.command](args)
         if result:
             print(result)
     except AIDocGeniusError as e:
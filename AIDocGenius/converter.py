@@ -1,12 +1,8 @@
+import importlib.util
 from pathlib import Path
 from typing import Optional, Dict, Any
-try:
-    import markdown
-    MARKDOWN_AVAILABLE = True
-except ImportError:
-    markdown = None
-    MARKDOWN_AVAILABLE = False
-from docx import Document
+# markdown 与 python-docx 在首次使用时才导入
+MARKDOWN_AVAILABLE = importlib.util.find_spec("markdown") is not None
 from .utils import load_document, save_document, logger
 
 class Converter:
@@ -31,7 +27,8 @@ class Converter:
     def convert(self,
                input_path: str,
                output_path: str,
-               format_options: Optional[Dict[str, Any]] = None) -> None:
+               format_options: Optional[Dict[str, Any]] = None,
+               content: Any = None) -> None:
         """
         转换文档格式
         
@@ -39,6 +36,7 @@ class Converter:
             input_path: 输入文件路径
             output_path: 输出文件路径
             format_options: 格式选项
+            content: 已加载的文档内容（提供时不再读取 input_path）
         """
         input_path = Path(input_path)
         output_path = Path(output_path)
@@ -49,7 +47,8 @@ class Converter:
                 raise ValueError(f"Unsupported output format: {output_path.suffix}")
                 
             # 加载文档
-            content = load_document(input_path)
+            if content is None:
+                content = load_document(input_path)
             
             # 转换格式
             converter = self.supported_formats[output_path.suffix.lower()]
@@ -58,7 +57,9 @@ class Converter:
             # 保存文档
             # 对于 docx 格式，需要特殊处理
             if output_path.suffix.lower() == '.docx':
-                if isinstance(converted_content, Document):
+                from docx import Document
+                from docx.document import Document as DocxDocument
+                if isinstance(converted_content, DocxDocument):
                     converted_content.save(str(output_path))
                 else:
                     doc = Document()
@@ -116,6 +117,7 @@ class Converter:
             # 如果输入是Markdown格式，转换为HTML
             if options.get('from_markdown', True):
                 if MARKDOWN_AVAILABLE:
+                    import markdown
                     return markdown.markdown(content)
                 return self._basic_markdown_to_html(content)
             else:
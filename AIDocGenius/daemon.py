@@ -0,0 +1,326 @@
+"""
+常驻进程模块
+
+`aidocgenius daemon start` 在本地 Unix 套接字上保持一个已预热的 DocProcessor，
+summary / translate / analyze 命令检测到常驻进程时把参数转发过去执行，
+省去每次调用重新导入依赖和加载模型的开销。
+
+协议为 JSON Lines：每行一个请求 {"command": ..., "args": {...}}，
+对应一行响应 {"ok": true, "result": ...} 或 {"ok": false, "error": ..., "type": ...}。
+"""
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from . import __version__
+from .exceptions import DaemonError
+from .models import get_model_registry
+
+if TYPE_CHECKING:
+    from .processor import DocProcessor
+
+logger = logging.getLogger(__name__)
+
+# 可转发给常驻进程的命令
+DAEMON_COMMANDS = ("summary", "translate", "analyze")
+
+# 连接常驻进程的超时（秒）；超时视为没有常驻进程
+CONNECT_TIMEOUT = 0.5
+
+UNIX_SOCKETS_AVAILABLE = hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path() -> Path:
+    """
+    常驻进程的默认套接字路径
+
+    依次使用环境变量 AIDOCGENIUS_SOCKET、$XDG_RUNTIME_DIR/aidocgenius.sock、
+    临时目录下按用户区分的私有目录 aidocgenius-<uid>/daemon.sock（由 bind 以 0700 创建）。
+
+    Returns:
+        Path: 套接字路径
+    """
+    path = os.getenv("AIDOCGENIUS_SOCKET")
+    if path:
+        return Path(path)
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "aidocgenius.sock"
+    uid = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return Path(tempfile.gettempdir()) / f"aidocgenius-{uid}" / "daemon.sock"
+
+
+def _owned_by_user(info: os.stat_result) -> bool:
+    return not hasattr(os, "getuid") or info.st_uid == os.getuid()
+
+
+def _private_directory(path: Path) -> bool:
+    """目录由当前用户（或 root）拥有，且组与其他用户不可写"""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    owner_ok = _owned_by_user(info) or info.st_uid == 0
+    return owner_ok and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def socket_is_trusted(path: Union[str, Path]) -> bool:
+    """
+    检查套接字是否由当前用户的常驻进程创建
+
+    要求路径本身是当前用户拥有的套接字（不跟随符号链接），且所在目录由当前用户
+    （或 root）拥有、其他用户不可写，避免其他用户抢先创建同名套接字接收请求。
+
+    Args:
+        path: 套接字路径
+
+    Returns:
+        bool: 可以连接时为 True
+    """
+    path = Path(path)
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and _owned_by_user(info) and _private_directory(path.parent)
+
+
+def send_request(command: str,
+                 args: Optional[Dict[str, Any]] = None,
+                 socket_path: Optional[Union[str, Path]] = None,
+                 timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    向常驻进程发送一个请求
+
+    Args:
+        command: 命令名（summary/translate/analyze/ping/shutdown）
+        args: 命令参数，需可 JSON 序列化
+        socket_path: 套接字路径，默认为 default_socket_path()
+        timeout: 等待响应的超时（秒），None 表示一直等待
+
+    Returns:
+        Optional[dict]: 常驻进程的响应；没有可连接（或不可信）的常驻进程时为 None
+    """
+    if not UNIX_SOCKETS_AVAILABLE:
+        return None
+    path = Path(socket_path) if socket_path else default_socket_path()
+    if not path.exists():
+        return None
+    if not socket_is_trusted(path):
+        logger.warning("Ignoring daemon socket %s: not a private socket owned by this user", path)
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+            return None
+        sock.settimeout(timeout)
+        payload = json.dumps({"command": command, "args": args or {}}, ensure_ascii=False)
+        sock.sendall(payload.encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    finally:
+        sock.close()
+
+    if not line:
+        raise DaemonError("Daemon closed the connection without a response")
+    return json.loads(line.decode("utf-8"))
+
+
+def forward_command(command: str,
+                    args: Dict[str, Any],
+                    socket_path: Optional[Union[str, Path]] = None) -> Optional[Dict[str, Any]]:
+    """
+    把 CLI 命令转发给常驻进程执行
+
+    相对路径会先按当前目录解析为绝对路径，常驻进程的工作目录可能不同。
+
+    Args:
+        command: CLI 子命令名
+        args: 解析后的命令行参数
+        socket_path: 套接字路径
+
+    Returns:
+        Optional[dict]: 常驻进程的响应；没有常驻进程时为 None
+    """
+    args = dict(args)
+    for key in ("input", "output", "config"):
+        if args.get(key):
+            args[key] = os.path.abspath(args[key])
+    return send_request(command, args, socket_path)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """逐行读取请求并写回响应，同一连接可发送多个请求"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode("utf-8"))
+                response = {"ok": True, "result": self.server.doc_daemon.handle(
+                    request.get("command"), request.get("args") or {}
+                )}
+            except Exception as e:
+                response = {"ok": False, "error": str(e), "type": type(e).__name__}
+            self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+if UNIX_SOCKETS_AVAILABLE:
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class DocDaemon:
+    """
+    常驻文档处理进程
+
+    启动时创建并预热一个 DocProcessor；请求未指定 --config 时使用它，
+    指定了其他配置文件的请求按路径各自缓存一个处理器。计算类请求串行执行，
+    ping 不受影响。
+    """
+
+    def __init__(self,
+                 socket_path: Optional[Union[str, Path]] = None,
+                 config_path: Optional[str] = None):
+        """
+        初始化常驻进程
+
+        Args:
+            socket_path: 监听的套接字路径，默认为 default_socket_path()
+            config_path: 默认处理器使用的配置文件
+        """
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.config_path = os.path.abspath(config_path) if config_path else None
+        self.started = time.time()
+        self.requests = 0
+        self._processors: Dict[Optional[str], "DocProcessor"] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def processor(self, config_path: Optional[str] = None) -> "DocProcessor":
+        """
+        获取（必要时创建）指定配置对应的处理器
+
+        Args:
+            config_path: 配置文件路径；None 表示常驻进程的默认配置
+
+        Returns:
+            DocProcessor: 处理器
+        """
+        key = os.path.abspath(config_path) if config_path else None
+        if key == self.config_path:
+            key = None
+        if key not in self._processors:
+            from .cli import _load_processor
+
+            self._processors[key] = _load_processor(key or self.config_path)
+        return self._processors[key]
+
+    def warmup(self) -> None:
+        """预先导入依赖并加载摘要模型与分析器资源"""
+        from .analyzer import nltk_status
+
+        processor = self.processor()
+        nltk_status(processor.analyzer.offline)
+        summarizer = processor.summarizer
+        if not summarizer.use_simple:
+            summarizer.warmup()
+
+    def handle(self, command: Optional[str], args: Dict[str, Any]) -> Any:
+        """
+        执行一个请求
+
+        Args:
+            command: 命令名
+            args: 命令参数
+
+        Returns:
+            Any: 命令结果（CLI 会打印的文本）或状态信息
+        """
+        if command == "ping":
+            return self.status()
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return "stopping"
+        if command not in DAEMON_COMMANDS:
+            raise DaemonError(f"Unsupported daemon command: {command}")
+
+        import argparse
+        from .cli import COMMANDS
+
+        with self._lock:
+            self.requests += 1
+            processor = self.processor(args.get("config"))
+            return COMMANDS[command](argparse.Namespace(**args), processor=processor)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        常驻进程状态
+
+        Returns:
+            dict: 进程号、版本、运行时长、已处理请求数、处理器数量与常驻模型
+        """
+        return {
+            "pid": os.getpid(),
+            "version": __version__,
+            "socket": str(self.socket_path),
+            "uptime": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "processors": len(self._processors),
+            "models": get_model_registry().resident()
+        }
+
+    def bind(self) -> None:
+        """
+        绑定套接字；已有常驻进程在监听时报错，残留的套接字文件会被清理
+        """
+        if not UNIX_SOCKETS_AVAILABLE:
+            raise DaemonError("Unix domain sockets are not supported on this platform")
+        if self.socket_path.exists():
+            if send_request("ping", socket_path=self.socket_path, timeout=CONNECT_TIMEOUT) is not None:
+                raise DaemonError(f"Daemon already running on {self.socket_path}")
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _private_directory(self.socket_path.parent):
+            raise DaemonError(f"Socket directory {self.socket_path.parent} is writable by other users; "
+                              "use a private directory")
+        # 套接字只对当前用户可读写
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(str(self.socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.doc_daemon = self
+
+    def serve_forever(self) -> None:
+        """绑定（如尚未绑定）并处理请求，直到收到 shutdown 请求或被中断"""
+        if self._server is None:
+            self.bind()
+        logger.debug("AIDocGenius daemon listening on %s", self.socket_path)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def shutdown(self) -> None:
+        """停止 serve_forever 循环"""
+        if self._server is not None:
+            self._server.shutdown()
@@ -40,4 +40,8 @@ class ConfigurationError(AIDocGeniusError):
 
 class ValidationError(AIDocGeniusError):
     """验证异常"""
-    pass 
\ No newline at end of file
+    pass 
+
+class DaemonError(AIDocGeniusError):
+    """常驻进程异常"""
+    pass
@@ -0,0 +1,395 @@
+"""
+模型注册表模块
+
+进程内所有 Summarizer 与 Translator 共享同一个注册表：同名同设备的模型只加载一次，
+常驻模型的总内存超过预算时按最近使用时间淘汰（LRU）。
+"""
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 可选依赖在首次使用时才导入，导入模块时只检查是否已安装
+TRANSFORMERS_AVAILABLE = (
+    importlib.util.find_spec("torch") is not None
+    and importlib.util.find_spec("transformers") is not None
+)
+
+logger = logging.getLogger(__name__)
+
+# (模型, 分词器)
+Pretrained = Tuple[Any, Any]
+
+
+def resolve_device(device: Optional[str] = None) -> str:
+    """
+    解析模型运行设备；未指定时才导入 torch 检测 CUDA
+
+    Args:
+        device: 指定的设备（cuda/cpu），None 表示自动检测
+
+    Returns:
+        str: 设备名
+    """
+    if device is not None:
+        return device
+    if TRANSFORMERS_AVAILABLE:
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+    return "cpu"
+
+
+def model_memory_bytes(model: Any) -> int:
+    """
+    估算模型参数与缓冲区占用的字节数
+
+    Args:
+        model: torch 模型；没有 parameters/buffers 方法的对象按 0 计算
+
+    Returns:
+        int: 字节数
+    """
+    total = 0
+    for attribute in ("parameters", "buffers"):
+        tensors = getattr(model, attribute, None)
+        if tensors is None:
+            continue
+        for tensor in tensors():
+            total += tensor.numel() * tensor.element_size()
+    # 动态量化后的 Linear 把权重打包存放，不在 parameters 中，weight()/bias() 取出
+    for module in getattr(model, "modules", lambda: [])():
+        if getattr(module, "_packed_params", None) is not None and callable(getattr(module, "weight", None)):
+            for tensor in (module.weight(), module.bias()):
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def load_pretrained(model_class: Any, model_name: str, **kwargs) -> Any:
+    """
+    以低内存方式加载预训练权重
+
+    low_cpu_mem_usage 跳过随机初始化、逐个张量加载权重（safetensors 权重按内存映射读取），
+    峰值内存约为模型大小的一倍而不是两倍；当前 transformers/accelerate 版本不支持时
+    退回普通加载。
+
+    Args:
+        model_class: transformers 模型类（如 AutoModelForSeq2SeqLM）
+        model_name: 模型名称或路径
+        **kwargs: 传给 from_pretrained 的其他参数
+
+    Returns:
+        Any: 加载的模型
+    """
+    try:
+        return model_class.from_pretrained(model_name, low_cpu_mem_usage=True, **kwargs)
+    except (ImportError, TypeError, ValueError) as e:
+        logger.info(f"Low-memory loading unavailable for {model_name}, falling back: {str(e)}")
+        return model_class.from_pretrained(model_name, **kwargs)
+
+
+def quantize_dynamic_int8(model: Any) -> Any:
+    """
+    对模型的 nn.Linear 层做动态 int8 量化（仅适用于 CPU）
+
+    权重按 int8 存储，激活在每次前向时动态量化；Linear 之外的层保持 fp32。
+
+    Args:
+        model: torch 模型
+
+    Returns:
+        Any: 量化后的模型
+    """
+    import warnings
+
+    import torch
+    try:
+        from torch.ao.quantization import quantize_dynamic
+    except ImportError:
+        from torch.quantization import quantize_dynamic
+
+    with warnings.catch_warnings():
+        # 新版 torch 提示 eager 模式量化将迁移到 torchao，接口本身仍可用
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.simplefilter("ignore", UserWarning)
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def prepare_for_inference(model: Any, device: str, cpu_optimize: bool = False) -> Any:
+    """
+    把模型放到设备上并切换到推理模式，CPU 优化模式下再做动态 int8 量化
+
+    Args:
+        model: torch 模型
+        device: 设备（cpu/cuda）
+        cpu_optimize: 是否启用 CPU 优化（其他设备上忽略）
+
+    Returns:
+        Any: 可用于推理的模型
+    """
+    model = model.to(device).eval()
+    if cpu_optimize and device == "cpu":
+        model = quantize_dynamic_int8(model)
+    return model
+
+
+def registry_device(device: str, cpu_optimize: bool = False) -> str:
+    """注册表中区分量化模型的设备名：量化后的 CPU 模型记为 cpu:int8"""
+    return f"{device}:int8" if cpu_optimize and device == "cpu" else device
+
+
+_inference_threads: Optional[int] = None
+
+
+def configure_inference_threads(num_threads: Optional[int] = None) -> int:
+    """
+    固定本进程 torch 的算子内（intra-op）线程数
+
+    每个工作进程默认都会使用全部核心，多个进程并行时互相争抢。未指定时按
+    CPU 核数除以工作进程数（环境变量 INFERENCE_WORKERS 或 WEB_CONCURRENCY，默认 1）计算。
+
+    Args:
+        num_threads: 线程数；None 表示按上述规则计算
+
+    Returns:
+        int: 生效的线程数
+    """
+    global _inference_threads
+    if num_threads is None:
+        workers = os.getenv("INFERENCE_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1"
+        num_threads = (os.cpu_count() or 1) // max(1, int(workers))
+    num_threads = max(1, int(num_threads))
+    if num_threads != _inference_threads:
+        import torch
+
+        torch.set_num_threads(num_threads)
+        _inference_threads = num_threads
+        logger.info(f"Using {num_threads} intra-op threads for inference")
+    return num_threads
+
+
+class ModelRegistry:
+    """
+    进程级模型注册表
+
+    按 (模型名, 设备) 去重；加载新模型后若常驻总量超过 memory_budget，
+    淘汰最久未使用的其他模型（刚加载的模型即使单独超出预算也会保留）。
+    被淘汰的模型仍被调用方引用时，会在其用完后由垃圾回收释放。
+    """
+
+    def __init__(self, memory_budget: Optional[int] = None):
+        """
+        初始化注册表
+
+        Args:
+            memory_budget: 常驻模型的总字节数上限；None 表示不限制
+        """
+        self.memory_budget = memory_budget
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def get(self, model_name: str, device: str, loader: Callable[[], Pretrained]) -> Pretrained:
+        """
+        获取模型与分词器，未常驻时调用 loader 加载
+
+        同一模型的并发请求只加载一次，其他模型的查询不会被加载过程阻塞。
+
+        Args:
+            model_name: 模型名称
+            device: 设备（cpu/cuda）
+            loader: 无参函数，返回已放到 device 上的 (模型, 分词器)
+
+        Returns:
+            tuple: (模型, 分词器)
+        """
+        key = (model_name, device)
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry["model"], entry["tokenizer"]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry["model"], entry["tokenizer"]
+
+            start = time.perf_counter()
+            model, tokenizer = loader()
+            seconds = time.perf_counter() - start
+            size = model_memory_bytes(model)
+
+            with self._lock:
+                now = time.time()
+                self._entries[key] = {
+                    "model": model,
+                    "tokenizer": tokenizer,
+                    "bytes": size,
+                    "load_seconds": seconds,
+                    "loaded_at": now,
+                    "last_used": now,
+                    "hits": 0
+                }
+                self.loads += 1
+                self._load_locks.pop(key, None)
+                self._evict(keep=key)
+            logger.info(f"Loaded model {model_name} on {device} in {seconds:.2f}s "
+                        f"({size / 1024 / 1024:.0f} MB)")
+            return model, tokenizer
+
+    def _touch(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry["last_used"] = time.time()
+            entry["hits"] += 1
+            self.hits += 1
+        return entry
+
+    def _evict(self, keep: Optional[Tuple[str, str]] = None) -> None:
+        if self.memory_budget is None:
+            return
+        evicted = False
+        for key in list(self._entries):
+            if self.used_bytes() <= self.memory_budget:
+                break
+            if key == keep:
+                continue
+            self._entries.pop(key)
+            self.evictions += 1
+            evicted = True
+            logger.info(f"Evicted model {key[0]} on {key[1]} to stay within memory budget")
+        if evicted:
+            _release_device_memory()
+
+    def used_bytes(self) -> int:
+        """常驻模型的总字节数"""
+        return sum(entry["bytes"] for entry in self._entries.values())
+
+    def set_memory_budget(self, memory_budget: Optional[int]) -> None:
+        """
+        调整内存预算并立即按新预算淘汰
+
+        Args:
+            memory_budget: 总字节数上限；None 表示不限制
+        """
+        with self._lock:
+            self.memory_budget = memory_budget
+            self._evict()
+
+    def evict(self, model_name: Optional[str] = None, device: Optional[str] = None) -> int:
+        """
+        手动卸载模型
+
+        Args:
+            model_name: 只卸载该模型；None 表示全部
+            device: 只卸载该设备上的模型；None 表示全部设备
+
+        Returns:
+            int: 卸载的模型数
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (model_name is None or key[0] == model_name) and (device is None or key[1] == device)
+            ]
+            for key in keys:
+                self._entries.pop(key)
+        if keys:
+            _release_device_memory()
+        return len(keys)
+
+    def resident(self) -> List[Dict[str, Any]]:
+        """
+        当前常驻的模型（最久未使用的在前）
+
+        Returns:
+            List[dict]: 模型名、设备、字节数、加载耗时、加载与最近使用时间、命中次数
+        """
+        with self._lock:
+            return [
+                {
+                    "model_name": name,
+                    "device": device,
+                    "bytes": entry["bytes"],
+                    "load_seconds": round(entry["load_seconds"], 3),
+                    "loaded_at": entry["loaded_at"],
+                    "last_used": entry["last_used"],
+                    "hits": entry["hits"]
+                }
+                for (name, device), entry in self._entries.items()
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        注册表统计
+
+        Returns:
+            dict: 预算、已用字节数、常驻模型数、加载/命中/淘汰次数与常驻明细
+        """
+        resident = self.resident()
+        return {
+            "memory_budget": self.memory_budget,
+            "used_bytes": sum(entry["bytes"] for entry in resident),
+            "models": len(resident),
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "resident": resident
+        }
+
+
+def _release_device_memory() -> None:
+    """淘汰模型后归还 CUDA 缓存的显存（torch 未导入时不做任何事）"""
+    import sys
+
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+_model_registry: Optional[ModelRegistry] = None
+_model_registry_lock = threading.Lock()
+
+
+def configure_model_registry(memory_budget: Optional[int] = None) -> ModelRegistry:
+    """
+    设置进程级模型注册表的内存预算（已常驻的模型保留，超出部分立即淘汰）
+
+    Args:
+        memory_budget: 总字节数上限；None 表示不限制
+
+    Returns:
+        ModelRegistry: 注册表
+    """
+    registry = get_model_registry()
+    registry.set_memory_budget(memory_budget)
+    return registry
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    获取进程级模型注册表
+
+    首次创建时读取环境变量 MODEL_MEMORY_BUDGET_MB 作为内存预算。
+
+    Returns:
+        ModelRegistry: 注册表
+    """
+    global _model_registry
+    if _model_registry is None:
+        with _model_registry_lock:
+            if _model_registry is None:
+                budget_mb = os.getenv("MODEL_MEMORY_BUDGET_MB")
+                budget = int(float(budget_mb) * 1024 * 1024) if budget_mb else None
+                _model_registry = ModelRegistry(budget)
+    return _model_registry
@@ -1,15 +1,16 @@
 """
 文档处理器基类
 """
+import hashlib
+import json
 import os
-from typing import Any, Dict, List, Optional, Union
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
-try:
-    import torch
-except ImportError:
-    torch = None
-
+from . import __version__
 from .exceptions import DocumentProcessError
 from .translator import Translator
 from .summarizer import Summarizer
@@ -17,27 +18,112 @@ from .converter import Converter
 from .analyzer import Analyzer
 from .comparator import DocumentComparator
 from .merger import DocumentMerger
-from .utils import load_document, save_document, ensure_text, get_file_info
+from .cache import ResultCache, configure_extraction_cache, result_cache_from_config
+from .models import configure_model_registry
+from .scheduler import InferenceScheduler, scheduler_from_config
+from .utils import (
+    DocumentSource, document_digest, load_document, save_document, ensure_text, get_file_info, file_sha256,
+    stream_document
+)
+from .batch import (
+    BATCH_COMPUTE_OPERATIONS, BATCH_EXTRACT_OPERATIONS, BATCH_OUTPUT_KEYS,
+    SCHEDULE_POLICIES, BatchJournal, BatchManifest, batch_translate_files, duplicate_file_result,
+    estimate_cost, map_batch_files, operation_kwargs, operation_params, pipeline_batch_files,
+    read_file_list, scan_batch_files, skipped_file_result
+)
+
+# 结果缓存的操作名与其组件配置项；组件配置变化时缓存键随之变化
+RESULT_CACHE_COMPONENTS = {
+    "summary": "summarizer",
+    "translate": "translator",
+    "analyze": "analyzer",
+    "compare": "comparator",
+}
+
 
 class DocProcessor:
     """文档处理器基类，提供基础的文档处理功能"""
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
+        cache_config = self.config.get("extraction_cache")
+        if isinstance(cache_config, dict) and cache_config.get("path"):
+            # 提取缓存是进程级的，load_document 的所有调用方共享
+            configure_extraction_cache(
+                cache_config["path"],
+                int(cache_config.get("max_size_mb", 512) * 1024 * 1024)
+            )
         self._supported_formats = {
             'pdf': ['.pdf'],
             'word': ['.docx'],
             'text': ['.txt', '.md', '.rst'],
             'structured': ['.json', '.yaml', '.yml']
         }
-        # 默认使用 Google Translate（更轻量级）
-        self.translator = Translator(use_google=True)
-        # 延迟初始化 summarizer，避免在导入时就加载模型
+        models_config = self.config.get("models")
+        if isinstance(models_config, dict) and "memory_budget_mb" in models_config:
+            # 模型注册表是进程级的，所有 Summarizer/Translator 共享同一预算
+            budget_mb = models_config["memory_budget_mb"]
+            configure_model_registry(int(budget_mb * 1024 * 1024) if budget_mb is not None else None)
+        # 结果缓存（config["cache"]），可替换为任何提供 get/put/invalidate 的对象
+        self.result_cache = result_cache_from_config(self.config.get("cache"))
+        # 各组件在首次访问时才创建，避免启动时加载模型和格式库
+        self._translator = None
         self._summarizer = None
-        self.converter = Converter()
-        self.analyzer = Analyzer()
-        self.comparator = DocumentComparator()
-        self.merger = DocumentMerger()
+        self._converter = None
+        self._analyzer = None
+        self._comparator = None
+        self._merger = None
+        self._scheduler = None
+        self._scheduler_loaded = False
+        self._scheduler_lock = threading.Lock()
+
+    @property
+    def translator(self) -> Translator:
+        """延迟创建 translator（默认使用更轻量的 Google Translate）"""
+        if self._translator is None:
+            translator_config = self.config.get("translator", {})
+            if not isinstance(translator_config, dict):
+                translator_config = {}
+            self._translator = Translator(
+                use_google=translator_config.get("use_google", True),
+                cpu_optimize=translator_config.get("cpu_optimize", False),
+                num_threads=translator_config.get("num_threads")
+            )
+        return self._translator
+
+    @property
+    def converter(self) -> Converter:
+        """延迟创建 converter"""
+        if self._converter is None:
+            self._converter = Converter()
+        return self._converter
+
+    @property
+    def analyzer(self) -> Analyzer:
+        """延迟创建 analyzer"""
+        if self._analyzer is None:
+            analyzer_config = self.config.get("analyzer", {})
+            if not isinstance(analyzer_config, dict):
+                analyzer_config = {}
+            self._analyzer = Analyzer(
+                offline=analyzer_config.get("offline"),
+                background=analyzer_config.get("background", False)
+            )
+        return self._analyzer
+
+    @property
+    def comparator(self) -> DocumentComparator:
+        """延迟创建 comparator"""
+        if self._comparator is None:
+            self._comparator = DocumentComparator()
+        return self._comparator
+
+    @property
+    def merger(self) -> DocumentMerger:
+        """延迟创建 merger"""
+        if self._merger is None:
+            self._merger = DocumentMerger()
+        return self._merger
     
     @property
     def summarizer(self):
@@ -54,10 +140,26 @@ class DocProcessor:
                 max_length=summarizer_config.get("max_length", 1024),
                 min_length=summarizer_config.get("min_length", 50),
                 max_input_length=summarizer_config.get("max_input_length"),
-                cache_dir=summarizer_config.get("cache_dir")
+                cache_dir=summarizer_config.get("cache_dir"),
+                mode=summarizer_config.get("mode"),
+                hierarchical=summarizer_config.get("hierarchical", False),
+                chunk_overlap=summarizer_config.get("chunk_overlap", 64),
+                batch_size=summarizer_config.get("batch_size", 8),
+                cpu_optimize=summarizer_config.get("cpu_optimize", False),
+                num_threads=summarizer_config.get("num_threads")
             )
         return self._summarizer
 
+    @property
+    def scheduler(self) -> Optional[InferenceScheduler]:
+        """延迟创建摘要的推理调度器（config["scheduler"]），未启用时为 None"""
+        if not self._scheduler_loaded:
+            with self._scheduler_lock:
+                if not self._scheduler_loaded:
+                    self._scheduler = scheduler_from_config(self.summarizer, self.config.get("scheduler"))
+                    self._scheduler_loaded = True
+        return self._scheduler
+
     def process_document(
         self, 
         input_path: Union[str, Path], 
@@ -91,6 +193,11 @@ class DocProcessor:
         except Exception as e:
             raise DocumentProcessError(f"处理文档时出错: {str(e)}")
     
+    @property
+    def supported_suffixes(self) -> List[str]:
+        """所有支持的输入文件后缀"""
+        return [suffix for extensions in self._supported_formats.values() for suffix in extensions]
+
     def _get_file_format(self, file_path: Path) -> Optional[str]:
         """获取文件格式"""
         suffix = file_path.suffix.lower()
@@ -169,46 +276,106 @@ class DocProcessor:
         )
 
     def generate_summary(self, 
-                        document_path: Union[str, Path],
+                        document_path: Optional[DocumentSource] = None,
                         max_length: Optional[int] = None,
                         min_length: Optional[int] = None,
-                        ratio: Optional[float] = None) -> str:
+                        ratio: Optional[float] = None,
+                        text: Optional[str] = None,
+                        stream: bool = False,
+                        pages: Optional[Union[str, Iterable[int]]] = None,
+                        file_format: Optional[str] = None,
+                        mode: Optional[str] = None,
+                        content_hash: Optional[str] = None) -> str:
         """
         生成文档摘要
         
         Args:
-            document_path: 文档路径
+            document_path: 文档路径，或内存中的 bytes/BytesIO/文件对象
             max_length: 摘要最大长度
             min_length: 摘要最小长度
+            text: 已提取的文档文本（提供时不再读取 document_path）
+            stream: 按段落流式读取文档，只保留摘要所需的开头部分（PDF 只解析用到的页）
+            pages: PDF 页码范围（如 "1-5"），格式见 utils.parse_page_range
+            file_format: 内存文档的格式提示（如 "pdf"）
+            mode: 摘要方式（simple/textrank），None 表示使用配置 summarizer.mode
+            content_hash: text 所属文档的内容摘要（见 utils.document_digest），作为结果缓存键
             
         Returns:
             str: 生成的摘要文本
         """
-        content = load_document(document_path)
-        return self.summarizer.generate_summary(
-            ensure_text(content),
-            max_length=max_length,
-            min_length=min_length,
-            ratio=ratio
-        )
+        pages = self._normalize_pages(pages)
+        digest, document_path, file_format = self._result_source(document_path, text, file_format, content_hash)
+
+        def compute() -> str:
+            if text is None and stream:
+                return self.summarizer.generate_summary_stream(
+                    stream_document(document_path, pages=pages, file_format=file_format),
+                    max_length=max_length,
+                    min_length=min_length,
+                    ratio=ratio,
+                    mode=mode
+                )
+            content = text if text is not None else self._load_text(document_path, pages, file_format)
+            # 启用调度器时，并发请求的模型生成合并成批
+            summarize = self.scheduler.summarize if self.scheduler is not None \
+                else self.summarizer.generate_summary
+            return summarize(
+                content,
+                max_length=max_length,
+                min_length=min_length,
+                ratio=ratio,
+                mode=mode
+            )
+
+        params = {
+            "max_length": max_length, "min_length": min_length, "ratio": ratio,
+            "stream": stream, "pages": pages, "format": file_format, "mode": mode
+        }
+        return self._cached("summary", digest, params, compute)
 
     def translate(self,
-                 document_path: Union[str, Path],
+                 document_path: Optional[DocumentSource],
                  target_language: str,
-                 source_language: Optional[str] = None) -> str:
+                 source_language: Optional[str] = None,
+                 text: Optional[str] = None,
+                 pages: Optional[Union[str, Iterable[int]]] = None,
+                 file_format: Optional[str] = None,
+                 content_hash: Optional[str] = None) -> str:
         """
         翻译文档
         
         Args:
-            document_path: 文档路径
+            document_path: 文档路径，或内存中的 bytes/BytesIO/文件对象
             target_language: 目标语言代码
             source_language: 源语言代码（可选）
+            text: 已提取的文档文本（提供时不再读取 document_path）
+            pages: PDF 页码范围（如 "1-5"），格式见 utils.parse_page_range
+            file_format: 内存文档的格式提示（如 "pdf"）
+            content_hash: text 所属文档的内容摘要（见 utils.document_digest），作为结果缓存键
             
         Returns:
             str: 翻译后的文本
         """
-        content = load_document(document_path)
+        pages = self._normalize_pages(pages)
+        digest, document_path, file_format = self._result_source(document_path, text, file_format, content_hash)
         # translator.translate 的参数顺序是 (text, source_lang, target_lang)
+        source_lang, target_lang = self._normalize_languages(target_language, source_language)
+
+        def compute() -> str:
+            content = text if text is not None else self._load_text(document_path, pages, file_format)
+            # 直接调用 translator，它会自动处理语言对和回退（包括 Google Translate）
+            try:
+                return self.translator.translate(content, source_lang, target_lang)
+            except Exception as e:
+                raise DocumentProcessError(f"翻译失败: {str(e)}")
+
+        params = {"source": source_lang, "target": target_lang, "pages": pages, "format": file_format}
+        return self._cached("translate", digest, params, compute)
+
+    def _normalize_languages(self,
+                             target_language: str,
+                             source_language: Optional[str] = None) -> Tuple[str, str]:
+        """将语言名称映射为翻译器使用的 (源语言, 目标语言) 代码"""
         # 语言代码映射
         lang_map = {
             "en": "en", "english": "en", "英文": "en",
@@ -224,17 +391,13 @@ class DocProcessor:
             source_lang = "auto"
         else:
             source_lang = lang_map.get(source_language.lower(), source_language.lower())
-        
-        # 直接调用 translator，它会自动处理语言对和回退（包括 Google Translate）
-        try:
-            return self.translator.translate(ensure_text(content), source_lang, target_lang)
-        except Exception as e:
-            raise DocumentProcessError(f"翻译失败: {str(e)}")
+        return source_lang, target_lang
 
     def convert(self,
                 input_path: Union[str, Path],
                 output_path: Union[str, Path],
-                format_options: Optional[dict] = None) -> None:
+                format_options: Optional[dict] = None,
+                content: Any = None) -> None:
         """
         转换文档格式
         
@@ -242,24 +405,122 @@ class DocProcessor:
             input_path: 输入文档路径
             output_path: 输出文档路径
             format_options: 格式选项
+            content: 已加载的文档内容（提供时不再读取 input_path）
         """
-        self.converter.convert(input_path, output_path, format_options)
+        self.converter.convert(input_path, output_path, format_options, content=content)
 
     def analyze(self,
-                document_path: Union[str, Path],
-                criteria: Optional[List[str]] = None) -> dict:
+                document_path: Optional[DocumentSource] = None,
+                criteria: Optional[List[str]] = None,
+                text: Optional[str] = None,
+                stream: bool = False,
+                pages: Optional[Union[str, Iterable[int]]] = None,
+                file_format: Optional[str] = None,
+                content_hash: Optional[str] = None) -> dict:
         """
         分析文档质量
         
         Args:
-            document_path: 文档路径
+            document_path: 文档路径，或内存中的 bytes/BytesIO/文件对象
             criteria: 分析标准列表
+            text: 已提取的文档文本（提供时不再读取 document_path）
+            stream: 按段落流式读取并累计统计，内存占用与文档大小无关
+            pages: PDF 页码范围（如 "1-5"），格式见 utils.parse_page_range
+            file_format: 内存文档的格式提示（如 "pdf"）
+            content_hash: text 所属文档的内容摘要（见 utils.document_digest），作为结果缓存键
             
         Returns:
             dict: 分析结果报告
         """
-        content = load_document(document_path)
-        return self.analyzer.analyze(ensure_text(content), criteria)
+        pages = self._normalize_pages(pages)
+        digest, document_path, file_format = self._result_source(document_path, text, file_format, content_hash)
+
+        def compute() -> dict:
+            if text is None and stream:
+                return self.analyzer.analyze_stream(
+                    stream_document(document_path, pages=pages, file_format=file_format), criteria
+                )
+            content = text if text is not None else self._load_text(document_path, pages, file_format)
+            return self.analyzer.analyze(content, criteria)
+
+        params = {"criteria": criteria, "stream": stream, "pages": pages, "format": file_format}
+        return self._cached("analyze", digest, params, compute)
+
+    @staticmethod
+    def _normalize_pages(pages: Optional[Union[str, Iterable[int]]]) -> Optional[Union[str, List[int]]]:
+        """页码迭代器转为列表，既能写入缓存键又能再次使用"""
+        if pages is None or isinstance(pages, str):
+            return pages
+        return list(pages)
+
+    def _result_source(self,
+                       document_path: Optional[DocumentSource],
+                       text: Optional[str] = None,
+                       file_format: Optional[str] = None,
+                       content_hash: Optional[str] = None) -> Tuple[Optional[str], Any, Optional[str]]:
+        """
+        计算结果缓存使用的内容摘要
+        
+        只给出 text 时按文本计算摘要；同时给出 content_hash（原文档的字节摘要，
+        批处理会传入）时直接使用它，invalidate_results(文档路径) 因此也能删除这些条目。
+        
+        Returns:
+            tuple: (内容摘要，未启用缓存时为 None, 可再次读取的文档来源, 格式提示)
+        """
+        if self.result_cache is None:
+            return None, document_path, file_format
+        if text is not None and content_hash is not None:
+            return content_hash, document_path, file_format
+        if text is not None:
+            return hashlib.sha256(text.encode('utf-8')).hexdigest(), document_path, file_format
+        digest, suffix, source = document_digest(document_path, file_format)
+        return digest, source, suffix
+
+    def _cached(self, operation: str, digest: Optional[str], params: Dict[str, Any], compute) -> Any:
+        """命中结果缓存时直接返回，否则计算并写入缓存"""
+        if self.result_cache is None or digest is None:
+            return compute()
+        version = [__version__, self.config.get(RESULT_CACHE_COMPONENTS[operation])]
+        key = ResultCache.make_key(operation, digest, params, json.dumps(version, sort_keys=True, default=str))
+        result = self.result_cache.get(key)
+        if result is None:
+            result = compute()
+            self.result_cache.put(key, result)
+        return result
+
+    def invalidate_results(self,
+                           document_path: Optional[DocumentSource] = None,
+                           operation: Optional[str] = None,
+                           file_format: Optional[str] = None) -> int:
+        """
+        删除结果缓存中的条目
+        
+        Args:
+            document_path: 只删除该文档的结果；None 表示所有文档
+            operation: 只删除该操作（summary/translate/analyze/compare）的结果
+            file_format: 内存文档的格式提示
+            
+        Returns:
+            int: 删除的条目数；未启用缓存时为 0
+        """
+        if self.result_cache is None:
+            return 0
+        digest = None
+        if document_path is not None:
+            digest = document_digest(document_path, file_format)[0]
+        return self.result_cache.invalidate(digest, operation)
+
+    def _load_text(self,
+                   document_path: DocumentSource,
+                   pages: Optional[Union[str, Iterable[int]]] = None,
+                   file_format: Optional[str] = None) -> str:
+        """加载文档文本；PDF 按 config["pdf"]["workers"] 并行提取"""
+        pdf_config = self.config.get("pdf", {})
+        if not isinstance(pdf_config, dict):
+            pdf_config = {}
+        return ensure_text(load_document(
+            document_path, pages=pages, pdf_workers=pdf_config.get("workers"), file_format=file_format
+        ))
 
     def batch_process(self,
                      input_dir: Union[str, Path],
@@ -269,6 +530,10 @@ class DocProcessor:
                      report_formats: Optional[List[str]] = None,
                      report_only: bool = False,
                      report_prefix: Optional[str] = None,
+                     workers: Optional[int] = None,
+                     executor: Optional[Executor] = None,
+                     incremental: bool = False,
+                     resume: bool = False,
                      **kwargs) -> dict:
         """
         批量处理文档
@@ -277,7 +542,12 @@ class DocProcessor:
             input_dir: 输入目录
             output_dir: 输出目录
             operations: 要执行的操作列表
-            **kwargs: 其他参数
+            report_formats: 报告格式（json/md/csv/jsonl），jsonl 报告在处理过程中逐行写入
+            workers: 并行进程数（大于 1 时使用进程池）
+            executor: 自定义执行器（如 ProcessPoolExecutor/ThreadPoolExecutor）
+            incremental: 增量模式，跳过清单中未变化的文件
+            resume: 从检查点日志恢复中断的批任务
+            **kwargs: 其他参数（include/exclude/file_list/pipeline/dedupe/schedule 等传给 iter_batch_process）
             
         Returns:
             dict: 处理结果报告
@@ -285,116 +555,70 @@ class DocProcessor:
         results = {}
         input_path = Path(input_dir)
         output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        output_path_resolved = output_path.resolve()
 
         if report_prefix:
             report_prefix = Path(report_prefix).name
             if not report_prefix:
                 report_prefix = None
+        report_prefix = report_prefix or "batch_report"
+        if report and report_formats is None:
+            report_formats = ["json"]
         
-        import time
-
         total_files = 0
         processed_files = 0
+        skipped_files = 0
+        duplicate_files = 0
         error_count = 0
         batch_start = time.time()
         report_files = []
+        # 文件路径 -> 在输入清单中的位置（仅按成本调度时由 iter_batch_process 给出）
+        positions = {}
 
-        for file in input_path.glob("**/*"):
-            if not file.is_file():
-                continue
-            try:
-                if output_path_resolved in file.resolve().parents:
-                    continue
-            except Exception:
-                pass
+        jsonl_report = None
+        if report and "jsonl" in report_formats:
+            jsonl_report = output_path / f"{report_prefix}.jsonl"
 
+        for file_entry in self.iter_batch_process(
+            input_path, output_path, operations,
+            workers=workers, executor=executor, incremental=incremental,
+            resume=resume, jsonl_report=jsonl_report, **kwargs
+        ):
+            file_results = file_entry.pop("results")
             total_files += 1
-            results[str(file)] = {}
-            file_entry = {
-                "path": str(file),
-                "operations": {},
-                "outputs": {},
-                "errors": {},
-                "seconds": 0.0
-            }
-            file_start = time.time()
-            for operation in operations:
-                op_start = time.time()
-                try:
-                    rel_path = file.relative_to(input_path)
-                    target_dir = output_path / rel_path.parent
-                    target_dir.mkdir(parents=True, exist_ok=True)
-
-                    if operation == "summarize":
-                        summary = self.generate_summary(file, **kwargs)
-                        results[str(file)]["summary"] = summary
-                        output_file = target_dir / f"{file.stem}.summary.txt"
-                        save_document(summary, output_file)
-                        results[str(file)]["summary_output"] = str(output_file)
-                        file_entry["outputs"]["summarize"] = str(output_file)
-                    elif operation == "translate":
-                        translation = self.translate(file, **kwargs)
-                        results[str(file)]["translation"] = translation
-                        target_language = kwargs.get("target_language", "en")
-                        output_file = target_dir / f"{file.stem}.translated.{target_language}.txt"
-                        save_document(translation, output_file)
-                        results[str(file)]["translation_output"] = str(output_file)
-                        file_entry["outputs"]["translate"] = str(output_file)
-                    elif operation == "analyze":
-                        analysis = self.analyze(file, **kwargs)
-                        results[str(file)]["analysis"] = analysis
-                        output_file = target_dir / f"{file.stem}.analysis.json"
-                        save_document(analysis, output_file)
-                        results[str(file)]["analysis_output"] = str(output_file)
-                        file_entry["outputs"]["analyze"] = str(output_file)
-                    elif operation == "convert":
-                        output_format = kwargs.get("output_format")
-                        if not output_format:
-                            raise DocumentProcessError("convert 操作需要提供 output_format")
-                        normalized_format = output_format.lower().lstrip('.')
-                        if any(sep in normalized_format for sep in ["/", "\\"]):
-                            raise DocumentProcessError("convert 输出格式无效")
-                        normalized_format = f".{normalized_format}"
-                        if normalized_format not in self.converter.supported_formats:
-                            raise DocumentProcessError(f"convert 不支持的输出格式: {normalized_format}")
-                        output_file = target_dir / f"{file.stem}{normalized_format}"
-                        self.convert(file, output_file)
-                        results[str(file)]["converted_output"] = str(output_file)
-                        file_entry["outputs"]["convert"] = str(output_file)
-                    else:
-                        results[str(file)][operation] = "Error: Unsupported operation"
-                        file_entry["errors"][operation] = "Unsupported operation"
-                    file_entry["operations"][operation] = {
-                        "status": "ok",
-                        "seconds": round(time.time() - op_start, 4)
-                    }
-                except Exception as e:
-                    results[str(file)][operation] = f"Error: {str(e)}"
-                    file_entry["errors"][operation] = str(e)
-                    file_entry["operations"][operation] = {
-                        "status": "error",
-                        "seconds": round(time.time() - op_start, 4)
-                    }
-                    error_count += 1
-
-            processed_files += 1
-            file_entry["seconds"] = round(time.time() - file_start, 4)
-            report_files.append(file_entry)
+            if file_entry["status"] == "skipped":
+                skipped_files += 1
+            else:
+                processed_files += 1
+            if "duplicate_of" in file_entry:
+                duplicate_files += 1
+            # 仅返回报告时不保留摘要/翻译等正文
+            if not (report and report_only):
+                results[file_entry["path"]] = file_results
+            error_count += sum(
+                1 for op_info in file_entry["operations"].values()
+                if op_info["status"] == "error"
+            )
+            if report:
+                report_files.append(file_entry)
+            if "index" in file_entry:
+                positions[file_entry["path"]] = file_entry["index"]
+
+        # 按成本调度时结果按处理顺序产出，报告和结果都恢复为扫描到的输入顺序
+        if kwargs.get("schedule"):
+            report_files.sort(key=lambda entry: positions.get(entry["path"], 0))
+            results = dict(sorted(results.items(), key=lambda item: positions.get(item[0], 0)))
                         
         report_payload = None
         if report:
-            if report_formats is None:
-                report_formats = ["json"]
-
             summary_report = {
                 "input_dir": str(input_path),
                 "output_dir": str(output_path),
                 "operations": operations,
+                "schedule": kwargs.get("schedule"),
                 "total_files": total_files,
                 "processed_files": processed_files,
+                "skipped_files": skipped_files,
+                "duplicate_files": duplicate_files,
                 "error_count": error_count,
                 "seconds": round(time.time() - batch_start, 4),
                 "files": report_files
@@ -402,8 +626,6 @@ class DocProcessor:
 
             report_payload = summary_report
 
-            report_prefix = report_prefix or "batch_report"
-
             if "json" in report_formats:
                 report_path = output_path / f"{report_prefix}.json"
                 save_document(summary_report, report_path)
@@ -417,17 +639,23 @@ class DocProcessor:
                     f"- Operations: {', '.join(operations)}",
                     f"- Total files: {total_files}",
                     f"- Processed files: {processed_files}",
+                    f"- Skipped files: {skipped_files}",
+                    f"- Duplicate files: {duplicate_files}",
                     f"- Errors: {error_count}",
                     "",
                     "## Results",
                 ]
-                for file_path, result in results.items():
-                    report_lines.append(f"- {file_path}")
-                    for key, value in result.items():
-                        if key.endswith("_output"):
-                            report_lines.append(f"  - {key}: {value}")
-                        elif isinstance(value, str) and value.startswith("Error:"):
-                            report_lines.append(f"  - {key}: {value}")
+                for file_entry in report_files:
+                    report_lines.append(f"- {file_entry['path']}")
+                    if "duplicate_of" in file_entry:
+                        report_lines.append(f"  - duplicate_of: {file_entry['duplicate_of']}")
+                    for op_name in file_entry["operations"]:
+                        if op_name in file_entry["errors"]:
+                            report_lines.append(f"  - {op_name}: Error: {file_entry['errors'][op_name]}")
+                        elif op_name in file_entry["outputs"]:
+                            report_lines.append(
+                                f"  - {BATCH_OUTPUT_KEYS[op_name]}: {file_entry['outputs'][op_name]}"
+                            )
                 report_path = output_path / f"{report_prefix}.md"
                 save_document("\n".join(report_lines), report_path)
 
@@ -437,15 +665,16 @@ class DocProcessor:
                 report_path = output_path / f"{report_prefix}.csv"
                 with open(report_path, "w", newline="", encoding="utf-8") as csv_file:
                     writer = csv.writer(csv_file)
-                    writer.writerow(["file", "operation", "status", "output", "error", "seconds"])
+                    writer.writerow(["file", "operation", "status", "output", "error", "seconds", "extract_seconds"])
                     for file_entry in report_files:
                         file_path = file_entry["path"]
+                        extract_seconds = file_entry.get("extract_seconds", 0.0)
                         for op_name, op_info in file_entry["operations"].items():
                             status = op_info.get("status")
                             seconds = op_info.get("seconds")
                             output = file_entry["outputs"].get(op_name, "")
                             error = file_entry["errors"].get(op_name, "")
-                            writer.writerow([file_path, op_name, status, output, error, seconds])
+                            writer.writerow([file_path, op_name, status, output, error, seconds, extract_seconds])
 
         if report_payload is not None:
             if report_only:
@@ -456,26 +685,433 @@ class DocProcessor:
             }
 
         return results
+
+    def iter_batch_process(self,
+                           input_dir: Union[str, Path],
+                           output_dir: Union[str, Path],
+                           operations: List[str],
+                           workers: Optional[int] = None,
+                           executor: Optional[Executor] = None,
+                           incremental: bool = False,
+                           resume: bool = False,
+                           jsonl_report: Optional[Union[str, Path]] = None,
+                           include: Optional[List[str]] = None,
+                           exclude: Optional[List[str]] = None,
+                           file_list: Optional[Union[str, Path, Iterable[str]]] = None,
+                           pipeline: bool = False,
+                           io_workers: int = 2,
+                           dedupe: bool = False,
+                           dedupe_link: bool = False,
+                           schedule: Optional[str] = None,
+                           **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        逐个文件产出批处理结果，内存占用不随文件数量增长
+        
+        Args:
+            input_dir: 输入目录
+            output_dir: 输出目录
+            operations: 要执行的操作列表
+            workers: 并行进程数（大于 1 时使用进程池）
+            executor: 自定义执行器
+            incremental: 增量模式，跳过清单中未变化的文件
+            resume: 从检查点日志恢复，已完成的文件直接使用日志中的结果
+            jsonl_report: JSON Lines 报告路径，每处理完一个文件追加一行
+            include: 包含的文件模式（glob）
+            exclude: 排除的文件或目录模式（glob）
+            file_list: 换行分隔的文件清单（路径或 "-" 表示标准输入），提供时不再扫描目录
+            pipeline: 流水线模式，读取、计算、写出三个阶段并行
+            io_workers: 流水线模式下读取和写出阶段的线程数
+            dedupe: 内容相同的文件只处理一次，其余副本复制首个文件的输出
+            dedupe_link: 去重时用硬链接代替复制（失败时回退为复制）
+            schedule: 调度策略，longest_first 或 shortest_first；设置后按估计成本的顺序
+                处理并产出结果，条目中记录 index（输入顺序）与 estimated_cost
+            **kwargs: 操作参数；设置 translate_batch_size 时跨文件收集翻译片段，
+                按该大小成批交给翻译器
+            
+        Yields:
+            dict: 文件的报告条目，其中 results 字段为该文件的处理结果
+        """
+        input_path = Path(input_dir)
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        # 输出写在输入旁边时，下一次运行会把上次的输出当作输入再次处理
+        if input_path.is_dir() and os.path.samefile(input_path, output_path):
+            raise DocumentProcessError(f"输出目录不能与输入目录相同: {output_path}")
+
+        if file_list is not None:
+            files = list(read_file_list(file_list, input_path, self.supported_suffixes,
+                                        include=include, exclude=exclude))
+        else:
+            files = list(scan_batch_files(input_path, self.supported_suffixes, exclude_dir=output_path,
+                                          include=include, exclude=exclude))
+
+        params = operation_params(operations, kwargs, self.config)
+        journal = BatchJournal(output_path)
+        journaled = journal.replay(operations, params) if resume else {}
+
+        manifest = None
+        plan = [(file, None) for file in files]
+        if incremental:
+            manifest = BatchManifest(output_path)
+            manifest.load()
+            plan = [
+                (file, None if str(file) in journaled else
+                 manifest.match(file.relative_to(input_path).as_posix(), file, operations, params))
+                for file in files
+            ]
+
+        # 去重：按内容摘要与后缀找出重复文件，只处理每组中的第一个；
+        # 后缀决定提取方式（如 JSON 会重新排版），字节相同但格式不同的文件结果不同
+        digests = {}
+        duplicates = {}
+        originals = {}
+        if dedupe:
+            to_hash = [file for file, cached in plan if cached is None]
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as hash_pool:
+                for file, digest in zip(to_hash, hash_pool.map(file_sha256, to_hash)):
+                    digests[str(file)] = digest
+                    key = (digest, file.suffix.lower())
+                    if key in originals:
+                        duplicates[str(file)] = originals[key]
+                    else:
+                        originals[key] = str(file)
+        # 只保留仍有副本待输出的原文件结果，最后一个副本输出后释放
+        remaining = {}
+        for original in duplicates.values():
+            remaining[original] = remaining.get(original, 0) + 1
+        served = {}
+
+        if schedule is not None:
+            if schedule not in SCHEDULE_POLICIES:
+                raise DocumentProcessError(f"不支持的调度策略: {schedule}")
+            costs = {}
+            for file, cached in plan:
+                key = str(file)
+                costs[key] = costs[duplicates[key]] if key in duplicates else estimate_cost(file, operations)
+            # 稳定排序：成本相同时保持输入顺序，重复文件总排在原文件之后
+            positions = {str(file): index for index, (file, cached) in enumerate(plan)}
+            plan = sorted(plan, key=lambda item: costs[str(item[0])],
+                          reverse=schedule == "longest_first")
+
+        pending_files = (
+            file for file, cached in plan
+            if cached is None and str(file) not in journaled and str(file) not in duplicates
+        )
+        if pipeline:
+            processed = pipeline_batch_files(
+                self, pending_files, input_path, output_path, operations, kwargs,
+                workers=workers, executor=executor, io_workers=io_workers
+            )
+        else:
+            processed = map_batch_files(
+                self, pending_files, input_path, output_path, operations, kwargs,
+                workers=workers, executor=executor
+            )
+        if "translate" in operations and kwargs.get("translate_batch_size"):
+            processed = batch_translate_files(self, processed, kwargs)
+        journal.open(operations, params, resume=bool(journaled))
+        report_file = open(jsonl_report, "w", encoding="utf-8") if jsonl_report else None
+        completed = False
+        try:
+            for file, cached in plan:
+                offset = journaled.get(str(file))
+                record = journal.read(offset) if offset is not None else None
+                if record is not None:
+                    file_results, file_entry = record["results"], record["entry"]
+                else:
+                    if cached is not None:
+                        file_results, file_entry = skipped_file_result(file, operations, cached)
+                    elif str(file) in duplicates:
+                        original_results, original_entry = served[duplicates[str(file)]]
+                        file_results, file_entry = duplicate_file_result(
+                            file, input_path, output_path, original_results, original_entry,
+                            link=dedupe_link
+                        )
+                    else:
+                        file_results, file_entry = next(processed)
+                    if schedule is not None:
+                        file_entry["estimated_cost"] = round(costs[str(file)], 1)
+                    journal.append(file_entry, file_results)
+                if schedule is not None:
+                    # 从日志恢复的条目也标注输入位置，便于调用方恢复顺序
+                    file_entry["index"] = positions[str(file)]
+                if str(file) in remaining:
+                    served[str(file)] = (dict(file_results), json.loads(json.dumps(file_entry)))
+                elif str(file) in duplicates:
+                    original = duplicates[str(file)]
+                    remaining[original] -= 1
+                    if not remaining[original]:
+                        del remaining[original]
+                        served.pop(original, None)
+                # 跳过的文件已在匹配时计入清单，从日志恢复的记录需要重新登记
+                if (manifest is not None and not file_entry["errors"]
+                        and (cached is None or record is not None)):
+                    manifest.record(file.relative_to(input_path).as_posix(), file,
+                                    operations, params, file_entry["outputs"],
+                                    sha256=digests.get(str(file)))
+                if report_file is not None:
+                    report_file.write(json.dumps(file_entry, ensure_ascii=False) + "\n")
+                    report_file.flush()
+                file_entry["results"] = file_results
+                yield file_entry
+            completed = True
+        finally:
+            processed.close()
+            journal.close(completed=completed)
+            if report_file is not None:
+                report_file.close()
+            if manifest is not None:
+                manifest.save()
     
+    def _process_batch_file(self,
+                            file: Path,
+                            input_dir: Path,
+                            output_dir: Path,
+                            operations: List[str],
+                            options: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """处理批任务中的单个文件，返回 (文件结果, 报告条目)"""
+        loaded = self._batch_extract(file, operations)
+        computed = self._batch_compute(loaded["text"], operations, options,
+                                       extract_error=loaded["error"], digest=loaded["digest"])
+        return self._batch_write(file, input_dir, output_dir, operations, options, loaded, computed)
+
+    def _batch_extract(self, file: Path, operations: List[str]) -> Dict[str, Any]:
+        """批处理读取阶段：每个文件只提取一次，供所有操作共享"""
+        loaded = {"content": None, "text": None, "error": None, "digest": None, "seconds": 0.0}
+        if any(operation in BATCH_EXTRACT_OPERATIONS for operation in operations):
+            start = time.time()
+            try:
+                loaded["content"] = load_document(file)
+                loaded["text"] = ensure_text(loaded["content"])
+                # 结果缓存按文件的字节摘要记录，与按路径调用及 invalidate_results 一致
+                if self.result_cache is not None:
+                    loaded["digest"] = file_sha256(file)
+            except Exception as e:
+                loaded["error"] = str(e)
+            loaded["seconds"] = time.time() - start
+        return loaded
+
+    def _batch_compute(self,
+                       text: Optional[str],
+                       operations: List[str],
+                       options: Dict[str, Any],
+                       extract_error: Optional[str] = None,
+                       digest: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """批处理计算阶段：执行摘要/翻译/分析，不读写文件；digest 为文件的字节摘要"""
+        computed = {}
+        for operation in operations:
+            if operation not in BATCH_COMPUTE_OPERATIONS:
+                continue
+            op_start = time.time()
+            op_kwargs = operation_kwargs(operation, options)
+            try:
+                if extract_error is not None:
+                    raise DocumentProcessError(extract_error)
+                if operation == "summarize":
+                    value = self.generate_summary(text=text, content_hash=digest, **op_kwargs)
+                elif operation == "translate":
+                    if options.get("translate_batch_size"):
+                        # 延后到语料级批量翻译阶段（见 _batch_translate）
+                        computed[operation] = {"deferred": True, "seconds": 0.0}
+                        continue
+                    op_kwargs.setdefault("target_language", "en")
+                    value = self.translate(None, text=text, content_hash=digest, **op_kwargs)
+                else:
+                    value = self.analyze(text=text, content_hash=digest, **op_kwargs)
+                computed[operation] = {"value": value}
+            except Exception as e:
+                computed[operation] = {"error": str(e)}
+            computed[operation]["seconds"] = time.time() - op_start
+        return computed
+
+    def _batch_write(self,
+                     file: Path,
+                     input_dir: Path,
+                     output_dir: Path,
+                     operations: List[str],
+                     options: Dict[str, Any],
+                     loaded: Dict[str, Any],
+                     computed: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """批处理写出阶段：保存输出文件（转换操作在此完成），返回 (文件结果, 报告条目)"""
+        file_results = {}
+        file_entry = {
+            "path": str(file),
+            "status": "ok",
+            "operations": {},
+            "outputs": {},
+            "errors": {},
+            "extract_seconds": round(loaded["seconds"], 4),
+            "seconds": 0.0
+        }
+        file_seconds = loaded["seconds"]
+
+        for operation in operations:
+            op_start = time.time()
+            op_result = computed.get(operation, {})
+            status = "ok"
+            try:
+                rel_path = file.relative_to(input_dir)
+                target_dir = output_dir / rel_path.parent
+                target_dir.mkdir(parents=True, exist_ok=True)
+                if "error" in op_result:
+                    raise DocumentProcessError(op_result["error"])
+
+                if operation == "summarize":
+                    summary = op_result["value"]
+                    file_results["summary"] = summary
+                    output_file = target_dir / f"{file.stem}.summary.txt"
+                    save_document(summary, output_file)
+                    file_results["summary_output"] = str(output_file)
+                    file_entry["outputs"]["summarize"] = str(output_file)
+                elif operation == "translate":
+                    target_language = options.get("target_language") or "en"
+                    output_file = target_dir / f"{file.stem}.translated.{target_language}.txt"
+                    if op_result.get("deferred"):
+                        file_results["translation"] = None
+                        file_entry["_deferred_translation"] = {"text": loaded["text"], "output": str(output_file)}
+                        status = "pending"
+                    else:
+                        translation = op_result["value"]
+                        file_results["translation"] = translation
+                        save_document(translation, output_file)
+                    file_results["translation_output"] = str(output_file)
+                    file_entry["outputs"]["translate"] = str(output_file)
+                elif operation == "analyze":
+                    analysis = op_result["value"]
+                    file_results["analysis"] = analysis
+                    output_file = target_dir / f"{file.stem}.analysis.json"
+                    save_document(analysis, output_file)
+                    file_results["analysis_output"] = str(output_file)
+                    file_entry["outputs"]["analyze"] = str(output_file)
+                elif operation == "convert":
+                    if loaded["error"] is not None:
+                        raise DocumentProcessError(loaded["error"])
+                    output_format = options.get("output_format")
+                    if not output_format:
+                        raise DocumentProcessError("convert 操作需要提供 output_format")
+                    normalized_format = output_format.lower().lstrip('.')
+                    if any(sep in normalized_format for sep in ["/", "\\"]):
+                        raise DocumentProcessError("convert 输出格式无效")
+                    normalized_format = f".{normalized_format}"
+                    if normalized_format not in self.converter.supported_formats:
+                        raise DocumentProcessError(f"convert 不支持的输出格式: {normalized_format}")
+                    output_file = target_dir / f"{file.stem}{normalized_format}"
+                    self.convert(file, output_file, content=loaded["content"])
+                    file_results["converted_output"] = str(output_file)
+                    file_entry["outputs"]["convert"] = str(output_file)
+                else:
+                    file_results[operation] = "Error: Unsupported operation"
+                    file_entry["errors"][operation] = "Unsupported operation"
+            except Exception as e:
+                file_results[operation] = f"Error: {str(e)}"
+                file_entry["errors"][operation] = str(e)
+                file_entry["status"] = "error"
+                status = "error"
+            op_seconds = op_result.get("seconds", 0.0) + time.time() - op_start
+            file_seconds += op_seconds
+            file_entry["operations"][operation] = {
+                "status": status,
+                "seconds": round(op_seconds, 4)
+            }
+
+        file_entry["seconds"] = round(file_seconds, 4)
+        return file_results, file_entry
+
+    def _batch_translate(self,
+                         records: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                         options: Dict[str, Any]) -> None:
+        """
+        语料级批量翻译：把多个文件中延后的翻译按行切分为片段，一次交给翻译器，
+        再把译文拼回各文件并写出
+        """
+        source_lang, target_lang = self._normalize_languages(
+            options.get("target_language") or "en", options.get("source_language")
+        )
+        segments = []
+        layouts = []
+        for file_results, file_entry in records:
+            pending = file_entry.get("_deferred_translation")
+            if pending is None:
+                continue
+            layout = []
+            for line in pending["text"].split("\n"):
+                if line.strip():
+                    layout.append(len(segments))
+                    segments.append(line)
+                else:
+                    layout.append(line)
+            layouts.append((file_results, file_entry, layout))
+
+        start = time.time()
+        error = None
+        translated = []
+        if segments:
+            try:
+                translated = self.translator.translate(
+                    segments, source_lang, target_lang,
+                    batch_size=options["translate_batch_size"]
+                )
+            except Exception as e:
+                error = f"翻译失败: {str(e)}"
+        elapsed = time.time() - start
+
+        for file_results, file_entry, layout in layouts:
+            pending = file_entry.pop("_deferred_translation")
+            share = sum(1 for item in layout if isinstance(item, int))
+            op_seconds = elapsed * share / len(segments) if segments else 0.0
+            write_start = time.time()
+            try:
+                if error is not None:
+                    raise DocumentProcessError(error)
+                translation = "\n".join(
+                    translated[item] if isinstance(item, int) else item for item in layout
+                )
+                save_document(translation, pending["output"])
+                file_results["translation"] = translation
+                status = "ok"
+            except Exception as e:
+                file_results.pop("translation", None)
+                file_results.pop("translation_output", None)
+                file_entry["outputs"].pop("translate", None)
+                file_results["translate"] = f"Error: {str(e)}"
+                file_entry["errors"]["translate"] = str(e)
+                file_entry["status"] = "error"
+                status = "error"
+            op_seconds += time.time() - write_start
+            file_entry["operations"]["translate"] = {
+                "status": status,
+                "seconds": round(op_seconds, 4)
+            }
+            file_entry["seconds"] = round(file_entry["seconds"] + op_seconds, 4)
+
     def compare_documents(
         self,
-        document1_path: Union[str, Path],
-        document2_path: Union[str, Path]
+        document1_path: DocumentSource,
+        document2_path: DocumentSource
     ) -> Dict[str, Any]:
         """
         比较两个文档
         
         Args:
-            document1_path: 第一个文档路径
-            document2_path: 第二个文档路径
+            document1_path: 第一个文档路径（或 name 带后缀的内存文件对象）
+            document2_path: 第二个文档路径（或 name 带后缀的内存文件对象）
             
         Returns:
             dict: 比较结果（相似度、差异等）
         """
-        content1 = ensure_text(load_document(document1_path))
-        content2 = ensure_text(load_document(document2_path))
-        
-        return self.comparator.compare(content1, content2)
+        digest = suffix1 = suffix2 = None
+        if self.result_cache is not None:
+            # 比较结果以两份文档摘要的组合为键，按单个文档失效时不会删除
+            digest1, suffix1, document1_path = document_digest(document1_path)
+            digest2, suffix2, document2_path = document_digest(document2_path)
+            digest = hashlib.sha256(f"{digest1}{suffix1}:{digest2}{suffix2}".encode('utf-8')).hexdigest()
+
+        def compute() -> Dict[str, Any]:
+            content1 = ensure_text(load_document(document1_path, file_format=suffix1))
+            content2 = ensure_text(load_document(document2_path, file_format=suffix2))
+            return self.comparator.compare(content1, content2)
+
+        return self._cached("compare", digest, {}, compute)
     
     def merge_documents(
         self,
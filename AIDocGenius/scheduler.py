@@ -0,0 +1,260 @@
+"""
+推理调度模块
+
+并发的摘要请求各自调用一次 model.generate 时，模型每次只处理一篇文档。
+InferenceScheduler 把请求放入队列，由一个工作线程最多等待 max_wait 秒、
+凑够 max_batch_size 个请求后合并成一批调用 Summarizer.generate_batch_summaries，
+再把结果分别交给各请求的 Future。
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .exceptions import SummarizationError
+
+if TYPE_CHECKING:
+    from .summarizer import Summarizer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# 通知工作线程退出的队列标记
+_STOP = object()
+
+
+def _depth_bucket(depth: int) -> str:
+    """队列深度直方图的区间：1、2-3、4-7、8-15……"""
+    if depth <= 1:
+        return str(depth)
+    low = 1 << (depth.bit_length() - 1)
+    return f"{low}-{2 * low - 1}"
+
+
+class InferenceScheduler:
+    """
+    摘要请求的微批调度器
+
+    只有使用生成式模型的请求会排队合并；simple/textrank 摘要在调用线程中直接完成。
+    参数（max_length、ratio 等）不同的请求在同一批中分组生成。
+    """
+
+    def __init__(self,
+                 summarizer: "Summarizer",
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        """
+        初始化调度器
+
+        Args:
+            summarizer: 执行摘要的 Summarizer
+            max_batch_size: 每批最多合并的请求数
+            max_wait_ms: 收到一批的第一个请求后最多再等待的毫秒数
+        """
+        self.summarizer = summarizer
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.requests = 0
+        self.inline = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.cancelled = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self.queue_depths: Dict[str, int] = {}
+        self.max_queue_depth = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, text: str, **kwargs) -> Future:
+        """
+        提交一个摘要请求
+
+        Args:
+            text: 输入文本
+            **kwargs: 传递给 generate_summary 的参数
+
+        Returns:
+            Future: 完成后结果为摘要文本；生成出错时为对应异常
+        """
+        future: Future = Future()
+        if not self.summarizer.uses_model(kwargs.get("mode")):
+            # 不调用模型的摘要没有合批的收益，直接计算
+            with self._lock:
+                self.requests += 1
+                self.inline += 1
+            try:
+                future.set_result(self.summarizer.generate_summary(text, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        with self._lock:
+            if self._closed:
+                raise SummarizationError("Inference scheduler is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="aidocgenius-inference", daemon=True)
+                self._worker.start()
+            self.requests += 1
+            self._queue.put((future, text, kwargs))
+            depth = self._queue.qsize()
+            bucket = _depth_bucket(depth)
+            self.queue_depths[bucket] = self.queue_depths.get(bucket, 0) + 1
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+        return future
+
+    def summarize(self, text: str, timeout: Optional[float] = None, **kwargs) -> str:
+        """
+        提交请求并等待摘要
+
+        Args:
+            text: 输入文本
+            timeout: 最长等待秒数，None 表示一直等待
+            **kwargs: 传递给 generate_summary 的参数
+
+        Returns:
+            str: 生成的摘要
+        """
+        return self.submit(text, **kwargs).result(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[Future, str, Dict[str, Any]]]) -> None:
+        """按参数分组生成一批摘要，并把结果交给各请求；每个参数组计为一个批次"""
+        groups: Dict[str, List[Tuple[Future, str, Dict[str, Any]]]] = {}
+        cancelled = 0
+        for future, text, kwargs in batch:
+            if future.set_running_or_notify_cancel():
+                key = json.dumps(kwargs, sort_keys=True, default=str)
+                groups.setdefault(key, []).append((future, text, kwargs))
+            else:
+                cancelled += 1
+
+        with self._lock:
+            self.cancelled += cancelled
+            # 只统计实际执行的批次：已取消的请求不计入，参数不同的请求分别成批
+            for items in groups.values():
+                self.batches += 1
+                self.batch_sizes[len(items)] = self.batch_sizes.get(len(items), 0) + 1
+
+        for items in groups.values():
+            kwargs = items[0][2]
+            try:
+                summaries = self.summarizer.generate_batch_summaries(
+                    [text for _, text, _ in items],
+                    batch_size=self.max_batch_size,
+                    **kwargs
+                )
+            except Exception as e:
+                logger.error(f"Batched summarization failed: {str(e)}")
+                with self._lock:
+                    self.failed_batches += 1
+                for future, _, _ in items:
+                    future.set_exception(e)
+                continue
+            for (future, _, _), summary in zip(items, summaries):
+                future.set_result(summary)
+
+    def queue_depth(self) -> int:
+        """当前排队等待的请求数"""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        调度统计
+
+        Returns:
+            dict: 配置、当前与最大队列深度、请求数、已取消的请求数、批次数、平均批大小，
+                批大小直方图（批大小 -> 批次数）与入队时队列深度直方图
+        """
+        with self._lock:
+            batched = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "inline_requests": self.inline,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "cancelled_requests": self.cancelled,
+                "average_batch_size": round(batched / self.batches, 3) if self.batches else 0.0,
+                "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+                "queue_depths": dict(sorted(self.queue_depths.items(), key=lambda item: int(item[0].split("-")[0])))
+            }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        停止接收新请求；已排队的请求处理完后工作线程退出
+
+        Args:
+            timeout: 等待工作线程退出的秒数，None 表示一直等待
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+        if worker is not None:
+            self._queue.put(_STOP)
+            worker.join(timeout)
+
+
+def scheduler_from_config(summarizer: "Summarizer",
+                          config: Optional[Dict[str, Any]]) -> Optional[InferenceScheduler]:
+    """
+    按 DocProcessor 的 config["scheduler"] 创建推理调度器
+
+    未给出的参数读取环境变量 INFERENCE_MAX_BATCH_SIZE 与 INFERENCE_MAX_WAIT_MS；
+    config 中没有 scheduler 项时，设置了这两个环境变量之一才启用。
+
+    Args:
+        summarizer: 执行摘要的 Summarizer
+        config: {"enabled": bool, "max_batch_size": int, "max_wait_ms": float}
+
+    Returns:
+        Optional[InferenceScheduler]: 调度器，未启用时为 None
+    """
+    max_batch_size = os.getenv("INFERENCE_MAX_BATCH_SIZE")
+    max_wait_ms = os.getenv("INFERENCE_MAX_WAIT_MS")
+    if config is None:
+        if not max_batch_size and not max_wait_ms:
+            return None
+        config = {}
+    if not isinstance(config, dict) or not config.get("enabled", True):
+        return None
+    max_batch_size = config.get("max_batch_size", max_batch_size)
+    max_wait_ms = config.get("max_wait_ms", max_wait_ms)
+    return InferenceScheduler(
+        summarizer,
+        max_batch_size=int(max_batch_size) if max_batch_size not in (None, "") else DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms=float(max_wait_ms) if max_wait_ms not in (None, "") else DEFAULT_MAX_WAIT_MS
+    )
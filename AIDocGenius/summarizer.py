@@ -1,19 +1,231 @@
 """
 摘要生成器模块
 """
+import hashlib
+import importlib.util
+import json
+import math
 import os
-from typing import List, Optional, Union
+import re
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from pathlib import Path
 
-try:
-    import torch
-    from transformers import AutoTokenizer, AutoModelForSeq2SeqGeneration
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    torch = None
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
 
 from .exceptions import SummarizationError
+from .models import (
+    TRANSFORMERS_AVAILABLE, configure_inference_threads, get_model_registry, load_pretrained,
+    prepare_for_inference, registry_device, resolve_device
+)
+
+# simple: 取前 N 句；textrank: TF-IDF + 图中心度抽取句子；model: 生成式模型
+SUMMARY_MODES = ("simple", "textrank", "model")
+
+# 分层摘要最多归并的层数，防止部分摘要无法继续缩短时无限递归
+MAX_REDUCE_LEVELS = 8
+
+_SENTENCE_PATTERN = re.compile(r'[^。！？.!?]+[。！？.!?]?')
+# 英文按单词、中文按相邻两字切分词项；\x00 用作句子分隔标记
+_WORD_PATTERN = re.compile(r'[a-z0-9]+|\x00')
+_CJK_FIRST, _CJK_LAST = 0x4e00, 0x9fff
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    按中英文句末标点切分句子（保留标点）
+    
+    Args:
+        text: 输入文本
+        
+    Returns:
+        List[str]: 去除首尾空白后的非空句子
+    """
+    sentences = _SENTENCE_PATTERN.findall(text)
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def _term_coordinates(sentences: List[str]):
+    """
+    把句子切成词项，返回稀疏词频矩阵的 (行, 列) 坐标与词表大小
+    
+    全部句子以 \x00 连接后整体处理：英文单词一次 findall 取出，按分隔标记的累计数
+    还原所在句子；中文转为码点数组，相邻两个汉字组成一个词项（孤立的单字自成词项），
+    全程不逐句循环。
+    """
+    import numpy as np
+
+    joined = "\x00".join(sentence.replace("\x00", " ") for sentence in sentences).lower()
+
+    words = _WORD_PATTERN.findall(joined)
+    vocabulary = {word: index for index, word in enumerate(dict.fromkeys(words))}
+    word_ids = np.fromiter(map(vocabulary.__getitem__, words), dtype=np.int64, count=len(words))
+    separator = vocabulary.get("\x00", -1)
+    is_separator = word_ids == separator
+    word_rows = np.cumsum(is_separator)[~is_separator]
+    word_ids = word_ids[~is_separator]
+    # 分隔符占用的编号留空即可，不影响后续计算
+    vocabulary_size = len(vocabulary)
+
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    char_rows = np.cumsum(codes == 0)
+    cjk = (codes >= _CJK_FIRST) & (codes <= _CJK_LAST)
+    pair = cjk[:-1] & cjk[1:]
+    single = cjk.copy()
+    single[:-1] &= ~cjk[1:]
+    single[1:] &= ~cjk[:-1]
+    bigram_positions = np.flatnonzero(pair)
+    single_positions = np.flatnonzero(single)
+    cjk_keys = np.concatenate([
+        (codes[bigram_positions] << 16) | codes[bigram_positions + 1],
+        codes[single_positions]
+    ])
+    cjk_rows = np.concatenate([char_rows[bigram_positions], char_rows[single_positions]])
+    cjk_terms, cjk_ids = np.unique(cjk_keys, return_inverse=True)
+
+    rows = np.concatenate([word_rows, cjk_rows])
+    cols = np.concatenate([word_ids, cjk_ids.ravel() + vocabulary_size])
+    return rows, cols, vocabulary_size + len(cjk_terms)
+
+
+def textrank_scores(sentences: List[str],
+                    damping: float = 0.85,
+                    max_iter: int = 100,
+                    tol: float = 1e-6) -> List[float]:
+    """
+    计算句子的 TextRank（LexRank）中心度
+    
+    句子表示为 L2 归一化的 TF-IDF 稀疏向量，相似度矩阵 S = X·Xᵀ（去掉对角线）
+    不显式构造，幂迭代每步只做两次按稀疏坐标的 bincount，复杂度与非零项数成正比，
+    上万句的文档也只需毫秒级时间。
+    
+    Args:
+        sentences: 句子列表
+        damping: 阻尼系数
+        max_iter: 最大迭代次数
+        tol: 收敛阈值（L1 变化量）
+        
+    Returns:
+        List[float]: 与句子一一对应的得分，和为 1
+    """
+    import numpy as np
+
+    n = len(sentences)
+    if n == 0:
+        return []
+
+    rows, cols, vocabulary_size = _term_coordinates(sentences)
+    if not len(rows):
+        return [1.0 / n] * n
+
+    # 合并同一句中的重复词项，得到 (句子, 词项, 词频) 的稀疏坐标
+    keys, counts = np.unique(rows * vocabulary_size + cols, return_counts=True)
+    rows = keys // vocabulary_size
+    cols = keys % vocabulary_size
+
+    df = np.bincount(cols, minlength=vocabulary_size)
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    values = (1.0 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n))
+    values = values / norms[rows]
+    has_terms = norms > 0
+
+    def similarity(vector):
+        # S·v = X·(Xᵀ·v) - v，对角线（自身相似度为 1）不参与
+        projected = np.bincount(cols, weights=values * vector[rows], minlength=vocabulary_size)
+        return np.bincount(rows, weights=values * projected[cols], minlength=n) - vector * has_terms
+
+    degree = similarity(np.ones(n))
+    dangling = degree <= 1e-12
+    safe_degree = np.where(dangling, 1.0, degree)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = similarity(np.where(dangling, 0.0, scores / safe_degree))
+        updated = (1.0 - damping) / n + damping * (spread + scores[dangling].sum() / n)
+        converged = np.abs(updated - scores).sum() < tol
+        scores = updated
+        if converged:
+            break
+    return scores.tolist()
+
+def chunk_sentences(sentences: List[str],
+                    token_counts: List[int],
+                    max_tokens: int,
+                    overlap_tokens: int = 0) -> List[str]:
+    """
+    按句子边界把文本切成不超过 max_tokens 的块，相邻块重叠若干句
+    
+    块边界由内容决定：块已填满一半以上时，在句子 CRC32 满足条件的位置切开，
+    否则在放不下下一句时切开。文档局部修改后，修改处之后的边界很快与原来对齐，
+    未改动的块保持不变，可以直接命中块摘要缓存。单句超过上限时独立成块。
+    
+    Args:
+        sentences: 句子列表
+        token_counts: 每句的 token 数
+        max_tokens: 每块 token 上限
+        overlap_tokens: 从上一块末尾带入下一块的 token 数上限
+        
+    Returns:
+        List[str]: 块文本列表
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def cut(next_tokens: int):
+        # 输出当前块，并把末尾不超过 overlap_tokens 的句子带入下一块
+        chunks.append(_join_sentences(sentences[i] for i in current))
+        carried = []
+        carried_tokens = 0
+        for previous in reversed(current):
+            added = carried_tokens + token_counts[previous]
+            if added > overlap_tokens or added + next_tokens > max_tokens:
+                break
+            carried.insert(0, previous)
+            carried_tokens = added
+        return carried, carried_tokens
+
+    for index, count in enumerate(token_counts):
+        if current and current_tokens + count > max_tokens:
+            current, current_tokens = cut(count)
+        current.append(index)
+        current_tokens += count
+        is_last = index == len(token_counts) - 1
+        if not is_last and current_tokens * 2 >= max_tokens \
+                and zlib.crc32(sentences[index].encode("utf-8")) % 4 == 0:
+            current, current_tokens = cut(token_counts[index + 1])
+    if current:
+        chunks.append(_join_sentences(sentences[i] for i in current))
+    return chunks
+
+
+def length_buckets(lengths: List[int], batch_size: int) -> List[List[int]]:
+    """
+    按长度排序后每 batch_size 个分为一批，长度相近的输入同批以减少填充
+
+    Args:
+        lengths: 每个输入的长度（token 数）
+        batch_size: 每批的输入数
+
+    Returns:
+        List[List[int]]: 每批输入在原列表中的下标
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batch_size = max(1, batch_size)
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def _join_sentences(sentences: Iterable[str]) -> str:
+    # 英文句子（或不带标点的部分摘要）之间保留一个空格，中文直接相连
+    summary = ""
+    for sentence in sentences:
+        if summary and summary[-1].isascii() and sentence[0].isascii():
+            summary += " "
+        summary += sentence
+    return summary
+
 
 class Summarizer:
     """文档摘要生成器"""
@@ -27,7 +239,15 @@ class Summarizer:
         use_simple: bool = True,
         use_small_model: bool = False,
         max_input_length: Optional[int] = None,
-        cache_dir: Optional[str] = None
+        cache_dir: Optional[str] = None,
+        mode: Optional[str] = None,
+        hierarchical: bool = False,
+        chunk_overlap: int = 64,
+        chunk_summary_length: int = 128,
+        batch_size: int = 8,
+        chunk_cache_size: int = 1024,
+        cpu_optimize: bool = False,
+        num_threads: Optional[int] = None
     ):
         """
         初始化摘要生成器
@@ -38,14 +258,27 @@ class Summarizer:
             max_length: 最大输出长度
             min_length: 最小输出长度
             use_simple: 是否使用简单摘要算法（无需模型）
+            mode: 摘要方式，见 SUMMARY_MODES；None 时由 use_simple/use_small_model 决定
+            hierarchical: 模型模式下，超出 max_input_length 的文本分块摘要后再逐层归并
+            chunk_overlap: 相邻块重叠的 token 数上限
+            chunk_summary_length: 每块摘要的最大长度（token）
+            batch_size: 每次 generate 调用处理的块数
+            chunk_cache_size: 块摘要缓存的条目数上限
+            cpu_optimize: CPU 上对模型做动态 int8 量化，并固定 torch 线程数
+            num_threads: CPU 优化模式下的 torch 线程数，None 表示按工作进程数均分核心
         """
         if use_small_model:
             use_simple = False
             if not model_name:
                 model_name = "google/flan-t5-small"
+        if mode is None:
+            mode = "simple" if use_simple else "model"
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unsupported summary mode: {mode}")
 
-        self.use_simple = use_simple or not TRANSFORMERS_AVAILABLE
-        self.device = device or ("cuda" if torch and torch.cuda.is_available() else "cpu")
+        self.mode = mode
+        self.use_simple = mode != "model" or not TRANSFORMERS_AVAILABLE
+        self._device = device
         self.max_length = max_length
         self.min_length = min_length
         self.model_name = model_name or "IDEA-CCNL/Randeng-Pegasus-238M-Summary-Chinese"
@@ -56,6 +289,16 @@ class Summarizer:
             else:
                 max_input_length = 1024
         self.max_input_length = max_input_length
+        self.hierarchical = hierarchical
+        self.chunk_overlap = chunk_overlap
+        self.chunk_summary_length = chunk_summary_length
+        self.batch_size = max(1, batch_size)
+        self.chunk_cache_size = chunk_cache_size
+        self._chunk_cache: "OrderedDict[str, str]" = OrderedDict()
+        self.chunk_cache_hits = 0
+        self.chunk_cache_misses = 0
+        self.cpu_optimize = cpu_optimize
+        self.num_threads = num_threads
         
         if not self.use_simple and TRANSFORMERS_AVAILABLE:
             try:
@@ -65,9 +308,49 @@ class Summarizer:
                 self.use_simple = True
                 print(f"警告: 加载摘要模型失败，将使用简单摘要算法: {str(e)}")
 
-    def _load_model(self) -> None:
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, cache_dir=self.cache_dir)
-        self.model = AutoModelForSeq2SeqGeneration.from_pretrained(self.model_name, cache_dir=self.cache_dir).to(self.device)
+    @property
+    def device(self) -> str:
+        """运行设备；首次访问时才检测（见 models.resolve_device）"""
+        if self._device is None:
+            self._device = resolve_device()
+        return self._device
+
+    def _load_model(self):
+        """从进程级模型注册表获取 (模型, 分词器)，同名同设备的模型只加载一次"""
+        if self.cpu_optimize:
+            configure_inference_threads(self.num_threads)
+
+        def loader():
+            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name, cache_dir=self.cache_dir)
+            model = load_pretrained(AutoModelForSeq2SeqLM, self.model_name, cache_dir=self.cache_dir)
+            return prepare_for_inference(model, self.device, self.cpu_optimize), tokenizer
+
+        return get_model_registry().get(
+            self.model_name, registry_device(self.device, self.cpu_optimize), loader
+        )
+
+    @property
+    def model(self):
+        """摘要模型；被注册表淘汰后在下次使用时重新加载"""
+        return self._load_model()[0]
+
+    @property
+    def tokenizer(self):
+        """模型对应的分词器"""
+        return self._load_model()[1]
+
+    def uses_model(self, mode: Optional[str] = None) -> bool:
+        """
+        按 mode 摘要时是否调用生成式模型
+
+        Args:
+            mode: 摘要方式，None 表示实例的 mode
+
+        Returns:
+            bool: 模型可用且摘要方式为 model 时为 True
+        """
+        return (mode or self.mode) == "model" and not self.use_simple and TRANSFORMERS_AVAILABLE
 
     def warmup(self) -> None:
         """预热模型并验证可用性"""
@@ -75,8 +358,7 @@ class Summarizer:
             return
         if not TRANSFORMERS_AVAILABLE:
             raise SummarizationError("transformers is not available")
-        if not hasattr(self, "tokenizer") or not hasattr(self, "model"):
-            self._load_model()
+        self._load_model()
     
     def generate_summary(
         self,
@@ -86,7 +368,9 @@ class Summarizer:
         ratio: Optional[float] = None,
         num_beams: int = 4,
         length_penalty: float = 2.0,
-        no_repeat_ngram_size: int = 3
+        no_repeat_ngram_size: int = 3,
+        mode: Optional[str] = None,
+        hierarchical: Optional[bool] = None
     ) -> str:
         """
         生成文本摘要
@@ -95,6 +379,8 @@ class Summarizer:
             text: 输入文本
             max_length: 最大输出长度
             min_length: 最小输出长度
+            mode: 本次使用的摘要方式（simple/textrank），None 表示实例的 mode
+            hierarchical: 是否对长文本分层摘要（仅用于模型），None 表示实例的设置
             num_beams: beam search的beam数量（仅用于模型）
             length_penalty: 长度惩罚系数（仅用于模型）
             no_repeat_ngram_size: 避免重复的n-gram大小（仅用于模型）
@@ -102,53 +388,238 @@ class Summarizer:
         Returns:
             str: 生成的摘要
         """
-        if ratio is not None:
-            ratio = max(0.0, min(1.0, ratio))
-            ratio_length = int(len(text) * ratio)
-            if max_length is None:
-                max_length = ratio_length
-            else:
-                max_length = min(max_length, ratio_length)
+        max_length = self._ratio_length(text, max_length, ratio)
 
-        if self.use_simple:
+        mode = mode or self.mode
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unsupported summary mode: {mode}")
+        if mode == "textrank":
+            return self._generate_textrank_summary(text, max_length, min_length)
+        if self.use_simple or mode == "simple":
             return self._generate_simple_summary(text, max_length, min_length)
         
         if not TRANSFORMERS_AVAILABLE:
             return self._generate_simple_summary(text, max_length, min_length)
             
+        generation = {
+            "num_beams": num_beams,
+            "length_penalty": length_penalty,
+            "no_repeat_ngram_size": no_repeat_ngram_size
+        }
         try:
-            # 编码输入
-            prompt = text
-            if "t5" in self.model_name.lower():
-                prompt = f"summarize: {text}"
+            if self.hierarchical if hierarchical is None else hierarchical:
+                return self._generate_hierarchical_summary(text, max_length, min_length, **generation)
+            return self._generate_batch(
+                [text],
+                max_length or self.max_length,
+                min_length or self.min_length,
+                **generation
+            )[0]
+            
+        except Exception as e:
+            # 如果模型生成失败，回退到简单摘要
+            return self._generate_simple_summary(text, max_length, min_length)
+
+    @staticmethod
+    def _ratio_length(text: str, max_length: Optional[int], ratio: Optional[float]) -> Optional[int]:
+        """指定 ratio 时，把 max_length 限制在全文长度的 ratio 倍以内"""
+        if ratio is None:
+            return max_length
+        ratio_length = int(len(text) * max(0.0, min(1.0, ratio)))
+        return ratio_length if max_length is None else min(max_length, ratio_length)
+
+    @property
+    def _chunk_budget(self) -> int:
+        """分层摘要每块的 token 上限，为 "summarize: " 前缀和特殊 token 预留空间"""
+        return max(32, self.max_input_length - 16)
+
+    def generate_summary_stream(
+        self,
+        paragraphs: Iterable[str],
+        max_length: Optional[int] = None,
+        min_length: Optional[int] = None,
+        ratio: Optional[float] = None,
+        **kwargs
+    ) -> str:
+        """
+        从段落流生成摘要，只保留摘要所需的开头部分
+        
+        简单摘要只取前若干句，模型输入会截断到 max_input_length，因此读到足够的
+        开头文本即可停止；指定 ratio 时会继续读完全文以统计总长度，但不保留内容。
+        
+        Args:
+            paragraphs: 段落迭代器（如 utils.stream_document 的输出）
+            max_length: 最大输出长度
+            min_length: 最小输出长度
+            ratio: 摘要长度占全文的比例
+            **kwargs: 传递给generate_summary的参数
+            
+        Returns:
+            str: 生成的摘要
+        """
+        hierarchical = kwargs.get("hierarchical")
+        if hierarchical is None:
+            hierarchical = self.hierarchical
+        if self.mode == "textrank" or kwargs.get("mode") == "textrank" \
+                or (hierarchical and not self.use_simple):
+            # 抽取式排序和分层摘要需要看到全部句子
+            budget = math.inf
+        elif self.use_simple:
+            budget = 4 * max(max_length or 200, min_length or 0, 200)
+        else:
+            # 按每个 token 约 4 个字符估算模型能接收的文本长度
+            budget = 4 * self.max_input_length
+
+        head = []
+        head_length = 0
+        total_length = 0
+        for paragraph in paragraphs:
+            if total_length:
+                total_length += 2
+            total_length += len(paragraph)
+            if head_length < budget:
+                head.append(paragraph)
+                head_length += len(paragraph) + 2
+            elif ratio is None:
+                break
 
-            inputs = self.tokenizer(
-                prompt,
-                max_length=self.max_input_length,
-                truncation=True,
+        if ratio is not None:
+            ratio_length = int(total_length * max(0.0, min(1.0, ratio)))
+            max_length = ratio_length if max_length is None else min(max_length, ratio_length)
+
+        return self.generate_summary('\n\n'.join(head), max_length=max_length,
+                                     min_length=min_length, **kwargs)
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """批量统计每段文本的 token 数（不含特殊 token）"""
+        if not texts:
+            return []
+        encoded = self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def _generate_batch(
+        self,
+        texts: List[str],
+        max_length: int,
+        min_length: int,
+        num_beams: int = 4,
+        length_penalty: float = 2.0,
+        no_repeat_ngram_size: int = 3,
+        batch_size: Optional[int] = None
+    ) -> List[str]:
+        """
+        分批调用 model.generate，输入超出 max_input_length 的部分被截断
+
+        全部文本一次分词，按 token 长度排序后每 batch_size 条补齐成一批，
+        长度相近的文本同批以减少填充。
+
+        Returns:
+            List[str]: 与 texts 一一对应的摘要
+        """
+        import torch
+
+        if not texts:
+            return []
+        model, tokenizer = self._load_model()
+        prompts = list(texts)
+        if "t5" in self.model_name.lower():
+            prompts = [f"summarize: {text}" for text in prompts]
+
+        encoded = tokenizer(prompts, max_length=self.max_input_length, truncation=True)
+        features = [{key: values[i] for key, values in encoded.items()} for i in range(len(prompts))]
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+
+        summaries = [""] * len(prompts)
+        for indices in length_buckets(lengths, batch_size or self.batch_size):
+            inputs = tokenizer.pad(
+                [features[i] for i in indices],
+                padding=True,
                 return_tensors="pt"
             ).to(self.device)
-            
-            # 生成摘要
-            with torch.no_grad():
-                outputs = self.model.generate(
+            with torch.inference_mode():
+                outputs = model.generate(
                     **inputs,
-                    max_length=max_length or self.max_length,
-                    min_length=min_length or self.min_length,
+                    max_length=max_length,
+                    min_length=min_length,
                     num_beams=num_beams,
                     length_penalty=length_penalty,
                     no_repeat_ngram_size=no_repeat_ngram_size,
                     early_stopping=True
                 )
-                
-            # 解码输出
-            summary = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return summary
-            
-        except Exception as e:
-            # 如果模型生成失败，回退到简单摘要
-            return self._generate_simple_summary(text, max_length, min_length)
-    
+            decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            for index, summary in zip(indices, decoded):
+                summaries[index] = summary
+        return summaries
+
+    def _summarize_chunks(self, chunks: List[str], max_length: int, min_length: int, **generation) -> List[str]:
+        """
+        摘要多个块，命中缓存的块直接复用，其余块合并成批次生成
+        
+        缓存键包含模型名、长度与生成参数，以及块文本本身。
+        """
+        params = json.dumps([self.model_name, max_length, min_length, sorted(generation.items())])
+        keys = [hashlib.sha256(f"{params}\n{chunk}".encode("utf-8")).hexdigest() for chunk in chunks]
+
+        results = {}
+        pending = {}
+        for key, chunk in zip(keys, chunks):
+            if key in self._chunk_cache:
+                self._chunk_cache.move_to_end(key)
+                results[key] = self._chunk_cache[key]
+                self.chunk_cache_hits += 1
+            elif key not in pending:
+                pending[key] = chunk
+                self.chunk_cache_misses += 1
+
+        if pending:
+            summaries = self._generate_batch(list(pending.values()), max_length, min_length, **generation)
+            for key, summary in zip(pending, summaries):
+                results[key] = summary
+                self._chunk_cache[key] = summary
+            while len(self._chunk_cache) > self.chunk_cache_size:
+                self._chunk_cache.popitem(last=False)
+
+        return [results[key] for key in keys]
+
+    def _generate_hierarchical_summary(
+        self,
+        text: str,
+        max_length: Optional[int] = None,
+        min_length: Optional[int] = None,
+        **generation
+    ) -> str:
+        """
+        长文本的分层（map-reduce）摘要
+        
+        文本按句子切成相互重叠、不超过模型输入长度的块，各块批量摘要；
+        拼接后的部分摘要仍然过长时，以部分摘要为单位再次分块摘要，直到放得进
+        一次输入，最后生成指定长度的摘要。短文本等同于直接摘要。
+        """
+        budget = self._chunk_budget
+        chunk_min_length = min(self.min_length, self.chunk_summary_length // 2)
+
+        units = split_sentences(text) or [text]
+        for _ in range(MAX_REDUCE_LEVELS):
+            counts = self._count_tokens(units)
+            if sum(counts) <= budget:
+                break
+            chunks = chunk_sentences(units, counts, budget, self.chunk_overlap)
+            if len(chunks) <= 1:
+                break
+            partials = self._summarize_chunks(chunks, self.chunk_summary_length, chunk_min_length, **generation)
+            shrunk = sum(self._count_tokens(partials)) < sum(counts)
+            units = partials
+            if not shrunk:
+                # 部分摘要没有变短，停止归并，最后一步按输入长度截断
+                break
+
+        return self._summarize_chunks(
+            [_join_sentences(units)],
+            max_length or self.max_length,
+            min_length or self.min_length,
+            **generation
+        )[0]
+
     def _generate_simple_summary(
         self,
         text: str,
@@ -156,15 +627,12 @@ class Summarizer:
         min_length: Optional[int] = None
     ) -> str:
         """使用简单算法生成摘要（提取前N个句子）"""
-        import re
-
         cleaned = text.strip()
         if not cleaned:
             return ""
 
         # 分割句子并保留标点
-        sentences = re.findall(r'[^。！？.!?]+[。！？.!?]?', cleaned)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        sentences = split_sentences(cleaned)
 
         if len(sentences) == 1:
             if max_length is None or len(cleaned) <= max_length:
@@ -196,6 +664,53 @@ class Summarizer:
         
         return summary
     
+    def _generate_textrank_summary(
+        self,
+        text: str,
+        max_length: Optional[int] = None,
+        min_length: Optional[int] = None
+    ) -> str:
+        """
+        按 TextRank 得分抽取句子，按原文顺序拼接
+        
+        得分从高到低选择放得进 max_length 的句子，不足 min_length 时继续补充；
+        未安装 numpy 时退回简单摘要。
+        """
+        if not NUMPY_AVAILABLE:
+            return self._generate_simple_summary(text, max_length, min_length)
+
+        cleaned = text.strip()
+        if not cleaned:
+            return ""
+        sentences = split_sentences(cleaned)
+        if len(sentences) <= 1:
+            return self._generate_simple_summary(cleaned, max_length, min_length)
+
+        target_length = max_length or 200
+        scores = textrank_scores(sentences)
+        ranked = sorted(range(len(sentences)), key=lambda i: -scores[i])
+
+        # 句子间可能补一个空格，按长度 + 1 计算
+        selected = []
+        length = 0
+        for index in ranked:
+            cost = len(sentences[index]) + (1 if selected else 0)
+            if length + cost <= target_length or (min_length and length < min_length):
+                selected.append(index)
+                length += cost
+            elif selected:
+                # 得分更低的短句只会凑长度，遇到放不下的句子就停止
+                break
+            if length >= target_length:
+                break
+        if not selected:
+            selected = ranked[:1]
+
+        summary = _join_sentences(sentences[i] for i in sorted(selected))
+        if max_length and len(summary) > max_length:
+            summary = summary[:max_length]
+        return summary
+
     def generate_file_summary(
         self,
         input_path: Union[str, Path],
@@ -234,16 +749,67 @@ class Summarizer:
     def generate_batch_summaries(
         self,
         texts: List[str],
+        batch_size: Optional[int] = None,
         **kwargs
     ) -> List[str]:
         """
         批量生成摘要
-        
+
+        模型模式下，长度参数相同的文本合并后按 token 长度分桶批量生成（见 _generate_batch），
+        指定 ratio 时按各文本算出的长度分组；开启分层摘要时，超出模型输入长度的文本
+        单独走 map-reduce。某组生成失败时该组回退到简单摘要。其他摘要方式逐条处理。
+
         Args:
             texts: 输入文本列表
+            batch_size: 每次 generate 调用的文本数，None 表示实例的 batch_size
             **kwargs: 传递给generate_summary的参数
-            
+
         Returns:
-            List[str]: 摘要列表
+            List[str]: 摘要列表，与 texts 顺序一致
         """
-        return [self.generate_summary(text, **kwargs) for text in texts] 
+        texts = list(texts)
+        if not self.uses_model(kwargs.get("mode")):
+            return [self.generate_summary(text, **kwargs) for text in texts]
+
+        generation = {
+            key: kwargs[key] for key in ("num_beams", "length_penalty", "no_repeat_ngram_size")
+            if key in kwargs
+        }
+        hierarchical = kwargs.get("hierarchical")
+        if hierarchical is None:
+            hierarchical = self.hierarchical
+
+        summaries: List[Optional[str]] = [None] * len(texts)
+        long_texts = set()
+        if hierarchical:
+            try:
+                counts = self._count_tokens(texts)
+                long_texts = {i for i, count in enumerate(counts) if count > self._chunk_budget}
+            except Exception:
+                # 分词失败时交给 generate_summary 逐条处理（含回退）
+                long_texts = set(range(len(texts)))
+
+        groups: Dict[Tuple[Optional[int], Optional[int]], List[int]] = {}
+        for index, text in enumerate(texts):
+            if index in long_texts:
+                summaries[index] = self.generate_summary(text, **kwargs)
+                continue
+            max_length = self._ratio_length(text, kwargs.get("max_length"), kwargs.get("ratio"))
+            groups.setdefault((max_length, kwargs.get("min_length")), []).append(index)
+
+        for (max_length, min_length), indices in groups.items():
+            batch = [texts[i] for i in indices]
+            try:
+                results = self._generate_batch(
+                    batch,
+                    max_length or self.max_length,
+                    min_length or self.min_length,
+                    batch_size=batch_size,
+                    **generation
+                )
+            except Exception:
+                # 与 generate_summary 一致，模型生成失败时回退到简单摘要
+                results = [self._generate_simple_summary(text, max_length, min_length) for text in batch]
+            for index, summary in zip(indices, results):
+                summaries[index] = summary
+        return summaries
@@ -1,43 +1,40 @@
 """
 翻译器模块
 """
-from typing import Dict, List, Optional, Union, Any
+import importlib.util
+from typing import List, Optional, Union, Any
 from pathlib import Path
 
-try:
-    import torch
-    from transformers import MarianMTModel, MarianTokenizer
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    torch = None
-    MarianMTModel = None
-    MarianTokenizer = None
-
-try:
-    from googletrans import Translator as GoogleTranslator
-    GOOGLETRANS_AVAILABLE = True
-except ImportError:
-    GOOGLETRANS_AVAILABLE = False
-    GoogleTranslator = None
+GOOGLETRANS_AVAILABLE = importlib.util.find_spec("googletrans") is not None
 
 from .exceptions import TranslationError
+from .models import (
+    TRANSFORMERS_AVAILABLE, configure_inference_threads, get_model_registry, load_pretrained,
+    prepare_for_inference, registry_device, resolve_device
+)
 
 class Translator:
     """多语言翻译器"""
     
-    def __init__(self, device: Optional[str] = None, use_google: bool = True):
+    def __init__(self, device: Optional[str] = None, use_google: bool = True,
+                 google_max_chars: int = 4500, cpu_optimize: bool = False,
+                 num_threads: Optional[int] = None):
         """
         初始化翻译器
         
         Args:
             device: 设备（cuda/cpu），仅在 transformers 可用时有效
             use_google: 是否优先使用 Google Translate（更轻量级）
+            google_max_chars: 翻译文本列表时，每次 Google 请求合并的最大字符数
+            cpu_optimize: CPU 上对 Marian 模型做动态 int8 量化，并固定 torch 线程数
+            num_threads: CPU 优化模式下的 torch 线程数，None 表示按工作进程数均分核心
         """
         self.use_google = use_google and GOOGLETRANS_AVAILABLE
-        self.device = device or ("cuda" if torch and torch.cuda.is_available() else "cpu")
-        self._models: Dict[str, Any] = {}
-        self._tokenizers: Dict[str, Any] = {}
+        self.google_max_chars = google_max_chars
+        self.cpu_optimize = cpu_optimize
+        self.num_threads = num_threads
+        self._device = device
+        self._google_client = None
         self._language_pairs = {
             'en2zh': 'Helsinki-NLP/opus-mt-en-zh',
             'zh2en': 'Helsinki-NLP/opus-mt-zh-en',
@@ -51,12 +48,21 @@ class Translator:
         self._google_lang_map = {
             'en': 'en', 'zh': 'zh-cn', 'ja': 'ja', 'ko': 'ko'
         }
-        
-        if self.use_google:
-            try:
-                self._google_translator = GoogleTranslator()
-            except Exception:
-                self.use_google = False
+
+    @property
+    def device(self) -> str:
+        """运行设备；首次访问时才检测（见 models.resolve_device）"""
+        if self._device is None:
+            self._device = resolve_device()
+        return self._device
+
+    @property
+    def _google_translator(self):
+        """首次使用时才导入 googletrans 并创建客户端"""
+        if self._google_client is None:
+            from googletrans import Translator as GoogleTranslator
+            self._google_client = GoogleTranslator()
+        return self._google_client
     
     def translate(
         self,
@@ -132,63 +138,83 @@ class Translator:
         
         try:
             if isinstance(text, str):
-                result = self._google_translator.translate(text, src=src, dest=dst)
-                # 处理异步或同步结果
-                if hasattr(result, 'text'):
-                    return result.text
-                elif hasattr(result, '__await__'):
-                    # 如果是协程，需要同步执行（不推荐，但作为回退）
-                    import asyncio
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            # 如果事件循环正在运行，创建新任务
-                            import concurrent.futures
-                            with concurrent.futures.ThreadPoolExecutor() as executor:
-                                future = executor.submit(asyncio.run, self._google_translator.translate(text, src=src, dest=dst))
-                                result = future.result()
-                        else:
-                            result = loop.run_until_complete(self._google_translator.translate(text, src=src, dest=dst))
-                    except RuntimeError:
-                        result = asyncio.run(self._google_translator.translate(text, src=src, dest=dst))
-                    return result.text if hasattr(result, 'text') else str(result)
-                else:
-                    return str(result)
-            else:
-                results = []
-                for t in text:
-                    result = self._google_translator.translate(t, src=src, dest=dst)
-                    if hasattr(result, 'text'):
-                        results.append(result.text)
-                    elif hasattr(result, '__await__'):
-                        import asyncio
-                        try:
-                            result = asyncio.run(result)
-                            results.append(result.text if hasattr(result, 'text') else str(result))
-                        except RuntimeError:
-                            results.append(str(result))
-                    else:
-                        results.append(str(result))
-                return results
+                return self._google_translate_text(text, src, dst)
+            results = []
+            for chunk in self._pack_segments(text):
+                results.extend(self._google_translate_chunk(chunk, src, dst))
+            return results
         except Exception as e:
             raise TranslationError(f"Google Translate 翻译失败: {str(e)}")
+
+    def _pack_segments(self, segments: List[str]) -> List[List[str]]:
+        """将片段按字符数打包，每包通过一次请求翻译"""
+        chunks = []
+        current = []
+        current_chars = 0
+        for segment in segments:
+            if current and current_chars + len(segment) + 1 > self.google_max_chars:
+                chunks.append(current)
+                current = []
+                current_chars = 0
+            current.append(segment)
+            current_chars += len(segment) + 1
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _google_translate_chunk(self, chunk: List[str], src: str, dst: str) -> List[str]:
+        """用换行拼接一包片段后翻译，行数对不上时逐条翻译"""
+        if len(chunk) > 1 and not any("\n" in segment for segment in chunk):
+            lines = self._google_translate_text("\n".join(chunk), src, dst).split("\n")
+            if len(lines) == len(chunk):
+                return lines
+        return [self._google_translate_text(segment, src, dst) for segment in chunk]
+
+    def _google_translate_text(self, text: str, src: str, dst: str) -> str:
+        """翻译单个字符串，兼容同步与异步版本的 googletrans"""
+        result = self._google_translator.translate(text, src=src, dest=dst)
+        # 处理异步或同步结果
+        if hasattr(result, 'text'):
+            return result.text
+        elif hasattr(result, '__await__'):
+            # 如果是协程，需要同步执行（不推荐，但作为回退）
+            import asyncio
+            try:
+                loop = asyncio.get_event_loop()
+                if loop.is_running():
+                    # 如果事件循环正在运行，创建新任务
+                    import concurrent.futures
+                    with concurrent.futures.ThreadPoolExecutor() as executor:
+                        future = executor.submit(asyncio.run, self._google_translator.translate(text, src=src, dest=dst))
+                        result = future.result()
+                else:
+                    result = loop.run_until_complete(self._google_translator.translate(text, src=src, dest=dst))
+            except RuntimeError:
+                result = asyncio.run(self._google_translator.translate(text, src=src, dest=dst))
+            return result.text if hasattr(result, 'text') else str(result)
+        else:
+            return str(result)
     
     def _get_model_and_tokenizer(self, pair_key: str):
-        """获取或加载模型和分词器"""
+        """从进程级模型注册表获取模型和分词器（所有 Translator 共享，受内存预算约束）"""
         if not TRANSFORMERS_AVAILABLE:
             raise TranslationError("transformers 库未安装，无法使用模型翻译")
-            
-        if pair_key not in self._models:
-            model_name = self._language_pairs[pair_key]
-            try:
-                # 动态导入，避免在模块级别导入失败
-                from transformers import MarianMTModel, MarianTokenizer
-                self._models[pair_key] = MarianMTModel.from_pretrained(model_name).to(self.device)
-                self._tokenizers[pair_key] = MarianTokenizer.from_pretrained(model_name)
-            except Exception as e:
-                raise TranslationError(f"加载翻译模型失败: {str(e)}")
-                
-        return self._models[pair_key], self._tokenizers[pair_key]
+
+        model_name = self._language_pairs[pair_key]
+
+        def loader():
+            # 动态导入，避免在模块级别导入失败
+            from transformers import MarianMTModel, MarianTokenizer
+            model = load_pretrained(MarianMTModel, model_name)
+            model = prepare_for_inference(model, self.device, self.cpu_optimize)
+            return model, MarianTokenizer.from_pretrained(model_name)
+
+        try:
+            if self.cpu_optimize:
+                configure_inference_threads(self.num_threads)
+            return get_model_registry().get(model_name, registry_device(self.device, self.cpu_optimize), loader)
+        except Exception as e:
+            raise TranslationError(f"加载翻译模型失败: {str(e)}")
     
     def _translate_batch(
         self,
@@ -206,7 +232,8 @@ class Translator:
             encoded = {k: v.to(self.device) for k, v in encoded.items()}
             
             # 翻译
-            with torch.no_grad():
+            import torch
+            with torch.inference_mode():
                 outputs = model.generate(**encoded)
                 
             # 解码
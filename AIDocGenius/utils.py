@@ -1,22 +1,19 @@
+import codecs
+import hashlib
+import importlib.util
+import io
+import mmap
 import os
+import zipfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Union, Any, Optional, Dict
+from contextlib import contextmanager
+from typing import Union, Any, BinaryIO, Optional, Dict, Iterable, Iterator, List, Tuple
 import json
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    yaml = None
-    YAML_AVAILABLE = False
-from docx import Document
-try:
-    import PyPDF2
-    PDF_AVAILABLE = True
-except ImportError:
-    PyPDF2 = None
-    PDF_AVAILABLE = False
 import logging
 
+from .cache import get_extraction_cache
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -24,54 +21,471 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_document(file_path: Union[str, Path]) -> Any:
+# 格式库在首次使用时才导入
+YAML_AVAILABLE = importlib.util.find_spec("yaml") is not None
+PDF_AVAILABLE = importlib.util.find_spec("PyPDF2") is not None
+
+# 支持流式读取的纯文本格式
+TEXT_SUFFIXES = ('.txt', '.md', '.rst')
+
+# 超过该大小的纯文本文件默认通过 mmap 读取
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# 页数不少于该值时才按页段分给多个进程提取
+PDF_PARALLEL_MIN_PAGES = 16
+
+PageSpec = Union[str, Iterable[int]]
+
+# 文档来源：路径，或内存中的字节/文件对象（需能推断或给出格式）
+DocumentSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+# 提取器版本，参与提取缓存的键；提取逻辑变化时递增（PDF 另附 PyPDF2 版本）
+EXTRACTOR_VERSIONS = {
+    '.docx': 'iterparse-2',
+    '.pdf': 'pypdf2-1',
+}
+
+# WordprocessingML 与标记兼容性（mc:AlternateContent）命名空间
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+def load_document(file_path: DocumentSource,
+                  pages: Optional[PageSpec] = None,
+                  pdf_workers: Optional[int] = None,
+                  file_format: Optional[str] = None) -> Any:
     """
     加载文档内容，支持多种格式
     
     Args:
-        file_path: 文档路径
+        file_path: 文档路径，或内存中的 bytes/BytesIO/文件对象（PDF 与 DOCX 直接从内存解析）
+        pages: 只提取指定页（仅对 PDF 生效），格式见 parse_page_range
+        pdf_workers: PDF 按页段并行提取的进程数（仅对 PDF 生效，内存文档不并行）
+        file_format: 格式提示（如 "pdf" 或 ".pdf"）；内存文档没有带后缀的 name 属性时必须提供
         
     Returns:
         str: 文档内容
+    
+    启用提取缓存（见 cache.configure_extraction_cache）时，完整提取的 PDF/DOCX 文本按
+    内容摘要与提取器版本缓存，重复加载只需计算一次摘要并读取一次缓存。
     """
-    file_path = Path(file_path)
-    suffix = file_path.suffix.lower()
+    suffix = _document_suffix(file_path, file_format)
+    stream = _binary_stream(file_path)
+    if stream is None:
+        file_path = Path(file_path)
+    source = file_path if stream is None else stream
     
     try:
         if suffix in ['.txt', '.rst']:
+            if stream is not None:
+                return _decode_text(stream)
             with open(file_path, 'r', encoding='utf-8') as f:
                 return f.read()
                 
         elif suffix == '.md':
+            if stream is not None:
+                return _decode_text(stream)
             with open(file_path, 'r', encoding='utf-8') as f:
                 return f.read()
                 
-        elif suffix == '.docx':
-            doc = Document(file_path)
-            return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-            
-        elif suffix == '.pdf':
-            if not PDF_AVAILABLE:
-                raise ImportError("PyPDF2 is required to read PDF files")
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                return '\n'.join([page.extract_text() or "" for page in pdf_reader.pages])
+        elif suffix in ['.docx', '.pdf']:
+            cache = get_extraction_cache() if pages is None else None
+            if cache is not None:
+                key = f"{file_sha256(source)}:{suffix}:{_extractor_version(suffix)}"
+                text = cache.get(key)
+                if text is not None:
+                    return text
+
+            if suffix == '.docx':
+                text = _load_docx(source)
+            else:
+                text = load_pdf(source, pages=pages, workers=pdf_workers)
+
+            if cache is not None:
+                cache.put(key, text)
+            return text
                 
         elif suffix in ['.json', '.yaml', '.yml']:
+            if stream is not None:
+                if suffix == '.json':
+                    return json.loads(_decode_text(stream))
+                if not YAML_AVAILABLE:
+                    raise ImportError("pyyaml is required to read YAML files")
+                import yaml
+                return yaml.safe_load(_decode_text(stream))
             with open(file_path, 'r', encoding='utf-8') as f:
                 if suffix == '.json':
                     return json.load(f)
                 else:
                     if not YAML_AVAILABLE:
                         raise ImportError("pyyaml is required to read YAML files")
+                    import yaml
                     return yaml.safe_load(f)
         else:
             raise ValueError(f"Unsupported file format: {suffix}")
             
     except Exception as e:
-        logger.error(f"Error loading file {file_path}: {str(e)}")
+        name = file_path if stream is None else getattr(file_path, 'name', '<memory>')
+        logger.error(f"Error loading file {name}: {str(e)}")
         raise
 
+def _extractor_version(suffix: str) -> str:
+    """
+    提取缓存键中的提取器版本
+    """
+    if suffix == '.pdf' and PDF_AVAILABLE:
+        import PyPDF2
+        return f"{EXTRACTOR_VERSIONS[suffix]}-{PyPDF2.__version__}"
+    return EXTRACTOR_VERSIONS[suffix]
+
+def _document_suffix(source: DocumentSource, file_format: Optional[str] = None) -> str:
+    """
+    确定文档格式后缀：优先使用格式提示，其次是路径或文件对象 name 的后缀
+    """
+    if file_format:
+        return '.' + file_format.lower().lstrip('.')
+    if isinstance(source, (str, Path)):
+        return Path(source).suffix.lower()
+    name = getattr(source, 'name', None)
+    if isinstance(name, str) and Path(name).suffix:
+        return Path(name).suffix.lower()
+    raise ValueError("file_format is required for in-memory documents")
+
+def _binary_stream(source: DocumentSource) -> Optional[BinaryIO]:
+    """
+    把内存中的文档转换为可 seek 的二进制流；路径返回 None
+    """
+    if isinstance(source, (str, Path)):
+        return None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, io.TextIOBase):
+        return io.BytesIO(source.read().encode('utf-8'))
+    if hasattr(source, 'read'):
+        if getattr(source, 'seekable', lambda: False)():
+            return source
+        return io.BytesIO(source.read())
+    raise TypeError(f"Unsupported document source: {type(source).__name__}")
+
+def _decode_text(stream: BinaryIO) -> str:
+    """
+    以 UTF-8 解码二进制流，换行规则与 open(..., 'r') 一致
+    """
+    wrapper = io.TextIOWrapper(stream, encoding='utf-8')
+    try:
+        return wrapper.read()
+    finally:
+        wrapper.detach()
+
+@contextmanager
+def _open_binary(source: Union[str, Path, BinaryIO]) -> Iterator[BinaryIO]:
+    """
+    以二进制方式打开路径；已打开的流原样返回且不关闭
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            yield f
+    else:
+        yield source
+
+def _load_docx(file_path: Union[Path, BinaryIO]) -> str:
+    """
+    提取 DOCX 文本，增量解析失败时回退到 python-docx
+    """
+    try:
+        return load_docx_text(file_path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        logger.warning(f"Fast DOCX extraction failed for {getattr(file_path, 'name', file_path)}, "
+                       f"using python-docx: {str(e)}")
+        if not isinstance(file_path, Path):
+            file_path.seek(0)
+        from docx import Document
+        doc = Document(file_path)
+        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+
+def _docx_paragraph_text(paragraph: ET.Element) -> str:
+    """
+    拼接 w:p 元素的文本，换行与制表符规则与 python-docx 的 Paragraph.text 一致
+    """
+    parts = []
+    for element in paragraph.iter():
+        tag = element.tag
+        if tag == _W + 't':
+            parts.append(element.text or '')
+        elif tag in (_W + 'tab', _W + 'ptab'):
+            parts.append('\t')
+        elif tag == _W + 'cr':
+            parts.append('\n')
+        elif tag == _W + 'br':
+            if element.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag == _W + 'noBreakHyphen':
+            parts.append('-')
+    return ''.join(parts)
+
+def load_docx_text(file_path: Union[str, Path, BinaryIO]) -> str:
+    """
+    直接从 zip 中增量解析 word/document.xml 提取 DOCX 文本
+    
+    不构建 python-docx 对象模型，处理完的段落立即释放。正文段落按文档顺序每段一行，
+    表格每行一行、单元格以制表符分隔（单元格内的多个段落以空格连接）。
+    文本框的段落紧跟在所在段落之后输出；mc:Fallback 是 mc:Choice 的旧版副本，跳过。
+    
+    Args:
+        file_path: DOCX 路径或可 seek 的二进制文件对象
+        
+    Returns:
+        str: 文档文本
+    """
+    lines = []
+    rows = []
+    # 正在解析的段落与单元格：(标签, 其中已完成的文本)，内层内容写入最近的外层
+    containers = []
+    fallback_depth = 0
+
+    def emit(text: str) -> None:
+        if containers:
+            containers[-1][1].append(text)
+        else:
+            lines.append(text)
+
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as f:
+        for event, element in ET.iterparse(f, events=('start', 'end')):
+            tag = element.tag
+            if tag == _MC + 'Fallback':
+                fallback_depth += 1 if event == 'start' else -1
+                if event == 'end':
+                    element.clear()
+                continue
+            if fallback_depth:
+                continue
+
+            if event == 'start':
+                if tag == _W + 'tr':
+                    rows.append([])
+                elif tag in (_W + 'tc', _W + 'p'):
+                    containers.append((tag, []))
+                continue
+
+            if tag == _W + 'p':
+                # 文本框段落已在各自结束时清空，不会再出现在所在段落的文本中
+                nested = containers.pop()[1]
+                for text in [_docx_paragraph_text(element)] + nested:
+                    emit(text)
+                element.clear()
+            elif tag == _W + 'tc':
+                text = ' '.join(part for part in containers.pop()[1] if part)
+                if rows:
+                    rows[-1].append(text)
+            elif tag == _W + 'tr':
+                # 嵌套表格的行并入外层单元格
+                emit('\t'.join(rows.pop()))
+                element.clear()
+    return '\n'.join(lines)
+
+def parse_page_range(pages: Optional[PageSpec], page_count: int) -> List[int]:
+    """
+    解析页码范围
+    
+    Args:
+        pages: 字符串形式的页码（从 1 开始，如 "1-3,7,10-"），或从 0 开始的页索引序列
+            （如 range(0, 5)）；None 表示全部页
+        page_count: 文档总页数
+        
+    Returns:
+        List[int]: 从 0 开始的页索引，保持给定顺序，超出范围的页被忽略
+    """
+    if pages is None:
+        return list(range(page_count))
+    if not isinstance(pages, str):
+        return [index for index in pages if 0 <= index < page_count]
+
+    indices = []
+    for part in pages.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = part.split('-', 1)
+                first = int(start) if start.strip() else 1
+                last = int(end) if end.strip() else page_count
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range: {pages}")
+        indices.extend(range(max(first, 1) - 1, min(last, page_count)))
+    return indices
+
+def _extract_pdf_pages(file_path: Union[str, Path], indices: List[int]) -> List[str]:
+    """
+    提取 PDF 指定页的文本（进程池任务）
+    """
+    import PyPDF2
+    with open(file_path, 'rb') as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        return [pdf_reader.pages[index].extract_text() or "" for index in indices]
+
+def iter_pdf_pages(file_path: Union[str, Path, BinaryIO], pages: Optional[PageSpec] = None) -> Iterator[str]:
+    """
+    逐页提取 PDF 文本，只解析实际被消费的页
+    
+    Args:
+        file_path: PDF 路径或可 seek 的二进制文件对象
+        pages: 页码范围，格式见 parse_page_range
+        
+    Yields:
+        str: 每页的文本
+    """
+    if not PDF_AVAILABLE:
+        raise ImportError("PyPDF2 is required to read PDF files")
+    import PyPDF2
+    with _open_binary(file_path) as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        for index in parse_page_range(pages, len(pdf_reader.pages)):
+            yield pdf_reader.pages[index].extract_text() or ""
+
+def load_pdf(file_path: Union[str, Path, BinaryIO],
+             pages: Optional[PageSpec] = None,
+             workers: Optional[int] = None) -> str:
+    """
+    提取 PDF 文本
+    
+    workers 大于 1 且所选页数不少于 PDF_PARALLEL_MIN_PAGES 时，把页按连续区间切分，
+    由多个进程各自打开文件提取，结果按页序拼接；内存中的 PDF 在当前进程提取。
+    
+    Args:
+        file_path: PDF 路径或可 seek 的二进制文件对象
+        pages: 页码范围，格式见 parse_page_range
+        workers: 并行提取的进程数
+        
+    Returns:
+        str: 各页文本以换行连接
+    """
+    if not PDF_AVAILABLE:
+        raise ImportError("PyPDF2 is required to read PDF files")
+    import PyPDF2
+    with _open_binary(file_path) as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        indices = parse_page_range(pages, len(pdf_reader.pages))
+        if (not workers or workers <= 1 or len(indices) < PDF_PARALLEL_MIN_PAGES
+                or not isinstance(file_path, (str, Path))):
+            return '\n'.join([pdf_reader.pages[index].extract_text() or "" for index in indices])
+
+    # 每个进程分到约两段，页面复杂度不均时也能保持负载均衡
+    from concurrent.futures import ProcessPoolExecutor
+
+    span = -(-len(indices) // (workers * 2))
+    ranges = [indices[start:start + span] for start in range(0, len(indices), span)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        texts = executor.map(_extract_pdf_pages, [file_path] * len(ranges), ranges)
+        return '\n'.join(text for chunk in texts for text in chunk)
+
+def iter_text_chunks(file_path: Union[str, Path],
+                     chunk_size: int = 1024 * 1024,
+                     encoding: str = 'utf-8',
+                     use_mmap: Optional[bool] = None) -> Iterator[str]:
+    """
+    按固定大小流式读取文本文件
+    
+    跨块边界的多字节字符和 \r\n 由增量解码器正确拼接，换行规则与 open(..., 'r') 一致。
+    
+    Args:
+        file_path: 文件路径
+        chunk_size: 每块读取的字节数
+        encoding: 文本编码
+        use_mmap: 是否通过 mmap 读取；None 表示文件不小于 MMAP_THRESHOLD 时使用
+        
+    Yields:
+        str: 解码后的文本块
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = size >= MMAP_THRESHOLD
+        if use_mmap and size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, size, chunk_size):
+                    text = decoder.decode(mapped[start:start + chunk_size])
+                    if text:
+                        yield text
+        else:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                text = decoder.decode(block)
+                if text:
+                    yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def iter_paragraphs(file_path: Union[str, Path],
+                    chunk_size: int = 1024 * 1024,
+                    encoding: str = 'utf-8',
+                    use_mmap: Optional[bool] = None,
+                    max_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    按段落流式读取文本文件
+    
+    产出的段落与 text.split('\n\n') 一致；超过 max_chars 的段落在换行处切开，
+    以保证没有空行的大文件（如日志）内存占用同样有界。
+    
+    Args:
+        file_path: 文件路径
+        chunk_size: 每块读取的字节数
+        encoding: 文本编码
+        use_mmap: 是否通过 mmap 读取
+        max_chars: 单个段落的最大字符数，默认等于 chunk_size
+        
+    Yields:
+        str: 段落文本
+    """
+    max_chars = max_chars or chunk_size
+    buffer = ''
+    for chunk in iter_text_chunks(file_path, chunk_size, encoding, use_mmap):
+        parts = (buffer + chunk).split('\n\n')
+        buffer = parts.pop()
+        yield from parts
+        while len(buffer) > max_chars:
+            cut = buffer.rfind('\n', 0, max_chars)
+            if cut <= 0:
+                yield buffer[:max_chars]
+                buffer = buffer[max_chars:]
+            else:
+                yield buffer[:cut]
+                buffer = buffer[cut + 1:]
+    yield buffer
+
+def stream_document(file_path: DocumentSource,
+                    chunk_size: int = 1024 * 1024,
+                    use_mmap: Optional[bool] = None,
+                    pages: Optional[PageSpec] = None,
+                    file_format: Optional[str] = None) -> Iterator[str]:
+    """
+    按段落流式产出文档文本
+    
+    纯文本格式（.txt/.md/.rst）逐块读取，PDF 逐页提取（每页作为一段），
+    其他格式及内存中的文本完整加载后按段落切分。
+    
+    Args:
+        file_path: 文档路径或内存中的文档（见 load_document）
+        chunk_size: 纯文本每块读取的字节数
+        use_mmap: 纯文本是否通过 mmap 读取
+        pages: PDF 页码范围，格式见 parse_page_range
+        file_format: 内存文档的格式提示
+        
+    Yields:
+        str: 段落文本
+    """
+    suffix = _document_suffix(file_path, file_format)
+    stream = _binary_stream(file_path)
+    if suffix in TEXT_SUFFIXES and stream is None:
+        yield from iter_paragraphs(file_path, chunk_size, use_mmap=use_mmap)
+    elif suffix == '.pdf':
+        yield from iter_pdf_pages(file_path if stream is None else stream, pages)
+    else:
+        source = file_path if stream is None else stream
+        yield from ensure_text(load_document(source, file_format=suffix)).split('\n\n')
+
 def save_document(content: Any, file_path: Union[str, Path], format_options: dict = None) -> None:
     """
     保存文档内容
@@ -98,7 +512,9 @@ def save_document(content: Any, file_path: Union[str, Path], format_options: dic
                 f.write(str(content))
                 
         elif suffix == '.docx':
-            if isinstance(content, Document):
+            from docx import Document
+            from docx.document import Document as DocxDocument
+            if isinstance(content, DocxDocument):
                 content.save(str(file_path))
             else:
                 doc = Document()
@@ -123,6 +539,7 @@ def save_document(content: Any, file_path: Union[str, Path], format_options: dic
                 else:
                     if not YAML_AVAILABLE:
                         raise ImportError("pyyaml is required to write YAML files")
+                    import yaml
                     yaml.safe_dump(content, f, allow_unicode=True)
         else:
             raise ValueError(f"Unsupported file format: {suffix}")
@@ -152,6 +569,45 @@ def get_file_info(file_path: Union[str, Path]) -> dict:
         'is_binary': is_binary_file(file_path)
     }
 
+def file_sha256(file_path: Union[str, Path, BinaryIO], chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容的 SHA-256 摘要
+    
+    Args:
+        file_path: 文件路径，或可 seek 的二进制文件对象（读取后恢复原位置）
+        chunk_size: 每次读取的字节数
+        
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with _open_binary(file_path) as f:
+        start = f.tell()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+        f.seek(start)
+    return digest.hexdigest()
+
+def document_digest(source: DocumentSource,
+                    file_format: Optional[str] = None) -> Tuple[str, str, DocumentSource]:
+    """
+    计算文档原始内容的 SHA-256 摘要（不解析文档），用于结果缓存键
+    
+    不可 seek 的流会先读入内存，返回的文档来源可以再交给 load_document 读取。
+    
+    Args:
+        source: 文档路径，或内存中的 bytes/BytesIO/文件对象
+        file_format: 格式提示
+        
+    Returns:
+        tuple: (十六进制摘要, 格式后缀, 可再次读取的文档来源)
+    """
+    suffix = _document_suffix(source, file_format)
+    stream = _binary_stream(source)
+    if stream is None:
+        return file_sha256(source), suffix, source
+    return file_sha256(stream), suffix, stream
+
 def is_binary_file(file_path: Union[str, Path]) -> bool:
     """
     检查文件是否为二进制文件
@@ -207,6 +663,7 @@ def load_config(config_path: Optional[Union[str, Path]]) -> Dict[str, Any]:
     if suffix in ['.yaml', '.yml']:
         if not YAML_AVAILABLE:
             raise ImportError("pyyaml is required to read YAML config files")
+        import yaml
         with open(path, 'r', encoding='utf-8') as f:
             return yaml.safe_load(f) or {}
 
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CPU 优化模式基准：摘要（T5）与翻译（Marian）在 fp32 与动态 int8 量化下的延迟和权重内存
+
+使用随机初始化的本地小模型，不需要下载权重。翻译模型用按词切分的快速分词器代替
+MarianTokenizer（后者需要 sentencepiece 模型文件）。
+
+用法：
+    python benchmarks/bench_cpu_inference.py --d-model 256 --layers 4 --threads 2
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tiny_model import build_texts, save_tiny_marian, save_tiny_seq2seq
+from AIDocGenius.models import configure_inference_threads, get_model_registry, model_memory_bytes
+from AIDocGenius.summarizer import Summarizer
+from AIDocGenius.translator import Translator
+
+
+def measure(func, repeat: int) -> float:
+    """中位数耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report(name: str, results: dict) -> None:
+    fp32, int8 = results["fp32"], results["int8"]
+    print(name)
+    for label, (latency, size) in results.items():
+        print(f"  {label}:  {latency * 1000:8.1f} ms/call  weights {size / 1024 / 1024:6.1f} MB")
+    print(f"  int8 vs fp32: {fp32[0] / int8[0]:.2f}x faster, {fp32[1] / int8[1]:.2f}x smaller")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU 优化模式基准")
+    parser.add_argument("--d-model", type=int, default=256)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch 线程数（fp32 与 int8 相同），默认按 INFERENCE_WORKERS 均分核心")
+    parser.add_argument("--docs", type=int, default=8)
+    parser.add_argument("--max-length", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from transformers import PreTrainedTokenizerFast
+
+    # 两种模式使用相同的线程数，差异只来自量化
+    threads = configure_inference_threads(args.threads)
+    texts = build_texts(args.docs, seed=1)
+    with tempfile.TemporaryDirectory() as t5_dir, tempfile.TemporaryDirectory() as marian_dir:
+        save_tiny_seq2seq(t5_dir, d_model=args.d_model, layers=args.layers)
+        save_tiny_marian(marian_dir, d_model=args.d_model, layers=args.layers)
+
+        summaries = {}
+        translations = {}
+        for label, cpu_optimize in (("fp32", False), ("int8", True)):
+            summarizer = Summarizer(model_name=t5_dir, device="cpu", mode="model",
+                                    max_length=args.max_length, min_length=args.max_length,
+                                    max_input_length=256, cpu_optimize=cpu_optimize,
+                                    num_threads=threads)
+            summarize = lambda: summarizer.generate_batch_summaries(texts, num_beams=1)
+            summarize()
+            summaries[label] = (measure(summarize, args.repeat), model_memory_bytes(summarizer.model))
+
+            translator = Translator(device="cpu", use_google=False, cpu_optimize=cpu_optimize,
+                                    num_threads=threads)
+            translator._language_pairs["en2zh"] = marian_dir
+            with mock.patch("transformers.MarianTokenizer", PreTrainedTokenizerFast):
+                model, _ = translator._get_model_and_tokenizer("en2zh")
+            translate = lambda: translator.translate(texts, "en", "zh", batch_size=args.docs)
+            translate()
+            translations[label] = (measure(translate, args.repeat), model_memory_bytes(model))
+
+        import torch
+        print(f"torch {torch.__version__}, {threads} intra-op threads for both modes, "
+              f"d_model {args.d_model}, {args.layers} layers, {args.docs} docs per call")
+        report("summarizer (T5)", summaries)
+        report("translator (Marian)", translations)
+        print(f"resident: {[(m['model_name'][-12:], m['device']) for m in get_model_registry().resident()]}")
+
+
+if __name__ == "__main__":
+    main()
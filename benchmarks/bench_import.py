@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准：导入包、--version、创建处理器、一次简单 convert
+
+每个场景在新的解释器进程中运行多次，取最短耗时。
+
+用法：
+    python benchmarks/bench_import.py --repeat 5
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+SCENARIOS = {
+    "python (baseline)": "pass",
+    "import AIDocGenius": "import AIDocGenius",
+    "aidocgenius --version": (
+        "import sys; sys.argv = ['aidocgenius', '--version']\n"
+        "from AIDocGenius.cli import main\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass"
+    ),
+    "DocProcessor()": "from AIDocGenius import DocProcessor; DocProcessor()",
+    "convert md -> html": (
+        "from AIDocGenius import DocProcessor\n"
+        "DocProcessor().convert({src!r}, {dst!r})"
+    ),
+}
+
+
+def measure(code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=str(ROOT), check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        src = Path(temp_dir) / "note.md"
+        src.write_text("# 标题\n\n正文内容。", encoding="utf-8")
+        dst = Path(temp_dir) / "note.html"
+        for name, code in SCENARIOS.items():
+            seconds = measure(code.format(src=str(src), dst=str(dst)), args.repeat)
+            print(f"{name:<24} {seconds * 1000:8.1f} ms")
+
+    print("\nFor a per-module breakdown run: python -X importtime -c 'import AIDocGenius'")
+
+
+if __name__ == "__main__":
+    main()
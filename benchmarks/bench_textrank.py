@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+TextRank 摘要基准：不同句子数下的抽取耗时（含分句、TF-IDF 与幂迭代）
+
+用法：
+    python benchmarks/bench_textrank.py --sentences 10000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from AIDocGenius.summarizer import Summarizer
+
+TOPICS = [
+    "人工智能", "机器学习", "深度学习", "自然语言处理", "图像识别", "数据分析",
+    "神经网络", "知识图谱", "推荐系统", "语音识别", "文档处理", "信息检索",
+]
+TEMPLATES = [
+    "{0}在{1}领域取得了新的进展。",
+    "研究人员把{0}与{1}结合起来解决实际问题。",
+    "{0}的发展离不开{1}提供的基础。",
+    "Recent work applies {0} to {1} at scale.",
+]
+
+
+def build_text(sentences: int, seed: int = 0) -> str:
+    """生成主题交错的中英文混合长文"""
+    rng = random.Random(seed)
+    return "".join(
+        rng.choice(TEMPLATES).format(rng.choice(TOPICS), rng.choice(TOPICS))
+        for _ in range(sentences)
+    )
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TextRank 摘要基准")
+    parser.add_argument("--sentences", type=int, default=10000)
+    parser.add_argument("--max-length", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    summarizer = Summarizer(mode="textrank")
+    # 首次调用包含 numpy 的导入
+    summarizer.generate_summary(build_text(10))
+
+    for count in sorted({args.sentences // 10, args.sentences}):
+        text = build_text(count)
+        simple = measure(lambda: summarizer.generate_summary(text, args.max_length, mode="simple"), args.repeat)
+        textrank = measure(lambda: summarizer.generate_summary(text, args.max_length), args.repeat)
+        print(f"{count:>7} sentences  simple: {simple * 1000:7.1f} ms  textrank: {textrank * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准用的随机初始化小模型：不需要下载权重，只用于比较不同推理方式的吞吐与内存
+
+需要 torch、transformers 与 tokenizers。
+"""
+import random
+from pathlib import Path
+from typing import List, Union
+
+WORDS = [
+    "document", "summary", "model", "batch", "token", "language", "analysis", "report",
+    "system", "result", "method", "data", "network", "training", "inference", "quality",
+    "the", "a", "of", "and", "to", "in", "is", "for", "on", "with", "new", "large", "small",
+]
+
+
+def build_texts(count: int, min_words: int = 20, max_words: int = 200, seed: int = 0) -> List[str]:
+    """生成长度不一的英文句子串"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+        texts.append(" ".join(words) + ".")
+    return texts
+
+
+def _save_tokenizer(path: Path) -> int:
+    """保存按空格切词的快速分词器，返回词表大小"""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+
+    specials = ["<pad>", "</s>", "<unk>"]
+    vocab = {token: index for index, token in enumerate(specials + WORDS + [".", ":", "summarize"])}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, pad_token="<pad>", eos_token="</s>", unk_token="<unk>"
+    )
+    tokenizer.save_pretrained(path)
+    return len(vocab)
+
+
+def save_tiny_seq2seq(path: Union[str, Path], d_model: int = 64, layers: int = 2, seed: int = 0) -> Path:
+    """
+    在 path 下保存一个随机初始化的 T5 与按词切分的快速分词器
+
+    Args:
+        path: 保存目录
+        d_model: 隐层维度
+        layers: 编码器与解码器层数
+        seed: 随机种子
+
+    Returns:
+        Path: 保存目录，可直接作为 model_name 传给 Summarizer
+    """
+    import torch
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    path = Path(path)
+    vocab_size = _save_tokenizer(path)
+
+    torch.manual_seed(seed)
+    config = T5Config(
+        vocab_size=vocab_size,
+        d_model=d_model,
+        d_kv=d_model // 4,
+        d_ff=d_model * 4,
+        num_layers=layers,
+        num_heads=4,
+        pad_token_id=0,
+        eos_token_id=1,
+        decoder_start_token_id=0
+    )
+    T5ForConditionalGeneration(config).save_pretrained(path)
+    return path
+
+
+def save_tiny_marian(path: Union[str, Path], d_model: int = 64, layers: int = 2, seed: int = 0) -> Path:
+    """
+    在 path 下保存一个随机初始化的 Marian 翻译模型与按词切分的快速分词器
+
+    MarianTokenizer 需要 sentencepiece 模型文件，这里保存的是 PreTrainedTokenizerFast，
+    加载时用它代替 MarianTokenizer。
+
+    Args:
+        path: 保存目录
+        d_model: 隐层维度
+        layers: 编码器与解码器层数
+        seed: 随机种子
+
+    Returns:
+        Path: 保存目录
+    """
+    import torch
+    from transformers import MarianConfig, MarianMTModel
+
+    path = Path(path)
+    vocab_size = _save_tokenizer(path)
+
+    torch.manual_seed(seed)
+    config = MarianConfig(
+        vocab_size=vocab_size,
+        d_model=d_model,
+        encoder_layers=layers,
+        decoder_layers=layers,
+        encoder_attention_heads=4,
+        decoder_attention_heads=4,
+        encoder_ffn_dim=d_model * 4,
+        decoder_ffn_dim=d_model * 4,
+        max_position_embeddings=512,
+        pad_token_id=0,
+        eos_token_id=1,
+        decoder_start_token_id=0
+    )
+    MarianMTModel(config).save_pretrained(path)
+    return path
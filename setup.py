@@ -38,6 +38,9 @@ setup(
         "pydantic>=1.10.7",
     ],
     extras_require={
+        "textrank": [
+            "numpy>=1.21",
+        ],
         "dev": [
             "pytest>=7.3.1",
             "pytest-cov>=4.1.0",
@@ -26,6 +26,48 @@ class TestAnalyzer(unittest.TestCase):
         self.assertIn('statistics', result)
         self.assertIn('keywords', result)
     
+    def test_analyze_stream_matches_analyze(self):
+        """流式分析与整体分析结果一致"""
+        text = "第一段内容。还有一句。\n\n第二段有 3 个数字 42。\n\n第三段。"
+        criteria = ['statistics', 'structure', 'readability']
+        self.assertEqual(self.analyzer.analyze_stream(text.split("\n\n"), criteria),
+                         self.analyzer.analyze(text, criteria))
+    
+    def test_nltk_discovery_once_and_offline(self):
+        """NLTK 资源每个进程只检查一次，离线模式不下载"""
+        from unittest import mock
+        from AIDocGenius import analyzer as analyzer_module
+
+        if not analyzer_module.NLTK_AVAILABLE:
+            self.skipTest("nltk not installed")
+        with mock.patch.object(analyzer_module, "_nltk_status", {}), \
+                mock.patch.object(analyzer_module, "_discover_nltk_resources",
+                                  wraps=analyzer_module._discover_nltk_resources) as discover, \
+                mock.patch("nltk.download") as download:
+            Analyzer(offline=True).analyze("Hello world. Second sentence.")
+            result = Analyzer(offline=True).analyze("第一句。第二句。", ['statistics'])
+        self.assertEqual(discover.call_count, 1)
+        download.assert_not_called()
+        self.assertIn('statistics', result)
+
+    def test_nltk_status_cached_per_offline_mode(self):
+        """离线检查的结果不会挡住之后的联网检查"""
+        from unittest import mock
+        from AIDocGenius import analyzer as analyzer_module
+
+        def discover(offline):
+            return {'punkt': not offline, 'tagger': False}
+
+        with mock.patch.object(analyzer_module, "_nltk_status", {}), \
+                mock.patch.object(analyzer_module, "_discover_nltk_resources",
+                                  side_effect=discover) as discover_mock:
+            self.assertFalse(analyzer_module.nltk_status(offline=True)['punkt'])
+            self.assertTrue(analyzer_module.nltk_status(offline=False)['punkt'])
+            self.assertTrue(analyzer_module.nltk_status(offline=False)['punkt'])
+            with mock.patch.dict("os.environ", {"NLTK_OFFLINE": "1"}):
+                self.assertTrue(analyzer_module.nltk_status()['punkt'])
+        self.assertEqual([call.args for call in discover_mock.call_args_list], [(True,), (False,)])
+    
     def test_readability_score(self):
         """测试可读性评分"""
         result = self.analyzer.analyze(self.test_text)
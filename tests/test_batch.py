@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试批处理
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from AIDocGenius import DocProcessor
+from AIDocGenius.batch import BatchJournal
+
+
+def _strip_timing(report):
+    """去掉报告中的耗时字段，便于比较"""
+    files = []
+    for entry in report["files"]:
+        entry = dict(entry)
+        entry.pop("seconds", None)
+        entry.pop("extract_seconds", None)
+        entry["operations"] = {
+            name: {k: v for k, v in info.items() if k != "seconds"}
+            for name, info in entry["operations"].items()
+        }
+        files.append(entry)
+    return files
+
+
+class TestBatchProcess(unittest.TestCase):
+    """测试批处理"""
+
+    def setUp(self):
+        self.processor = DocProcessor()
+        self.temp_path = Path(tempfile.mkdtemp())
+        self.input_dir = self.temp_path / "input"
+        (self.input_dir / "sub").mkdir(parents=True)
+        for i in range(4):
+            (self.input_dir / f"doc{i}.txt").write_text(f"文档{i}的内容。第二句话。" * 5, encoding="utf-8")
+        (self.input_dir / "sub" / "note.md").write_text("# 标题\n\n正文内容。", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path, ignore_errors=True)
+
+    def _run(self, output_name, **kwargs):
+        return self.processor.batch_process(
+            input_dir=self.input_dir,
+            output_dir=self.temp_path / output_name,
+            operations=["summarize", "convert"],
+            max_length=50,
+            output_format="html",
+            report=True,
+            report_only=True,
+            **kwargs
+        )
+
+    def test_operation_kwargs_routing(self):
+        """摘要参数不会传给其他操作"""
+        report = self._run("serial", target_language="en")
+        self.assertEqual(report["error_count"], 0)
+        for entry in report["files"]:
+            self.assertTrue(Path(entry["outputs"]["summarize"]).exists())
+            self.assertTrue(Path(entry["outputs"]["convert"]).exists())
+
+    def test_parallel_matches_serial(self):
+        """并行结果与串行一致，且保持输入顺序"""
+        serial = self._run("out")
+        serial_files = _strip_timing(serial)
+        serial_outputs = {
+            path: Path(path).read_bytes()
+            for entry in serial["files"] for path in entry["outputs"].values()
+        }
+
+        parallel = self._run("out", workers=2)
+        self.assertEqual(_strip_timing(parallel), serial_files)
+        for path, content in serial_outputs.items():
+            self.assertEqual(Path(path).read_bytes(), content)
+
+    def test_custom_executor(self):
+        """支持外部线程池"""
+        serial = self._run("serial")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            threaded = self._run("threaded", executor=executor)
+        self.assertEqual(
+            [entry["path"] for entry in threaded["files"]],
+            [entry["path"] for entry in serial["files"]]
+        )
+        self.assertEqual(threaded["error_count"], 0)
+
+    def test_incremental_skips_unchanged_files(self):
+        """增量模式跳过未变化的文件"""
+        first = self._run("out", incremental=True)
+        self.assertEqual(first["processed_files"], 5)
+        self.assertTrue((self.temp_path / "out" / "batch_manifest.json").exists())
+
+        changed = self.input_dir / "doc1.txt"
+        changed.write_text("新的内容。", encoding="utf-8")
+        second = self._run("out", incremental=True)
+        self.assertEqual(second["skipped_files"], 4)
+        self.assertEqual(second["processed_files"], 1)
+        statuses = {Path(entry["path"]).name: entry["status"] for entry in second["files"]}
+        self.assertEqual(statuses["doc1.txt"], "ok")
+        self.assertEqual(statuses["doc0.txt"], "skipped")
+        skipped = next(entry for entry in second["files"] if entry["status"] == "skipped")
+        self.assertTrue(Path(skipped["outputs"]["summarize"]).exists())
+
+    def test_incremental_reruns_on_parameter_change(self):
+        """参数变化时不跳过"""
+        self._run("out", incremental=True)
+        report = self.processor.batch_process(
+            input_dir=self.input_dir,
+            output_dir=self.temp_path / "out",
+            operations=["summarize", "convert"],
+            max_length=80,
+            output_format="html",
+            report=True,
+            report_only=True,
+            incremental=True
+        )
+        self.assertEqual(report["skipped_files"], 0)
+
+    def test_incremental_reruns_on_component_config_change(self):
+        """组件配置变化时不跳过，未涉及的组件配置不影响"""
+        self._run("out", incremental=True)
+        self.processor = DocProcessor(config={"translator": {"use_google": False}})
+        self.assertEqual(self._run("out", incremental=True)["skipped_files"], 5)
+        self.processor = DocProcessor(config={"summarizer": {"mode": "textrank"}})
+        report = self._run("out", incremental=True)
+        self.assertEqual(report["skipped_files"], 0)
+        self.assertEqual(report["processed_files"], 5)
+        self.assertEqual(self._run("out", incremental=True)["skipped_files"], 5)
+
+    def test_document_loaded_once_per_file(self):
+        """每个文件只加载一次"""
+        from unittest import mock
+        from AIDocGenius import processor as processor_module
+
+        with mock.patch.object(processor_module, "load_document",
+                               wraps=processor_module.load_document) as load:
+            report = self.processor.batch_process(
+                input_dir=self.input_dir,
+                output_dir=self.temp_path / "out",
+                operations=["summarize", "convert"],
+                output_format="html",
+                report=True,
+                report_only=True
+            )
+        self.assertEqual(load.call_count, 5)
+        self.assertEqual(report["error_count"], 0)
+        self.assertIn("extract_seconds", report["files"][0])
+
+    def test_preloaded_text(self):
+        """公开方法支持直接传入已提取的文本"""
+        summary = self.processor.generate_summary(text="第一句话。第二句话。", max_length=20)
+        self.assertTrue(summary.startswith("第一句话"))
+
+    def test_iter_batch_process(self):
+        """生成器逐个产出文件结果"""
+        output_dir = self.temp_path / "out"
+        jsonl_path = output_dir / "stream.jsonl"
+        entries = self.processor.iter_batch_process(
+            self.input_dir, output_dir, ["summarize"],
+            max_length=50, jsonl_report=jsonl_path
+        )
+        first = next(entries)
+        self.assertIn("summary", first["results"])
+        self.assertEqual(first["status"], "ok")
+        rest = list(entries)
+        self.assertEqual(len(rest), 4)
+
+        lines = jsonl_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertNotIn("results", json.loads(lines[0]))
+
+    def test_jsonl_report_format(self):
+        """jsonl 报告格式"""
+        report = self._run("out", report_formats=["jsonl", "md"], workers=2)
+        lines = (self.temp_path / "out" / "batch_report.jsonl").read_text(encoding="utf-8").splitlines()
+        self.assertEqual([json.loads(line)["path"] for line in lines],
+                         [entry["path"] for entry in report["files"]])
+        md = (self.temp_path / "out" / "batch_report.md").read_text(encoding="utf-8")
+        self.assertIn("summary_output", md)
+
+    def test_resume_from_journal(self):
+        """中断后从检查点日志恢复"""
+        from unittest import mock
+
+        output_dir = self.temp_path / "out"
+        entries = self.processor.iter_batch_process(
+            self.input_dir, output_dir, ["summarize"], max_length=50
+        )
+        finished = [next(entries), next(entries)]
+        entries.close()
+        self.assertTrue((output_dir / "batch_journal.jsonl").exists())
+        for entry in finished:
+            entry.pop("results")
+
+        with mock.patch.object(DocProcessor, "_process_batch_file",
+                               autospec=True, side_effect=DocProcessor._process_batch_file) as process:
+            report = self.processor.batch_process(
+                self.input_dir, output_dir, ["summarize"], max_length=50,
+                report=True, report_only=True, resume=True
+            )
+        self.assertEqual(process.call_count, 3)
+        self.assertEqual(report["total_files"], 5)
+        self.assertEqual(report["files"][:2], finished)
+        self.assertFalse((output_dir / "batch_journal.jsonl").exists())
+
+    def test_journal_replay_reads_records_lazily(self):
+        """日志恢复只保留偏移，结果按需读取，写了一半的末行在续写前截掉"""
+        journal = BatchJournal(self.temp_path)
+        journal.open(["summarize"], {"max_length": 50})
+        for name in ("a.txt", "b.txt"):
+            journal.append({"path": name, "status": "success"}, {"summary": name})
+        journal.close()
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"entry": {"path": "c.t')
+
+        journal = BatchJournal(self.temp_path)
+        self.assertEqual(journal.replay(["summarize"], {"max_length": 60}), {})
+        offsets = journal.replay(["summarize"], {"max_length": 50})
+        self.assertEqual(sorted(offsets), ["a.txt", "b.txt"])
+        self.assertTrue(all(isinstance(offset, int) for offset in offsets.values()))
+        self.assertEqual(journal.read(offsets["b.txt"])["results"], {"summary": "b.txt"})
+
+        journal.open(["summarize"], {"max_length": 50}, resume=True)
+        journal.append({"path": "c.txt", "status": "success"}, {"summary": "c.txt"})
+        self.assertEqual(journal.read(offsets["a.txt"])["entry"]["path"], "a.txt")
+        journal.close()
+        offsets = BatchJournal(self.temp_path).replay(["summarize"], {"max_length": 50})
+        self.assertEqual(sorted(offsets), ["a.txt", "b.txt", "c.txt"])
+
+    def test_scan_filters_and_prunes_output(self):
+        """扫描时过滤不支持的格式并剪除输出目录"""
+        from AIDocGenius.batch import scan_batch_files
+
+        (self.input_dir / "image.png").write_bytes(b"\x89PNG")
+        output_dir = self.input_dir / "out"
+        output_dir.mkdir()
+        (output_dir / "old.summary.txt").write_text("旧结果", encoding="utf-8")
+
+        suffixes = self.processor.supported_suffixes
+        files = list(scan_batch_files(self.input_dir, suffixes, exclude_dir=output_dir))
+        names = [file.relative_to(self.input_dir).as_posix() for file in files]
+        self.assertEqual(names, ["doc0.txt", "doc1.txt", "doc2.txt", "doc3.txt", "sub/note.md"])
+
+        files = scan_batch_files(self.input_dir, suffixes, exclude_dir=output_dir,
+                                 include=["*.md"])
+        self.assertEqual([file.name for file in files], ["note.md"])
+        files = scan_batch_files(self.input_dir, suffixes, exclude_dir=output_dir,
+                                 exclude=["sub", "doc0.txt"])
+        self.assertEqual(len(list(files)), 3)
+
+    def test_output_dir_must_differ_from_input(self):
+        """输出目录与输入目录相同时拒绝运行，扫描也不会读回输出"""
+        from AIDocGenius.batch import scan_batch_files
+        from AIDocGenius.exceptions import DocumentProcessError
+
+        with self.assertRaises(DocumentProcessError):
+            self.processor.batch_process(self.input_dir, self.input_dir, ["summarize"])
+        with self.assertRaises(DocumentProcessError):
+            self.processor.batch_process(self.input_dir, self.input_dir / "sub" / "..", ["summarize"])
+        self.assertEqual(list(self.input_dir.rglob("*.summary.txt")), [])
+        self.assertEqual(list(scan_batch_files(self.input_dir, self.processor.supported_suffixes,
+                                               exclude_dir=self.input_dir)), [])
+
+    def test_file_list(self):
+        """从文件清单读取待处理文件"""
+        import io
+
+        file_list = io.StringIO("doc0.txt\n\nsub/note.md\nmissing.txt\nimage.png\n")
+        report = self._run("out", file_list=file_list)
+        self.assertEqual(
+            [Path(entry["path"]).name for entry in report["files"]],
+            ["doc0.txt", "note.md"]
+        )
+
+    def test_file_list_rejects_paths_outside_input(self):
+        """清单中跳出输入目录的 ../ 条目被跳过"""
+        (self.temp_path / "secret.txt").write_text("目录外的文件。", encoding="utf-8")
+        report = self._run("out", file_list=iter(["../secret.txt", "sub/../doc1.txt", "sub/../../secret.txt"]))
+        self.assertEqual([Path(entry["path"]).name for entry in report["files"]], ["doc1.txt"])
+        self.assertFalse((self.temp_path / "secret.summary.txt").exists())
+
+    def test_pipeline_matches_serial(self):
+        """流水线模式与串行结果一致"""
+        serial = _strip_timing(self._run("out"))
+        self.assertEqual(_strip_timing(self._run("out", pipeline=True)), serial)
+        self.assertEqual(_strip_timing(self._run("out", pipeline=True, workers=2)), serial)
+
+    def test_corpus_batched_translation(self):
+        """跨文件批量翻译"""
+        from unittest import mock
+
+        calls = []
+
+        def fake_translate(text, source_lang, target_lang, batch_size=8):
+            calls.append(list(text))
+            return [segment.upper() for segment in text]
+
+        for i in range(3):
+            (self.input_dir / f"note{i}.txt").write_text(f"line a{i}\n\nline b{i}", encoding="utf-8")
+        with mock.patch.object(self.processor.translator, "translate", side_effect=fake_translate):
+            report = self.processor.batch_process(
+                self.input_dir, self.temp_path / "out", ["summarize", "translate"],
+                target_language="en", source_language="zh", translate_batch_size=100,
+                file_list=iter(["note0.txt", "note1.txt", "note2.txt", "doc0.txt"]),
+                report=True, report_only=True
+            )
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(calls[0]), 7)
+        self.assertEqual(report["error_count"], 0)
+        first = report["files"][0]
+        self.assertEqual(list(first["operations"]), ["summarize", "translate"])
+        self.assertEqual(first["operations"]["translate"]["status"], "ok")
+        output = Path(first["outputs"]["translate"])
+        self.assertEqual(output.read_text(encoding="utf-8"), "LINE A0\n\nLINE B0")
+        self.assertNotIn("_deferred_translation", first)
+
+    def test_google_segment_packing(self):
+        """Google 翻译按字符数合并片段"""
+        from AIDocGenius.translator import Translator
+
+        translator = Translator(use_google=False, google_max_chars=10)
+        self.assertEqual(translator._pack_segments(["abcd", "efgh", "ij", "klmnopqrstuv"]),
+                         [["abcd", "efgh"], ["ij"], ["klmnopqrstuv"]])
+
+    def test_dedupe_identical_inputs(self):
+        """内容相同的文件只处理一次"""
+        from unittest import mock
+
+        shutil.copyfile(self.input_dir / "doc0.txt", self.input_dir / "sub" / "copy.txt")
+        with mock.patch.object(DocProcessor, "_process_batch_file",
+                               autospec=True, side_effect=DocProcessor._process_batch_file) as process:
+            report = self._run("out", dedupe=True, dedupe_link=True)
+        self.assertEqual(process.call_count, 5)
+        self.assertEqual(report["total_files"], 6)
+        self.assertEqual(report["duplicate_files"], 1)
+        entry = next(e for e in report["files"] if e["path"].endswith("copy.txt"))
+        self.assertEqual(entry["duplicate_of"], str(self.input_dir / "doc0.txt"))
+        original = next(e for e in report["files"] if e["path"].endswith("doc0.txt"))
+        for operation, path in entry["outputs"].items():
+            self.assertTrue(Path(path).name.startswith("copy."))
+            self.assertEqual(Path(path).read_bytes(), Path(original["outputs"][operation]).read_bytes())
+
+    def test_dedupe_respects_format(self):
+        """字节相同但后缀不同的文件按各自格式处理；同一原文件的多个副本都能输出"""
+        content = '{"title": "标题", "body": "正文内容。"}'
+        (self.input_dir / "data.txt").write_text(content, encoding="utf-8")
+        (self.input_dir / "data.json").write_text(content, encoding="utf-8")
+        for i in range(3):
+            shutil.copyfile(self.input_dir / "doc1.txt", self.input_dir / "sub" / f"copy{i}.txt")
+        plain = {Path(e["path"]).name: e for e in self._run("plain")["files"]}
+        report = self._run("out", dedupe=True)
+        entries = {Path(e["path"]).name: e for e in report["files"]}
+
+        self.assertNotIn("duplicate_of", entries["data.json"])
+        self.assertNotIn("duplicate_of", entries["data.txt"])
+        self.assertEqual(report["duplicate_files"], 3)
+        for name in ("data.txt", "data.json", "copy2.txt"):
+            self.assertEqual(Path(entries[name]["outputs"]["summarize"]).read_bytes(),
+                             Path(plain[name]["outputs"]["summarize"]).read_bytes())
+
+    def test_size_aware_schedule(self):
+        """按估计成本调度，报告保持输入顺序"""
+        (self.input_dir / "doc2.txt").write_text("很长的文档内容。" * 200, encoding="utf-8")
+        entries = list(self.processor.iter_batch_process(
+            self.input_dir, self.temp_path / "iter", ["summarize"],
+            max_length=50, schedule="longest_first"
+        ))
+        self.assertEqual(Path(entries[0]["path"]).name, "doc2.txt")
+        self.assertEqual(Path(entries[-1]["path"]).name, "note.md")
+
+        serial = self._run("serial")
+        report = self._run("out", schedule="shortest_first", workers=2)
+        self.assertEqual(report["schedule"], "shortest_first")
+        self.assertEqual([entry["index"] for entry in report["files"]], list(range(5)))
+        self.assertEqual([entry["path"] for entry in report["files"]],
+                         [entry["path"] for entry in serial["files"]])
+        self.assertTrue(all(entry["estimated_cost"] > 0 for entry in report["files"]))
+
+        # 不生成报告时，返回的结果同样按输入顺序排列
+        results = self.processor.batch_process(
+            input_dir=self.input_dir, output_dir=self.temp_path / "plain",
+            operations=["summarize"], max_length=50, schedule="longest_first"
+        )
+        self.assertEqual(list(results), [entry["path"] for entry in serial["files"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
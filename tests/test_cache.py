@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试缓存
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from docx import Document
+
+from AIDocGenius import cache as cache_module
+from AIDocGenius import utils
+from AIDocGenius.cache import ExtractionCache, ResultCache, configure_extraction_cache
+
+
+class TestExtractionCache(unittest.TestCase):
+    """测试提取缓存"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        configure_extraction_cache(None)
+        cache_module._extraction_cache_configured = False
+        self.temp_dir.cleanup()
+
+    def test_lru_eviction(self):
+        cache = ExtractionCache(self.temp_path / "cache.sqlite3", max_bytes=10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        self.assertEqual(cache.get("a"), "aaaa")
+        cache.put("c", "cccc")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "aaaa")
+        self.assertEqual(cache.get("c"), "cccc")
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["misses"], 1)
+        cache.close()
+
+    def test_running_total(self):
+        path = self.temp_path / "cache.sqlite3"
+        cache = ExtractionCache(path, max_bytes=100)
+        connection = cache._connect()
+        statements = []
+        connection.set_trace_callback(statements.append)
+        cache.put("a:1", "aaaa")
+        cache.put("b:1", "bb")
+        cache.put("a:1", "aaaaaa")
+        connection.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if "SUM(" in sql])
+        self.assertEqual(cache.stats()["bytes"], 8)
+        self.assertEqual(cache.delete_matching("a:*"), 1)
+        self.assertEqual(cache.stats()["bytes"], 2)
+        cache.clear()
+        self.assertEqual(cache.stats()["bytes"], 0)
+        cache.close()
+
+        # 没有 meta 表的旧缓存文件在打开时按现有条目求和
+        import sqlite3
+
+        legacy = self.temp_path / "legacy.sqlite3"
+        connection = sqlite3.connect(str(legacy))
+        connection.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                           "accessed REAL NOT NULL, value TEXT NOT NULL)")
+        connection.execute("INSERT INTO entries VALUES ('old', 3, 0, 'abc')")
+        connection.commit()
+        connection.close()
+        cache = ExtractionCache(legacy, max_bytes=100)
+        cache.put("new", "de")
+        self.assertEqual(cache.stats()["bytes"], 5)
+        cache.close()
+
+    def test_load_document_uses_cache(self):
+        path = self.temp_path / "report.docx"
+        doc = Document()
+        doc.add_paragraph("缓存的内容")
+        doc.save(str(path))
+
+        cache = configure_extraction_cache(self.temp_path / "extract.sqlite3")
+        with mock.patch.object(utils, "load_docx_text", wraps=utils.load_docx_text) as extract:
+            first = utils.load_document(path)
+            second = utils.load_document(path)
+        self.assertEqual(first, second)
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+        doc.add_paragraph("修改后")
+        doc.save(str(path))
+        self.assertIn("修改后", utils.load_document(path))
+
+
+
+class TestResultCache(unittest.TestCase):
+    """测试结果缓存"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_memory_and_disk_tiers(self):
+        path = self.temp_path / "results.sqlite3"
+        cache = ResultCache(max_entries=1, path=path)
+        key_a = ResultCache.make_key("summary", "aaa", {"max_length": 100})
+        key_b = ResultCache.make_key("analyze", "bbb")
+        self.assertNotEqual(key_a, ResultCache.make_key("summary", "aaa", {"max_length": 200}))
+        self.assertNotEqual(key_a, ResultCache.make_key("summary", "aaa", {"max_length": 100}, version="2"))
+
+        cache.put(key_a, "摘要")
+        cache.put(key_b, {"score": 1})
+        # key_a 已被挤出内存层，从磁盘层读回
+        self.assertEqual(cache.get(key_a), "摘要")
+        self.assertEqual(cache.get(key_a), "摘要")
+        # 每次命中都是新对象，修改返回值不影响缓存
+        result_b = cache.get(key_b)
+        result_b["score"] = 2
+        self.assertEqual(cache.get(key_b), {"score": 1})
+        self.assertIsNone(cache.get(ResultCache.make_key("summary", "ccc")))
+        stats = cache.stats()
+        self.assertEqual((stats["disk_hits"], stats["misses"], stats["memory_entries"]), (2, 1, 1))
+        cache.close()
+
+        reopened = ResultCache(path=path)
+        self.assertEqual(reopened.get(key_b), {"score": 1})
+        self.assertEqual(reopened.invalidate(content_hash="aaa"), 1)
+        self.assertIsNone(reopened.get(key_a))
+        self.assertEqual(reopened.invalidate(operation="analyze"), 2)
+        self.assertIsNone(reopened.get(key_b))
+        reopened.close()
+
+    def test_processor_operations_are_cached(self):
+        from AIDocGenius import DocProcessor
+
+        path = self.temp_path / "doc.txt"
+        path.write_text("人工智能技术正在快速发展。机器学习是人工智能的核心技术之一。", encoding="utf-8")
+        processor = DocProcessor(config={"cache": {"max_entries": 16}})
+        with mock.patch.object(processor.summarizer, "generate_summary",
+                               wraps=processor.summarizer.generate_summary) as summarize:
+            first = processor.generate_summary(path, max_length=20)
+            self.assertEqual(processor.generate_summary(path.read_bytes(), max_length=20, file_format="txt"), first)
+            self.assertEqual(summarize.call_count, 1)
+            processor.generate_summary(path, max_length=30)
+            self.assertEqual(summarize.call_count, 2)
+
+            self.assertEqual(processor.invalidate_results(path, operation="summary"), 2)
+            processor.generate_summary(path, max_length=20)
+            self.assertEqual(summarize.call_count, 3)
+
+        report = processor.analyze(path)
+        report["statistics"] = None
+        self.assertIsNotNone(processor.analyze(path)["statistics"])
+        self.assertEqual(processor.compare_documents(path, path), processor.compare_documents(path, path))
+        stats = processor.result_cache.stats()
+        self.assertEqual(stats["hits"], 3)
+        self.assertIsNone(DocProcessor().result_cache)
+
+
+    def test_invalidate_covers_batch_results(self):
+        from AIDocGenius import DocProcessor
+
+        input_dir = self.temp_path / "in"
+        input_dir.mkdir()
+        path = input_dir / "doc.txt"
+        path.write_text("人工智能技术正在快速发展。机器学习是人工智能的核心技术之一。", encoding="utf-8")
+        processor = DocProcessor(config={"cache": {"max_entries": 16}})
+        for pipeline in (False, True):
+            processor.batch_process(input_dir, self.temp_path / "out", ["summarize", "analyze"],
+                                    max_length=20, pipeline=pipeline)
+        self.assertEqual(processor.result_cache.stats()["hits"], 2)
+        # 批处理的结果按文件的字节摘要记录，按路径失效时一并删除
+        self.assertEqual(processor.invalidate_results(path), 2)
+        self.assertEqual(processor.result_cache.stats()["memory_entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
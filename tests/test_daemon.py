@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试常驻进程
+"""
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from AIDocGenius import cli
+from AIDocGenius.daemon import (
+    UNIX_SOCKETS_AVAILABLE, DocDaemon, default_socket_path, forward_command, send_request, socket_is_trusted
+)
+from AIDocGenius.exceptions import DaemonError
+
+
+@unittest.skipUnless(UNIX_SOCKETS_AVAILABLE, "Unix domain sockets are not available")
+class TestDocDaemon(unittest.TestCase):
+    """测试常驻进程与转发"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.socket_path = self.temp_path / "daemon.sock"
+        self.test_file = self.temp_path / "doc.txt"
+        self.test_file.write_text(
+            "人工智能技术正在快速发展。机器学习是人工智能的核心技术之一。"
+            "深度学习取得了突破性进展。未来人工智能将发挥重要作用。",
+            encoding="utf-8"
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _start(self) -> threading.Thread:
+        daemon = DocDaemon(socket_path=self.socket_path)
+        daemon.bind()
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def test_forward_matches_local(self):
+        thread = self._start()
+        try:
+            args = cli.create_parser().parse_args(["summary", str(self.test_file), "--max-length", "40"])
+            local = cli.summary_command(args)
+            payload = {key: value for key, value in vars(args).items() if key not in ("socket", "no_daemon")}
+            response = forward_command("summary", payload, socket_path=self.socket_path)
+            self.assertTrue(response["ok"])
+            self.assertEqual(response["result"], local)
+
+            response = send_request("analyze", {"input": str(self.temp_path / "missing.txt")},
+                                    socket_path=self.socket_path)
+            self.assertFalse(response["ok"])
+
+            status = send_request("ping", socket_path=self.socket_path)["result"]
+            self.assertEqual(status["requests"], 2)
+            self.assertEqual(status["processors"], 1)
+        finally:
+            send_request("shutdown", socket_path=self.socket_path)
+            thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(self.socket_path.exists())
+
+    def test_fallback_without_daemon(self):
+        self.assertIsNone(send_request("ping", socket_path=self.socket_path))
+        # 残留的套接字文件不影响回退，也不妨碍新的常驻进程启动
+        self.socket_path.touch()
+        self.assertIsNone(send_request("ping", socket_path=self.socket_path))
+        args = argparse.Namespace(command="summary", no_daemon=False, socket=str(self.socket_path))
+        self.assertEqual(cli._forward_to_daemon(args), (False, None))
+
+        thread = self._start()
+        send_request("shutdown", socket_path=self.socket_path)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+
+    def test_untrusted_socket_is_not_used(self):
+        # 其他用户可写的目录中的套接字：不转发，本地执行
+        shared = self.temp_path / "shared"
+        shared.mkdir()
+        os.chmod(shared, 0o777)
+        path = shared / "daemon.sock"
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(listener.close)
+        listener.bind(str(path))
+        listener.listen(1)
+        self.assertFalse(socket_is_trusted(path))
+        self.assertIsNone(send_request("ping", socket_path=path))
+        args = argparse.Namespace(command="summary", no_daemon=False, socket=str(path))
+        self.assertEqual(cli._forward_to_daemon(args), (False, None))
+        with self.assertRaises(DaemonError):
+            DocDaemon(socket_path=shared / "other.sock").bind()
+
+        # 私有目录中的套接字只有属主可用
+        os.chmod(shared, 0o700)
+        self.assertTrue(socket_is_trusted(path))
+        with mock.patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertFalse(socket_is_trusted(path))
+
+        # 符号链接不被跟随
+        link = shared / "link.sock"
+        link.symlink_to(path)
+        self.assertFalse(socket_is_trusted(link))
+
+    def test_default_socket_in_private_directory(self):
+        with mock.patch.dict("os.environ", {"TMPDIR": str(self.temp_path)}, clear=True), \
+                mock.patch("tempfile.tempdir", None):
+            path = default_socket_path()
+            self.assertEqual(path.parent, self.temp_path / f"aidocgenius-{os.getuid()}")
+            daemon = DocDaemon()
+            daemon.bind()
+            self.addCleanup(daemon._server.server_close)
+        self.assertEqual(os.stat(path.parent).st_mode & 0o777, 0o700)
+        self.assertTrue(socket_is_trusted(path))
+
+if __name__ == "__main__":
+    unittest.main()
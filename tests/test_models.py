@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试模型注册表
+"""
+import importlib.util
+import threading
+import time
+import unittest
+from unittest import mock
+
+from AIDocGenius import models as models_module
+from AIDocGenius import summarizer as summarizer_module
+from AIDocGenius.models import (
+    ModelRegistry, configure_inference_threads, model_memory_bytes, prepare_for_inference, registry_device,
+    resolve_device
+)
+from AIDocGenius.summarizer import Summarizer
+
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+
+class FakeTensor:
+    def __init__(self, numel: int):
+        self._numel = numel
+
+    def numel(self) -> int:
+        return self._numel
+
+    def element_size(self) -> int:
+        return 4
+
+
+class FakeModel:
+    """参数总量为 size 字节的假模型"""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def parameters(self):
+        return [FakeTensor(self.size // 4)]
+
+    def buffers(self):
+        return []
+
+
+class TestModelRegistry(unittest.TestCase):
+    """测试模型注册表"""
+
+    def loader(self, size: int):
+        def load():
+            self.loaded.append(size)
+            return FakeModel(size), "tokenizer"
+        return load
+
+    def setUp(self):
+        self.loaded = []
+
+    def test_dedupe_and_lru_eviction(self):
+        registry = ModelRegistry(memory_budget=250)
+        self.assertEqual(model_memory_bytes(FakeModel(100)), 100)
+
+        first, _ = registry.get("a", "cpu", self.loader(100))
+        self.assertIs(registry.get("a", "cpu", self.loader(100))[0], first)
+        registry.get("a", "cuda", self.loader(100))
+        self.assertEqual(self.loaded, [100, 100])
+
+        # 加载 b 超出预算，淘汰最久未使用的 a/cpu
+        registry.get("a", "cuda", self.loader(100))
+        registry.get("b", "cpu", self.loader(100))
+        resident = [(entry["model_name"], entry["device"]) for entry in registry.resident()]
+        self.assertEqual(resident, [("a", "cuda"), ("b", "cpu")])
+
+        # 单个模型超出预算时仍然保留，其他模型全部淘汰
+        registry.get("huge", "cpu", self.loader(1000))
+        stats = registry.stats()
+        self.assertEqual([entry["model_name"] for entry in stats["resident"]], ["huge"])
+        self.assertEqual((stats["loads"], stats["evictions"], stats["hits"]), (4, 3, 2))
+        self.assertGreaterEqual(stats["resident"][0]["load_seconds"], 0)
+
+        registry.set_memory_budget(None)
+        registry.get("a", "cpu", self.loader(100))
+        self.assertEqual(registry.used_bytes(), 1100)
+        self.assertEqual(registry.evict("a"), 1)
+
+    def test_concurrent_requests_load_once(self):
+        registry = ModelRegistry()
+
+        def slow_loader():
+            time.sleep(0.05)
+            self.loaded.append(1)
+            return FakeModel(4), "tokenizer"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get("m", "cpu", slow_loader)[0]))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.loaded), 1)
+        self.assertTrue(all(model is results[0] for model in results))
+
+    def test_summarizers_share_models(self):
+        registry = ModelRegistry()
+        model = FakeModel(4)
+        registry.get("shared-model", "cpu", lambda: (model, "tokenizer"))
+        with mock.patch.object(summarizer_module, "TRANSFORMERS_AVAILABLE", True), \
+                mock.patch.object(summarizer_module, "get_model_registry", return_value=registry):
+            first = Summarizer(mode="model", model_name="shared-model", device="cpu")
+            second = Summarizer(mode="model", model_name="shared-model", device="cpu")
+            self.assertIs(first.model, model)
+            self.assertIs(second.model, model)
+            self.assertEqual(second.tokenizer, "tokenizer")
+        self.assertEqual(registry.stats()["loads"], 1)
+
+
+class TestCpuOptimization(unittest.TestCase):
+    """测试 CPU 优化模式"""
+
+    def test_optimized_models_are_registered_separately(self):
+        self.assertEqual(registry_device("cpu", True), "cpu:int8")
+        self.assertEqual(registry_device("cuda", True), "cuda")
+        self.assertEqual(registry_device("cpu", False), "cpu")
+
+        registry = ModelRegistry()
+        fp32, int8 = FakeModel(8), FakeModel(2)
+        registry.get("shared-model", "cpu", lambda: (fp32, "tokenizer"))
+        registry.get("shared-model", "cpu:int8", lambda: (int8, "tokenizer"))
+        with mock.patch.object(summarizer_module, "TRANSFORMERS_AVAILABLE", True), \
+                mock.patch.object(summarizer_module, "get_model_registry", return_value=registry), \
+                mock.patch.object(summarizer_module, "configure_inference_threads") as threads:
+            plain = Summarizer(mode="model", model_name="shared-model", device="cpu")
+            optimized = Summarizer(mode="model", model_name="shared-model", device="cpu",
+                                   cpu_optimize=True, num_threads=2)
+            self.assertIs(plain.model, fp32)
+            self.assertIs(optimized.model, int8)
+        threads.assert_called_with(2)
+        self.assertEqual(registry.stats()["loads"], 2)
+
+    @unittest.skipUnless(TORCH_AVAILABLE, "torch is not installed")
+    def test_quantization_shrinks_linear_layers(self):
+        import torch
+
+        model = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 8))
+        inputs = torch.randn(2, 64)
+        expected = model(inputs)
+        fp32_bytes = model_memory_bytes(model)
+        quantized = prepare_for_inference(model, "cpu", cpu_optimize=True)
+        quantized_bytes = model_memory_bytes(quantized)
+        # int8 权重约为 fp32 的四分之一（偏置仍为 fp32）
+        self.assertGreater(quantized_bytes, 0)
+        self.assertLess(quantized_bytes, fp32_bytes / 2)
+        with torch.inference_mode():
+            self.assertLess((quantized(inputs) - expected).abs().max().item(), 0.1)
+
+    @unittest.skipUnless(TORCH_AVAILABLE, "torch is not installed")
+    def test_device_resolution_shared(self):
+        from AIDocGenius.translator import Translator
+
+        self.assertEqual(resolve_device("cuda"), "cuda")
+        with mock.patch.object(models_module, "TRANSFORMERS_AVAILABLE", False):
+            self.assertEqual(resolve_device(), "cpu")
+            self.assertEqual(Summarizer(use_simple=True).device, "cpu")
+            self.assertEqual(Translator(use_google=False).device, "cpu")
+        self.assertEqual(Translator(device="cpu:1", use_google=False).device, "cpu:1")
+
+    def test_thread_count_split_across_workers(self):
+        import torch
+
+        original = torch.get_num_threads()
+        self.addCleanup(torch.set_num_threads, original)
+        self.addCleanup(setattr, models_module, "_inference_threads", None)
+        with mock.patch.dict("os.environ", {"INFERENCE_WORKERS": "4"}), \
+                mock.patch("os.cpu_count", return_value=8):
+            self.assertEqual(configure_inference_threads(), 2)
+            self.assertEqual(torch.get_num_threads(), 2)
+        self.assertEqual(configure_inference_threads(1), 1)
+        self.assertEqual(torch.get_num_threads(), 1)
+
+    @unittest.skipUnless(TORCH_AVAILABLE, "torch is not installed")
+    def test_batch_workers_split_cores(self):
+        """批处理进程池的 initializer 记录进程数，各进程只取一份核心"""
+        import torch
+        from AIDocGenius import batch as batch_module
+
+        self.addCleanup(torch.set_num_threads, torch.get_num_threads())
+        self.addCleanup(setattr, models_module, "_inference_threads", None)
+        self.addCleanup(setattr, batch_module, "_worker_processor", None)
+        with mock.patch.dict("os.environ", {}, clear=True), mock.patch("os.cpu_count", return_value=8):
+            batch_module.init_worker(None, workers=4)
+            self.assertEqual(configure_inference_threads(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -149,6 +149,22 @@ class TestDocProcessor(unittest.TestCase):
         
         self.assertEqual(processor.config['test_key'], 'test_value')
 
+    def test_lazy_imports(self):
+        """导入包和创建处理器时不加载重量级依赖"""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys\n"
+            "from AIDocGenius import DocProcessor\n"
+            "processor = DocProcessor()\n"
+            "heavy = ['googletrans', 'nltk', 'torch', 'transformers', 'PyPDF2', 'docx', 'markdown', 'yaml']\n"
+            "print(','.join(name for name in heavy if name in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=str(Path(__file__).parent.parent), check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试推理调度器
+"""
+import threading
+import unittest
+from unittest import mock
+
+from AIDocGenius.exceptions import SummarizationError
+from AIDocGenius.processor import DocProcessor
+from AIDocGenius.scheduler import InferenceScheduler, _depth_bucket, scheduler_from_config
+
+
+class FakeSummarizer:
+    """记录每次批量调用的假摘要器，batch_started 置位后等待 release 再返回"""
+
+    def __init__(self):
+        self.calls = []
+        self.batch_started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def uses_model(self, mode=None):
+        return mode in (None, "model")
+
+    def generate_summary(self, text, **kwargs):
+        return f"simple:{text}"
+
+    def generate_batch_summaries(self, texts, batch_size=None, **kwargs):
+        self.calls.append((list(texts), kwargs))
+        self.batch_started.set()
+        self.release.wait(5)
+        if "boom" in texts:
+            raise RuntimeError("generation failed")
+        return [text.upper() for text in texts]
+
+
+class TestInferenceScheduler(unittest.TestCase):
+    """测试请求合批、结果分发与统计"""
+
+    def setUp(self):
+        self.summarizer = FakeSummarizer()
+        self.scheduler = InferenceScheduler(self.summarizer, max_batch_size=4, max_wait_ms=50)
+        self.addCleanup(self.scheduler.close, 5)
+
+    def test_concurrent_requests_share_a_batch(self):
+        # 第一个请求占住工作线程，其余请求在此期间排队
+        self.summarizer.release.clear()
+        first = self.scheduler.submit("first")
+        self.assertTrue(self.summarizer.batch_started.wait(5))
+        futures = [self.scheduler.submit(text) for text in ["a", "b", "c", "d", "e"]]
+        self.assertEqual(self.scheduler.queue_depth(), 5)
+        self.summarizer.release.set()
+
+        self.assertEqual(first.result(5), "FIRST")
+        self.assertEqual([future.result(5) for future in futures], ["A", "B", "C", "D", "E"])
+        self.assertEqual([texts for texts, _ in self.summarizer.calls], [["first"], ["a", "b", "c", "d"], ["e"]])
+
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["requests"], 6)
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["batch_sizes"], {"1": 2, "4": 1})
+        self.assertEqual(stats["max_queue_depth"], 5)
+        self.assertEqual(sum(stats["queue_depths"].values()), 6)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_groups_by_parameters_and_propagates_errors(self):
+        self.summarizer.release.clear()
+        blocker = self.scheduler.submit("wait")
+        self.assertTrue(self.summarizer.batch_started.wait(5))
+        short = self.scheduler.submit("x", max_length=10)
+        long = self.scheduler.submit("y", max_length=20)
+        failed = self.scheduler.submit("boom", max_length=30)
+        self.summarizer.release.set()
+
+        blocker.result(5)
+        self.assertEqual(short.result(5), "X")
+        self.assertEqual(long.result(5), "Y")
+        with self.assertRaises(RuntimeError):
+            failed.result(5)
+        self.assertEqual([kwargs for _, kwargs in self.summarizer.calls[1:]],
+                         [{"max_length": 10}, {"max_length": 20}, {"max_length": 30}])
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["failed_batches"], 1)
+        # 同时取出的三个请求参数不同，分三次执行，各计为大小为 1 的批次
+        self.assertEqual(stats["batches"], 4)
+        self.assertEqual(stats["batch_sizes"], {"1": 4})
+
+    def test_cancelled_requests_are_not_counted(self):
+        self.summarizer.release.clear()
+        blocker = self.scheduler.submit("wait")
+        self.assertTrue(self.summarizer.batch_started.wait(5))
+        futures = [self.scheduler.submit(text) for text in ["a", "b", "c"]]
+        self.assertTrue(futures[1].cancel())
+        self.summarizer.release.set()
+
+        blocker.result(5)
+        self.assertEqual([futures[0].result(5), futures[2].result(5)], ["A", "C"])
+        self.assertEqual(self.summarizer.calls[-1][0], ["a", "c"])
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["batch_sizes"], {"1": 1, "2": 1})
+        self.assertEqual(stats["cancelled_requests"], 1)
+        self.assertEqual(stats["average_batch_size"], 1.5)
+
+    def test_non_model_requests_run_inline(self):
+        self.assertEqual(self.scheduler.summarize("text", mode="textrank"), "simple:text")
+        self.assertEqual(self.summarizer.calls, [])
+        self.assertEqual(self.scheduler.stats()["inline_requests"], 1)
+
+    def test_close_finishes_queue_and_rejects_new_requests(self):
+        future = self.scheduler.submit("last")
+        self.scheduler.close(5)
+        self.assertEqual(future.result(0), "LAST")
+        with self.assertRaises(SummarizationError):
+            self.scheduler.submit("late")
+
+    def test_depth_buckets(self):
+        self.assertEqual([_depth_bucket(depth) for depth in (1, 2, 3, 4, 9)], ["1", "2-3", "2-3", "4-7", "8-15"])
+
+
+class TestSchedulerConfig(unittest.TestCase):
+    """测试调度器配置"""
+
+    def test_from_config_and_env(self):
+        summarizer = FakeSummarizer()
+        with mock.patch.dict("os.environ", {}, clear=True):
+            self.assertIsNone(scheduler_from_config(summarizer, None))
+            self.assertIsNone(scheduler_from_config(summarizer, {"enabled": False}))
+            scheduler = scheduler_from_config(summarizer, {"max_batch_size": 16})
+            self.assertEqual((scheduler.max_batch_size, scheduler.max_wait_ms), (16, 5.0))
+        with mock.patch.dict("os.environ", {"INFERENCE_MAX_WAIT_MS": "2"}, clear=True):
+            scheduler = scheduler_from_config(summarizer, None)
+            self.assertEqual((scheduler.max_batch_size, scheduler.max_wait_ms), (8, 2.0))
+
+    def test_processor_summary_goes_through_scheduler(self):
+        processor = DocProcessor(config={"scheduler": {"max_wait_ms": 1}})
+        self.assertIsNotNone(processor.scheduler)
+        summary = processor.generate_summary(text="人工智能发展迅速。机器学习是核心技术。", max_length=50)
+        self.assertTrue(summary)
+        # 默认的简单摘要不进入队列
+        self.assertEqual(processor.scheduler.stats()["inline_requests"], 1)
+        self.assertEqual(processor.scheduler.stats()["batches"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
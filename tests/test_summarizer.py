@@ -6,7 +6,11 @@
 import unittest
 import tempfile
 from pathlib import Path
-from AIDocGenius.summarizer import Summarizer
+from unittest import mock
+from AIDocGenius import summarizer as summarizer_module
+from AIDocGenius.summarizer import (
+    NUMPY_AVAILABLE, Summarizer, chunk_sentences, length_buckets, split_sentences, textrank_scores
+)
 
 
 class TestSummarizer(unittest.TestCase):
@@ -51,6 +55,20 @@ class TestSummarizer(unittest.TestCase):
         summary = self.summarizer.generate_summary(short_text, max_length=100)
         self.assertEqual(summary.strip(), short_text.strip())
 
+    def test_summary_stream_reads_only_head(self):
+        """流式摘要只消费开头的段落"""
+        consumed = []
+
+        def paragraphs():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"第{i}段的第一句话。第{i}段的第二句话。"
+
+        text = "\n\n".join(f"第{i}段的第一句话。第{i}段的第二句话。" for i in range(1000))
+        summary = self.summarizer.generate_summary_stream(paragraphs(), max_length=50)
+        self.assertEqual(summary, self.summarizer.generate_summary(text[:2000], max_length=50))
+        self.assertLess(len(consumed), 1000)
+
     def test_cache_dir_env(self):
         """测试缓存目录环境变量读取"""
         import os
@@ -93,5 +111,168 @@ class TestSummarizerEdgeCases(unittest.TestCase):
         self.assertIsInstance(summary, str)
 
 
+
+class TestTextRankSummarizer(unittest.TestCase):
+    """测试 TextRank 抽取式摘要"""
+
+    def setUp(self):
+        self.summarizer = Summarizer(mode="textrank")
+        self.test_text = (
+            "人工智能技术正在快速发展。今天的天气很好。机器学习是人工智能的核心技术之一。"
+            "深度学习是机器学习的重要分支。我中午吃了面条。"
+        )
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_selects_central_sentences_in_order(self):
+        summary = self.summarizer.generate_summary(self.test_text, max_length=40)
+        self.assertEqual(summary, "机器学习是人工智能的核心技术之一。深度学习是机器学习的重要分支。")
+        self.assertLessEqual(len(summary), 40)
+
+        scores = textrank_scores(split_sentences(self.test_text))
+        self.assertAlmostEqual(sum(scores), 1.0)
+        self.assertLess(scores[1], scores[2])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+    def test_english_sentences(self):
+        text = (
+            "Machine learning is a field of artificial intelligence. The weather was nice yesterday. "
+            "Deep learning is a subset of machine learning. I had pasta for lunch."
+        )
+        summary = self.summarizer.generate_summary(text, max_length=120)
+        self.assertEqual(
+            summary,
+            "Machine learning is a field of artificial intelligence. Deep learning is a subset of machine learning."
+        )
+
+    def test_mode_override_and_fallback(self):
+        simple = Summarizer(use_simple=True)
+        expected = simple.generate_summary(self.test_text, max_length=40)
+        with mock.patch("AIDocGenius.summarizer.NUMPY_AVAILABLE", False):
+            self.assertEqual(self.summarizer.generate_summary(self.test_text, max_length=40), expected)
+        self.assertEqual(self.summarizer.generate_summary(self.test_text, max_length=40, mode="simple"), expected)
+        with self.assertRaises(ValueError):
+            Summarizer(mode="unknown")
+
+
+
+class FakeModelTestCase(unittest.TestCase):
+    """
+    用按空格计数的假 tokenizer 代替模型分词，子类实现 fake_generate 作为假模型的批量生成
+    """
+
+    def setUp(self):
+        self.calls = []
+
+        def count_tokens(summarizer, texts):
+            return [len(text.split()) for text in texts]
+
+        def generate_batch(summarizer, texts, max_length, min_length, batch_size=None, **generation):
+            return self.fake_generate(list(texts), max_length, batch_size)
+
+        patches = [
+            mock.patch.object(summarizer_module, "TRANSFORMERS_AVAILABLE", True),
+            mock.patch.object(Summarizer, "_load_model"),
+            mock.patch.object(Summarizer, "_count_tokens", count_tokens),
+            mock.patch.object(Summarizer, "_generate_batch", generate_batch),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def fake_generate(self, texts, max_length, batch_size):
+        raise NotImplementedError
+
+
+class TestHierarchicalSummarizer(FakeModelTestCase):
+    """测试长文本分层摘要（假模型取每段输入的前三词）"""
+
+    def setUp(self):
+        super().setUp()
+        self.summarizer = Summarizer(mode="model", hierarchical=True, max_input_length=64, chunk_overlap=8)
+        self.text = " ".join(f"Sentence number {i} talks about topic {i % 7}." for i in range(200))
+
+    def fake_generate(self, texts, max_length, batch_size):
+        self.calls.append(texts)
+        return [" ".join(text.split()[:3]) for text in texts]
+
+    def test_chunks_are_bounded_and_overlap(self):
+        sentences = split_sentences(self.text)
+        chunks = chunk_sentences(sentences, [len(s.split()) for s in sentences], 48, overlap_tokens=8)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk.split()) <= 48 for chunk in chunks))
+        for previous, current in zip(chunks, chunks[1:]):
+            last_sentence = split_sentences(previous)[-1]
+            self.assertTrue(current.startswith(last_sentence))
+
+    def test_map_reduce_and_chunk_cache(self):
+        summary = self.summarizer.generate_summary(self.text, max_length=50)
+        self.assertEqual(summary, "Sentence number 0")
+        # 第一层的所有块在一次批量调用中生成，最后一次调用只有归并后的一段输入
+        self.assertGreater(len(self.calls[0]), 1)
+        self.assertEqual(len(self.calls[-1]), 1)
+        first_misses = self.summarizer.chunk_cache_misses
+
+        self.calls.clear()
+        edited = self.text.replace("Sentence number 100 talks", "Sentence number 100 now talks")
+        self.summarizer.generate_summary(edited, max_length=50)
+        recomputed = sum(len(texts) for texts in self.calls)
+        self.assertGreater(recomputed, 0)
+        self.assertLessEqual(recomputed, 4)
+        self.assertEqual(self.summarizer.chunk_cache_misses - first_misses, recomputed)
+
+    def test_short_text_is_summarized_directly(self):
+        self.summarizer.generate_summary("A short document. It fits in one input.", max_length=50)
+        self.assertEqual(self.calls, [["A short document. It fits in one input."]])
+
+
+class TestBatchSummaries(FakeModelTestCase):
+    """测试批量摘要（假模型记录每次批量调用的输入与长度参数）"""
+
+    def setUp(self):
+        super().setUp()
+        self.summarizer = Summarizer(mode="model", max_input_length=64)
+
+    def fake_generate(self, texts, max_length, batch_size):
+        self.calls.append((texts, max_length, batch_size))
+        if any("fail" in text for text in texts):
+            raise RuntimeError("generation failed")
+        return [text.split()[0].upper() for text in texts]
+
+    def test_length_buckets(self):
+        self.assertEqual(length_buckets([5, 1, 4, 2, 3], 2), [[1, 3], [4, 2], [0]])
+        self.assertEqual(length_buckets([], 4), [])
+
+    def test_one_batch_call_in_original_order(self):
+        texts = ["alpha one two three", "beta", "gamma one", "delta one two"]
+        summaries = self.summarizer.generate_batch_summaries(texts, batch_size=2, max_length=20)
+        self.assertEqual(summaries, ["ALPHA", "BETA", "GAMMA", "DELTA"])
+        self.assertEqual(self.calls, [(texts, 20, 2)])
+
+    def test_ratio_groups_and_fallback(self):
+        texts = ["short text here.", "a much longer text that yields a larger limit.", "fail here."]
+        summaries = self.summarizer.generate_batch_summaries(texts, ratio=0.5, max_length=30)
+        self.assertEqual([max_length for _, max_length, _ in self.calls], [8, 23, 5])
+        self.assertEqual(summaries[:2], ["SHORT", "A"])
+        self.assertEqual(summaries[2], "fail ")
+
+    def test_long_texts_use_hierarchical_path(self):
+        self.summarizer.hierarchical = True
+        long_text = " ".join(f"Sentence {i} is long enough to need chunks." for i in range(40))
+        summaries = self.summarizer.generate_batch_summaries(["first short.", long_text, "second short."])
+        self.assertEqual(summaries[0], "FIRST")
+        self.assertEqual(summaries[2], "SECOND")
+        self.assertEqual(summaries[1], "SENTENCE")
+        # 短文本合并为一次调用，长文本的分块摘要单独调用
+        self.assertEqual(self.calls[-1][0], ["first short.", "second short."])
+        self.assertTrue(all(long_text not in texts for texts, _, _ in self.calls))
+
+    def test_non_model_modes_use_loop(self):
+        texts = ["人工智能发展迅速。机器学习是核心技术。", "第二篇文档。"]
+        summaries = self.summarizer.generate_batch_summaries(texts, mode="simple", max_length=50)
+        self.assertEqual(summaries, [self.summarizer.generate_summary(text, mode="simple", max_length=50)
+                                     for text in texts])
+        self.assertEqual(self.calls, [])
+
+
 if __name__ == '__main__':
     unittest.main()
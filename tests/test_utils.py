@@ -7,7 +7,55 @@ import unittest
 import tempfile
 from pathlib import Path
 
-from AIDocGenius.utils import load_config, ensure_text
+from AIDocGenius.utils import (
+    load_config, ensure_text, iter_text_chunks, iter_paragraphs,
+    parse_page_range, iter_pdf_pages, load_pdf, load_docx_text, load_document
+)
+
+
+def _write_pdf(path, page_texts):
+    """生成每页一行文本的最小 PDF"""
+    count = len(page_texts)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(count)), count)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>").encode())
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(data)
+
+
+def _text_box_run(text):
+    """Word 保存文本框的结构：mc:Choice 中的 DrawingML 文本框与 mc:Fallback 中的 VML 副本"""
+    from docx.oxml import parse_xml
+
+    paragraph = f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+    return parse_xml(
+        '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+        ' xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+        ' xmlns:v="urn:schemas-microsoft-com:vml">'
+        '<mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing><wps:txbx><w:txbxContent>{paragraph}'
+        '</w:txbxContent></wps:txbx></w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict><v:textbox><w:txbxContent>{paragraph}'
+        '</w:txbxContent></v:textbox></w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r>'
+    )
 
 
 class TestUtils(unittest.TestCase):
@@ -22,6 +70,93 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(ensure_text("hello"), "hello")
         self.assertIn("a", ensure_text({"a": 1}))
 
+    def test_iter_text_chunks_utf8_boundaries(self):
+        text = "中文段落一。\r\n第二行\n\n" * 50 + "结尾"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "big.txt"
+            path.write_bytes(text.encode("utf-8"))
+            expected = path.read_text(encoding="utf-8")
+            for use_mmap in (False, True):
+                chunks = list(iter_text_chunks(path, chunk_size=7, use_mmap=use_mmap))
+                self.assertEqual("".join(chunks), expected)
+            self.assertEqual(list(iter_paragraphs(path, chunk_size=5, max_chars=100)), expected.split("\n\n"))
+
+    def test_iter_paragraphs_bounds_long_paragraphs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "log.txt"
+            path.write_text("log line\n" * 100, encoding="utf-8")
+            paragraphs = list(iter_paragraphs(path, chunk_size=64))
+            self.assertTrue(all(len(p) <= 64 for p in paragraphs))
+            self.assertEqual(sum(p.count("log line") for p in paragraphs), 100)
+
+    def test_parse_page_range(self):
+        self.assertEqual(parse_page_range("1-3,7,9-", 10), [0, 1, 2, 6, 8, 9])
+        self.assertEqual(parse_page_range(range(2), 10), [0, 1])
+        self.assertEqual(parse_page_range(None, 3), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            parse_page_range("a-b", 3)
+
+    def test_pdf_page_ranges_and_parallel_extraction(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "report.pdf"
+            _write_pdf(path, [f"Page {i}" for i in range(1, 21)])
+            pages = iter_pdf_pages(path, "2-3")
+            self.assertEqual(next(pages).strip(), "Page 2")
+            self.assertEqual(load_pdf(path, pages="1,20").split("\n"), ["Page 1", "Page 20"])
+            self.assertEqual(load_pdf(path, workers=2), load_pdf(path))
+
+    def test_fast_docx_extraction(self):
+        from docx import Document
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "report.docx"
+            doc = Document()
+            doc.add_paragraph("第一段")
+            paragraph = doc.add_paragraph("带\t制表符")
+            paragraph.add_run().add_break()
+            paragraph.add_run("换行")
+            table = doc.add_table(rows=2, cols=2)
+            table.cell(0, 0).text = "A"
+            table.cell(0, 1).text = "B"
+            table.cell(1, 1).text = "D"
+            host = doc.add_paragraph("Before")
+            host._p.append(_text_box_run("BoxText"))
+            host.add_run(" After")
+            doc.add_paragraph("结尾")
+            doc.save(str(path))
+
+            text = load_docx_text(path)
+            # 文本框只取 mc:Choice 中的一份，紧跟在所在段落之后
+            self.assertEqual(text, "第一段\n带\t制表符\n换行\nA\tB\n\tD\nBefore After\nBoxText\n结尾")
+            self.assertEqual(load_document(path), text)
+
+            broken = Path(temp_dir) / "broken.docx"
+            broken.write_bytes(b"not a zip")
+            with self.assertRaises(Exception):
+                load_document(broken)
+
+    def test_load_document_from_memory(self):
+        import io
+        from docx import Document
+
+        self.assertEqual(load_document(b"line1\r\nline2", file_format="txt"), "line1\nline2")
+        self.assertEqual(load_document(io.BytesIO(b'{"a": 1}'), file_format=".json"), {"a": 1})
+        with self.assertRaises(ValueError):
+            load_document(b"no format")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = Path(temp_dir) / "report.pdf"
+            _write_pdf(pdf_path, ["Page 1", "Page 2"])
+            self.assertEqual(load_document(pdf_path.read_bytes(), file_format="pdf"), load_document(pdf_path))
+
+            docx_buffer = io.BytesIO()
+            doc = Document()
+            doc.add_paragraph("内存中的文档")
+            doc.save(docx_buffer)
+            docx_buffer.name = "upload.docx"
+            docx_buffer.seek(0)
+            self.assertEqual(load_document(docx_buffer), "内存中的文档")
+
 
 if __name__ == '__main__':
     unittest.main()